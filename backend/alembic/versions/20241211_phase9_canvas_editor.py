@@ -1,6 +1,7 @@
 """Phase 9 canvas editor: add canvas_data to mockups."""
 from alembic import op
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
 
 # revision identifiers, used by Alembic.
 revision = "20241211_phase9_canvas_editor"
@@ -10,9 +11,10 @@ depends_on = None
 
 
 def upgrade() -> None:
-    # Add canvas_data to mockups
+    # Add canvas_data to mockups (binary JSONB on Postgres: parsed once on write)
+    canvas_type = sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), "postgresql")
     with op.batch_alter_table("mockups") as batch_op:
-        batch_op.add_column(sa.Column("canvas_data", sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column("canvas_data", canvas_type, nullable=True))
 
 
 def downgrade() -> None:
@@ -0,0 +1,37 @@
+"""Unique partial indexes on users.verify_token / users.reset_token."""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20241212_token_indexes"
+down_revision = "20241211_phase9_canvas_editor"
+branch_labels = None
+depends_on = None
+
+TOKEN_INDEXES = {
+    "ix_users_verify_token": "verify_token",
+    "ix_users_reset_token": "reset_token",
+}
+
+
+def upgrade() -> None:
+    # CONCURRENTLY can't run inside a transaction, so build outside of it
+    # to avoid locking the users table on Postgres.
+    with op.get_context().autocommit_block():
+        for name, column in TOKEN_INDEXES.items():
+            where = sa.text(f"{column} IS NOT NULL")
+            op.create_index(
+                name,
+                "users",
+                [column],
+                unique=True,
+                postgresql_where=where,
+                postgresql_concurrently=True,
+                sqlite_where=where,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in TOKEN_INDEXES:
+            op.drop_index(name, table_name="users", postgresql_concurrently=True)
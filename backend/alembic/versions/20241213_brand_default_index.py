@@ -0,0 +1,25 @@
+"""One default brand per user: unique partial index on brands.user_id."""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20241213_brand_default_index"
+down_revision = "20241212_token_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    where = sa.text("is_default")
+    op.create_index(
+        "ix_brands_default_per_user",
+        "brands",
+        ["user_id"],
+        unique=True,
+        postgresql_where=where,
+        sqlite_where=where,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_brands_default_per_user", table_name="brands")
@@ -0,0 +1,23 @@
+"""Store brand mood/style/industry/lighting lowercase."""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20241214_normalize_brand_keywords"
+down_revision = "20241213_brand_default_index"
+branch_labels = None
+depends_on = None
+
+KEYWORD_COLUMNS = ("mood", "style", "industry", "preferred_lighting")
+
+
+def upgrade() -> None:
+    for column in KEYWORD_COLUMNS:
+        op.execute(
+            f"UPDATE brands SET {column} = lower({column}) "
+            f"WHERE {column} IS NOT NULL AND {column} <> lower({column})"
+        )
+
+
+def downgrade() -> None:
+    # Original casing is not recoverable; lowercase values remain valid.
+    pass
@@ -0,0 +1,29 @@
+"""Index mockups by owner and creation time."""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20241215_mockup_user_index"
+down_revision = "20241214_normalize_brand_keywords"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY can't run inside a transaction, so build outside of it
+    # to avoid locking the mockups table on Postgres.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_mockups_user_id_created_at",
+            "mockups",
+            ["user_id", "created_at"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_mockups_user_id_created_at",
+            table_name="mockups",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,20 @@
+"""Products: add a downscaled image path for Gemini inputs."""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20241217_product_gemini_image"
+down_revision = "20241216_product_user_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Nullable: existing products fall back to the processed image
+    with op.batch_alter_table("products") as batch_op:
+        batch_op.add_column(sa.Column("gemini_preprocessed_path", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("products") as batch_op:
+        batch_op.drop_column("gemini_preprocessed_path")
@@ -1,63 +1,167 @@
 """Shared dependencies for API routes."""
-from fastapi import Depends, HTTPException, status
+import hashlib
+import heapq
+import time
+
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request, Security, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.cache import TTLCache
+from app.core.database import async_session, get_db
 from app.core.security import decode_token
 from app.services.auth_service import get_user_by_id
 from app.models import User
 
+# Declared on the auth dependencies so OpenAPI documents the bearer
+# requirement (and Swagger's "Authorize" sends the token). It never errors;
+# the claims are read from what AuthMiddleware attached to the request.
 bearer_scheme = HTTPBearer(auto_error=False)
 
+# sha256(token) -> verified claims. Repeated requests with the same bearer
+# token (e.g. batch status polling) skip the JWT verify. Only the immutable
+# claims are cached: the user row (plan, usage counts, is_active) is read
+# on every request, so writes from other workers are never missed.
+_token_cache = TTLCache(maxsize=10_000, ttl=30)
+
+# Tokens revoked via /auth/logout -> their expiry (per-process). Entries
+# are only dropped once the token has expired anyway, never to make room.
+_revoked_tokens: dict[bytes, float] = {}
+_revocation_expiries: list[tuple[float, bytes]] = []  # min-heap
+
+
+def _token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+def _purge_revocations(now: float) -> None:
+    while _revocation_expiries and _revocation_expiries[0][0] <= now:
+        _, key = heapq.heappop(_revocation_expiries)
+        _revoked_tokens.pop(key, None)
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    db: AsyncSession = Depends(get_db),
-) -> User:
-    if credentials is None:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
 
-    token = credentials.credentials
+def revoke_token(token: str) -> None:
+    """Revoke an access token for the rest of its lifetime (per-process)."""
+    claims, _ = _verify_token(token)
+    if claims is None:
+        # Invalid, expired or already revoked: rejected anyway
+        return
+    key = _token_key(token)
+    _token_cache.pop(key)
+    _purge_revocations(time.time())
+    _revoked_tokens[key] = claims["exp"]
+    heapq.heappush(_revocation_expiries, (claims["exp"], key))
+
+
+def _verify_token(token: str) -> tuple[Optional[dict], Optional[str]]:
+    """Return (claims, error detail) for a bearer token without touching the DB."""
+    key = _token_key(token)
+    if key in _revoked_tokens:
+        return None, "Token revoked"
+
+    cached = _token_cache.get(key)
+    if cached is not None and cached["exp"] > time.time():
+        return cached, None
+
     try:
         payload = decode_token(token)
     except JWTError:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+        return None, "Invalid token"
 
     if payload.get("type") != "access":
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token type")
+        return None, "Invalid token type"
+    if not payload.get("sub"):
+        return None, "Invalid token payload"
+    _token_cache.set(key, payload)
+    return payload, None
+
+
+def _parse_authorization(header: Optional[str]) -> tuple[Optional[dict], Optional[bytes], Optional[str]]:
+    """Return (claims, token cache key, error detail) for an Authorization header."""
+    if not header:
+        return None, None, "Not authenticated"
+    scheme, _, token = header.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None, None, "Not authenticated"
+    claims, error = _verify_token(token)
+    return claims, _token_key(token), error
+
+
+class AuthMiddleware:
+    """
+    Verify the bearer token once per request, before routing.
+
+    Stores the result on ``request.state.auth`` so auth dependencies reuse
+    the verified claims instead of decoding the token again. Routes that
+    need the User still load its row on every request (see _authenticate),
+    so deactivation takes effect immediately.
+    """
 
-    user_id = payload.get("sub")
-    if not user_id:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
+    def __init__(self, app):
+        self.app = app
 
-    user = await get_user_by_id(db, user_id)
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            header = None
+            for name, value in scope["headers"]:
+                if name == b"authorization":
+                    header = value.decode("latin-1")
+                    break
+            scope.setdefault("state", {})["auth"] = _parse_authorization(header)
+        await self.app(scope, receive, send)
+
+
+def _request_auth(request: Request) -> tuple[Optional[dict], Optional[bytes], Optional[str]]:
+    auth = getattr(request.state, "auth", None)
+    if auth is None:
+        # Middleware not installed (e.g. a bare router in tests)
+        auth = _parse_authorization(request.headers.get("authorization"))
+        request.state.auth = auth
+    return auth
+
+
+async def _authenticate(request: Request, db: AsyncSession) -> User:
+    claims, _, error = _request_auth(request)
+    if claims is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=error)
+
+    user = await get_user_by_id(db, claims["sub"])
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     if not user.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User inactive")
-
     return user
 
 
-async def get_current_user_optional(
-    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+async def get_current_user(
+    request: Request,
     db: AsyncSession = Depends(get_db),
+    _credentials: Optional[HTTPAuthorizationCredentials] = Security(bearer_scheme),
+) -> User:
+    return await _authenticate(request, db)
+
+
+async def get_current_user_optional(
+    request: Request,
+    _credentials: Optional[HTTPAuthorizationCredentials] = Security(bearer_scheme),
 ) -> User | None:
-    if credentials is None:
-        return None
-    try:
-        payload = decode_token(credentials.credentials)
-    except JWTError:
-        return None
-    user_id = payload.get("sub")
-    if not user_id:
+    """
+    Current user, or None for anonymous / invalid-token requests.
+
+    Anonymous requests never check out a DB session. With a valid token a
+    short-lived session is used, so the returned user is detached: fine for
+    reads, but routes that modify the user should use get_current_user.
+    """
+    if _request_auth(request)[0] is None:
         return None
-    user = await get_user_by_id(db, user_id)
-    if user and user.is_active:
-        return user
-    return None
+    async with async_session() as db:
+        try:
+            return await _authenticate(request, db)
+        except HTTPException:
+            return None
 
 
 async def get_current_active_user(
@@ -66,4 +170,3 @@ async def get_current_active_user(
     if not user.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
     return user
-
@@ -1,11 +1,14 @@
 """Authentication endpoints (credentials-only, email flows stubbed)."""
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from pydantic import BaseModel, EmailStr
 
-from app.api.deps import get_current_active_user
+from app.api.deps import bearer_scheme, get_current_active_user, revoke_token
 from app.core.database import get_db
+from app.core.security import decode_token, create_access_token, create_refresh_token
 from app.services import auth_service
 from app.services.auth_service import issue_token_pair
 from app.schemas import (
@@ -14,7 +17,7 @@ from app.schemas import (
     TokenResponse,
     AuthResponse,
 )
-from app.utils.rate_limiter import rate_limit
+from app.utils.rate_limiter import rate_limit_async
 
 router = APIRouter()
 
@@ -41,7 +44,7 @@ async def register(
     payload: UserCreate,
     db: AsyncSession = Depends(get_db),
 ):
-    rate_limit(f"register:{payload.email}", limit=5, window_seconds=60)
+    await rate_limit_async(f"register:{payload.email}", limit=5, window_seconds=60)
     user = await auth_service.create_user(db, payload.email, payload.password, name=payload.name)
     tokens = issue_token_pair(user)
     return AuthResponse(user=user, tokens=TokenResponse(**tokens))
@@ -52,7 +55,7 @@ async def login(
     payload: UserLogin,
     db: AsyncSession = Depends(get_db),
 ):
-    rate_limit(f"login:{payload.email}", limit=10, window_seconds=60)
+    await rate_limit_async(f"login:{payload.email}", limit=10, window_seconds=60)
     user = await auth_service.authenticate_user(db, payload.email, payload.password)
     tokens = issue_token_pair(user)
     return AuthResponse(user=user, tokens=TokenResponse(**tokens))
@@ -62,8 +65,6 @@ async def login(
 async def refresh_token(
     request: RefreshRequest,
 ):
-    from jose import JWTError
-    from app.core.security import decode_token, create_access_token, create_refresh_token
     try:
         payload = decode_token(request.refresh_token)
     except JWTError:
@@ -71,7 +72,7 @@ async def refresh_token(
     if payload.get("type") != "refresh":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token type")
     # Issue new pair
-    user_claims = {k: v for k, v in payload.items() if k in {"sub", "email", "tier"}}
+    user_claims = {k: payload[k] for k in ("sub", "email", "tier") if k in payload}
     return TokenResponse(
         access_token=create_access_token(user_claims),
         refresh_token=create_refresh_token(user_claims),
@@ -80,8 +81,12 @@ async def refresh_token(
 
 
 @router.post("/logout")
-async def logout():
-    # Stateless JWT - nothing to revoke yet
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+):
+    # Stateless JWT - revoke the access token in-process so cached auth stops accepting it
+    if credentials is not None:
+        revoke_token(credentials.credentials)
     return {"message": "Logged out"}
 
 
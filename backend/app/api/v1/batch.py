@@ -1,12 +1,17 @@
 """Batch generation endpoints for creating multiple mockup variations."""
-from fastapi import APIRouter, HTTPException, Depends
+import asyncio
+import json
+
+import orjson
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.core.database import get_db
-from app.core.utils import get_image_url
+from app.core.utils import content_etag, get_image_url, static_json_response
 from app.core.batch_queue import batch_queue, JobStatus
 from app.models import Mockup
 from app.services.batch_service import batch_service, VARIATION_PRESETS
@@ -33,6 +38,14 @@ class BatchGenerateRequest(BaseModel):
     custom_variations: Optional[List[VariationCustomization]] = None
 
 
+class JobResultItem(BaseModel):
+    """Outcome of a single item in a batch job."""
+    item_id: str
+    success: bool
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
 class JobStatusResponse(BaseModel):
     """Response for job status queries."""
     id: str
@@ -46,7 +59,7 @@ class JobStatusResponse(BaseModel):
     started_at: Optional[str] = None
     completed_at: Optional[str] = None
     error: Optional[str] = None
-    results: List[Dict[str, Any]] = []
+    results: List[JobResultItem] = []
 
 
 class BatchGenerateResponse(BaseModel):
@@ -94,17 +107,6 @@ async def start_batch_generation(
     - standard: 5-6 variations, balanced coverage
     - comprehensive: 10+ variations, full coverage
     """
-    # Convert custom variations if provided
-    custom_vars = None
-    if request.custom_variations:
-        custom_vars = [
-            {
-                "template_id": v.template_id,
-                "customization": v.customization or {},
-            }
-            for v in request.custom_variations
-        ]
-
     try:
         job = await batch_service.start_batch_generation(
             db=db,
@@ -112,7 +114,7 @@ async def start_batch_generation(
             scene_template_ids=request.scene_template_ids,
             variation_preset=request.variation_preset,
             max_variations=request.max_variations,
-            custom_variations=custom_vars,
+            custom_variations=request.custom_variations,
         )
 
         return BatchGenerateResponse(
@@ -129,19 +131,61 @@ async def start_batch_generation(
 
 
 @router.get("/status/{job_id}", response_model=JobStatusResponse)
-async def get_job_status(job_id: str):
+async def get_job_status(job_id: str, request: Request, response: Response):
     """
     Get the status of a batch generation job.
 
-    Poll this endpoint to track progress.
-    When status is 'completed', results are available.
+    Poll this endpoint to track progress, or use /status/{job_id}/stream.
+    Send the returned ETag as If-None-Match to get an empty 304 while
+    nothing has changed. When status is 'completed', results are available.
+    """
+    job = batch_queue.get_job(job_id)
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    etag = f'"{job.version}-{job.completed_items}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    return JobStatusResponse(**job.to_dict())
+
+
+@router.get("/status/{job_id}/stream")
+async def stream_job_status(job_id: str):
     """
-    status = batch_service.get_job_status(job_id)
+    Stream job progress as server-sent events.
 
-    if not status:
+    Emits the current progress immediately, then one event per update,
+    and closes once the job is done. Alternative to polling /status/{job_id}.
+    """
+    job = batch_queue.get_job(job_id)
+
+    if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    return JobStatusResponse(**status)
+    async def event_stream():
+        queue = batch_queue.subscribe(job_id)
+        try:
+            event = job.progress_event()
+            yield f"data: {json.dumps(event)}\n\n"
+            while not event["is_done"]:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {json.dumps(event)}\n\n"
+        finally:
+            batch_queue.unsubscribe(job_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.post("/status/{job_id}/cancel")
@@ -155,7 +199,7 @@ async def cancel_job(job_id: str):
     return {"message": "Job cancelled", "job_id": job_id}
 
 
-@router.get("/results/{job_id}", response_model=BatchResultResponse)
+@router.get("/results/{job_id}", responses={200: {"model": BatchResultResponse}})
 async def get_batch_results(
     job_id: str,
     save_to_db: bool = True,
@@ -182,49 +226,55 @@ async def get_batch_results(
     successful_results = [r for r in job.results if r.success and r.result]
 
     # Save to database if requested and job has product_id
-    mockups = []
     if save_to_db and successful_results and job.metadata.get("product_id"):
-        mockups = await batch_service.save_completed_mockups(
+        saved = await batch_service.save_completed_mockups(
             db=db,
             job=job,
             product_id=job.metadata["product_id"],
         )
+    else:
+        saved = [(f"temp_{i}", r.result) for i, r in enumerate(successful_results)]
+
+    # Build the BatchResultResponse shape directly; skips per-item model
+    # construction and output validation
+    return ORJSONResponse({
+        "job_id": job_id,
+        "status": job.status.value,
+        "mockups": [
+            {
+                "id": mockup_id,
+                "image_url": get_image_url(data["image_path"]),
+                "scene_template_id": data.get("scene_template_id"),
+                "customization": data.get("customization"),
+            }
+            for mockup_id, data in saved
+        ],
+        "failed_count": job.failed_items,
+    })
 
-    # Build response
-    mockup_variations = []
-    for i, result in enumerate(successful_results):
-        data = result.result
-        mockup_id = mockups[i].id if i < len(mockups) else f"temp_{i}"
-        mockup_variations.append(MockupVariation(
-            id=mockup_id,
-            image_url=get_image_url(data["image_path"]),
-            scene_template_id=data.get("scene_template_id"),
-            customization=data.get("customization"),
-        ))
-
-    return BatchResultResponse(
-        job_id=job_id,
-        status=job.status.value,
-        mockups=mockup_variations,
-        failed_count=job.failed_items,
-    )
-
-
-@router.get("/presets", response_model=VariationPresetsResponse)
-async def get_variation_presets():
-    """Get available variation presets and their configurations."""
-    presets_info = {}
 
-    for preset_name, config in VARIATION_PRESETS.items():
-        presets_info[preset_name] = {
+# Presets are static, so the response body is encoded once at import
+_PRESETS_JSON: bytes = orjson.dumps({
+    "presets": {
+        preset_name: {
             "angles": config.angles,
             "lighting": config.lighting,
             "backgrounds": config.backgrounds,
             "styles": config.styles,
             "estimated_count": len(config.angles) * len(config.lighting),
         }
+        for preset_name, config in VARIATION_PRESETS.items()
+    }
+})
 
-    return VariationPresetsResponse(presets=presets_info)
+
+_PRESETS_ETAG = content_etag(_PRESETS_JSON)
+
+
+@router.get("/presets", responses={200: {"model": VariationPresetsResponse}})
+async def get_variation_presets(request: Request):
+    """Get available variation presets and their configurations."""
+    return static_json_response(request, _PRESETS_JSON, _PRESETS_ETAG)
 
 
 @router.get("/jobs", response_model=List[JobStatusResponse])
@@ -1,15 +1,26 @@
 """Brand management API endpoints."""
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Form
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import delete, insert, select, update
+from functools import lru_cache
+from itertools import chain, islice
 from typing import Optional, List
+import asyncio
 import logging
+import random
 
 from app.api.deps import get_current_active_user
+from app.core.brand_extractor import brand_extractor
+from app.config import settings
+from app.core.cache import cache_delete, cache_get, cache_set
 from app.core.database import get_db
-from app.core.storage import save_image, get_image
+from app.core.scene_generator import enhance_prompt_with_brand, get_templates
+from app.core.storage import LOGO_MAX_SIZE, get_image, open_upload_image, save_logo
 from app.core.utils import get_image_url
-from app.models import Brand, User
+from app.models import Brand, Mockup, User
 from app.schemas import (
     BrandCreate,
     BrandUpdate,
@@ -24,6 +35,15 @@ from app.services.usage_service import ensure_within_limits
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Read endpoints cache the serialized BrandResponse and return it without
+# re-encoding; every write commits and then drops the affected keys. Only
+# enabled with REDIS_URL: the per-process fallback can't see another
+# worker's invalidations, so it would serve stale brands for up to a TTL.
+_BRAND_CACHE_TTL = 300
+_BRAND_CACHE_TTL_JITTER = 60
+_brand_list_adapter = TypeAdapter(List[BrandResponse])
+_default_brand_adapter = TypeAdapter(Optional[BrandResponse])
+
 
 @router.post("/", response_model=BrandResponse)
 async def create_brand(
@@ -37,52 +57,54 @@ async def create_brand(
     Brand profiles store colors, typography, mood, and style preferences
     that influence mockup generation for consistent branding.
     """
-    # If setting as default, unset any existing defaults
+    # If setting as default, unset the user's existing default
+    unset_ids = []
     if brand.is_default:
-        await db.execute(
-            update(Brand).where(Brand.is_default == True).values(is_default=False)
-        )
-    
-    # Generate prompt description from brand attributes
-    prompt_description = _generate_prompt_description(brand)
-    
-    # Determine suggested scenes based on mood/style
-    suggested_scenes = _get_suggested_scenes(brand.mood, brand.style, brand.industry)
-    
-    # Determine preferred lighting based on mood
-    preferred_lighting = brand.preferred_lighting or _get_preferred_lighting(brand.mood)
+        unset_ids = await _unset_default_brand(db, current_user.id)
     
     await ensure_within_limits(db, current_user, "brands_created", increment=1)
 
-    db_brand = Brand(
-        user_id=current_user.id,
-        name=brand.name,
-        description=brand.description,
-        website_url=brand.website_url,
-        primary_color=brand.primary_color,
-        secondary_color=brand.secondary_color,
-        accent_color=brand.accent_color,
-        background_color=brand.background_color,
-        color_palette=brand.color_palette,
-        primary_font=brand.primary_font,
-        secondary_font=brand.secondary_font,
-        font_style=brand.font_style,
-        mood=brand.mood,
-        style=brand.style,
-        industry=brand.industry,
-        target_audience=brand.target_audience,
-        prompt_description=prompt_description,
-        suggested_scenes=suggested_scenes,
-        preferred_lighting=preferred_lighting,
-        is_default=brand.is_default,
-        is_extracted=False,
-    )
+    db_brand = Brand(**_brand_values(brand, current_user.id))
     
     db.add(db_brand)
-    await db.flush()
-    await db.refresh(db_brand)
+    # One flush at commit writes the usage counter and the INSERT ... RETURNING
+    # (which fills server defaults via eager_defaults)
+    await _commit_and_invalidate(db, current_user.id, *unset_ids)
     
-    return BrandResponse.model_validate(db_brand)
+    return _brand_to_response(db_brand)
+
+
+@router.post("/bulk", response_model=List[BrandResponse])
+async def create_brands_bulk(
+    brands: List[BrandCreate],
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Create several brand profiles at once (e.g. when onboarding).
+    
+    All brands are inserted with a single multi-row INSERT and count
+    against the plan's brand limit together.
+    """
+    if not brands:
+        raise HTTPException(status_code=400, detail="No brands provided")
+    if sum(brand.is_default for brand in brands) > 1:
+        raise HTTPException(status_code=400, detail="Only one brand can be set as default")
+    
+    unset_ids = []
+    if any(brand.is_default for brand in brands):
+        unset_ids = await _unset_default_brand(db, current_user.id)
+    
+    await ensure_within_limits(db, current_user, "brands_created", increment=len(brands))
+    
+    result = await db.scalars(
+        insert(Brand).returning(Brand, sort_by_parameter_order=True),
+        [_brand_values(brand, current_user.id) for brand in brands],
+    )
+    created = [_brand_to_response(b) for b in result.all()]
+    await _commit_and_invalidate(db, current_user.id, *unset_ids)
+    
+    return created
 
 
 @router.get("/", response_model=List[BrandResponse])
@@ -92,6 +114,11 @@ async def list_brands(
     current_user: User = Depends(get_current_active_user),
 ):
     """List all brands for the current user."""
+    key = _brand_list_key(current_user.id)
+    cached = await _brand_cache_get(key)
+    if cached is not None:
+        return _json_response(cached)
+    
     query = (
         select(Brand)
         .where(Brand.user_id == current_user.id)
@@ -99,9 +126,12 @@ async def list_brands(
     )
     
     result = await db.execute(query)
-    brands = result.scalars().all()
+    body = _brand_list_adapter.dump_json(
+        [_brand_to_response(b) for b in result.scalars()]
+    )
+    await _brand_cache_set(key, body)
     
-    return [BrandResponse.model_validate(b) for b in brands]
+    return _json_response(body)
 
 
 @router.get("/default", response_model=Optional[BrandResponse])
@@ -110,15 +140,19 @@ async def get_default_brand(
     current_user: User = Depends(get_current_active_user),
 ):
     """Get the default brand profile."""
+    key = _default_brand_key(current_user.id)
+    cached = await _brand_cache_get(key)
+    if cached is not None:
+        return _json_response(cached)
+    
     result = await db.execute(
         select(Brand).where(Brand.is_default == True, Brand.user_id == current_user.id)
     )
     brand = result.scalar_one_or_none()
+    body = _default_brand_adapter.dump_json(_brand_to_response(brand) if brand else None)
+    await _brand_cache_set(key, body)
     
-    if not brand:
-        return None
-    
-    return BrandResponse.model_validate(brand)
+    return _json_response(body)
 
 
 @router.get("/{brand_id}", response_model=BrandResponse)
@@ -128,15 +162,7 @@ async def get_brand(
     current_user: User = Depends(get_current_active_user),
 ):
     """Get a specific brand by ID."""
-    result = await db.execute(
-        select(Brand).where(Brand.id == brand_id, Brand.user_id == current_user.id)
-    )
-    brand = result.scalar_one_or_none()
-    
-    if not brand:
-        raise HTTPException(status_code=404, detail="Brand not found")
-    
-    return BrandResponse.model_validate(brand)
+    return _json_response(await _get_brand_json(db, current_user.id, brand_id))
 
 
 @router.put("/{brand_id}", response_model=BrandResponse)
@@ -147,37 +173,36 @@ async def update_brand(
     current_user: User = Depends(get_current_active_user),
 ):
     """Update a brand profile."""
-    result = await db.execute(
-        select(Brand).where(Brand.id == brand_id, Brand.user_id == current_user.id)
-    )
-    brand = result.scalar_one_or_none()
-    
-    if not brand:
-        raise HTTPException(status_code=404, detail="Brand not found")
-    
-    # If setting as default, unset any existing defaults
+    # If setting as default, unset the user's existing default
+    unset_ids = []
     if brand_update.is_default:
-        await db.execute(
-            update(Brand)
-            .where(Brand.is_default == True, Brand.id != brand_id)
-            .values(is_default=False)
-        )
+        unset_ids = await _unset_default_brand(db, current_user.id, exclude_id=brand_id)
     
-    # Update fields
+    # Update fields and get the row back in one statement (404 if not owned)
     update_data = brand_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(brand, key, value)
+    if update_data:
+        brand = (await db.execute(
+            update(Brand)
+            .where(Brand.id == brand_id, Brand.user_id == current_user.id)
+            .values(**update_data)
+            .returning(Brand)
+        )).scalar_one_or_none()
+    else:
+        brand = await db.get(Brand, brand_id)
+    
+    if not brand or brand.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Brand not found")
     
     # Regenerate prompt description if relevant fields changed
     if any(k in update_data for k in ['mood', 'style', 'primary_color', 'secondary_color', 'industry']):
         brand.prompt_description = _generate_prompt_description_from_brand(brand)
-        brand.suggested_scenes = _get_suggested_scenes(brand.mood, brand.style, brand.industry)
+        brand.suggested_scenes = list(_get_suggested_scenes(brand.mood, brand.style, brand.industry))
         brand.preferred_lighting = brand.preferred_lighting or _get_preferred_lighting(brand.mood)
     
-    await db.flush()
-    await db.refresh(brand)
+    # Flushes the regenerated fields (if any) as part of the commit
+    await _commit_and_invalidate(db, current_user.id, brand_id, *unset_ids)
     
-    return BrandResponse.model_validate(brand)
+    return _brand_to_response(brand)
 
 
 @router.delete("/{brand_id}")
@@ -187,15 +212,29 @@ async def delete_brand(
     current_user: User = Depends(get_current_active_user),
 ):
     """Delete a brand."""
+    # Detach mockups that used the brand (what the ORM delete did via a
+    # lazy load), then delete; both scoped to the user's own brand
+    owned_brand = (
+        select(Brand.id)
+        .where(Brand.id == brand_id, Brand.user_id == current_user.id)
+        .scalar_subquery()
+    )
+    await db.execute(
+        update(Mockup)
+        .where(Mockup.brand_id == owned_brand)
+        .values(brand_id=None)
+        .execution_options(synchronize_session=False)
+    )
     result = await db.execute(
-        select(Brand).where(Brand.id == brand_id, Brand.user_id == current_user.id)
+        delete(Brand)
+        .where(Brand.id == brand_id, Brand.user_id == current_user.id)
+        .returning(Brand.id)
     )
-    brand = result.scalar_one_or_none()
     
-    if not brand:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Brand not found")
     
-    await db.delete(brand)
+    await _commit_and_invalidate(db, current_user.id, brand_id)
     
     return {"message": "Brand deleted", "id": brand_id}
 
@@ -207,25 +246,25 @@ async def set_default_brand(
     current_user: User = Depends(get_current_active_user),
 ):
     """Set a brand as the default."""
+    # Unset the user's other default (rolled back with the request on 404)
+    unset_ids = await _unset_default_brand(db, current_user.id, exclude_id=brand_id)
+    
+    # Set this brand as default
     result = await db.execute(
-        select(Brand).where(Brand.id == brand_id, Brand.user_id == current_user.id)
+        update(Brand)
+        .where(Brand.id == brand_id, Brand.user_id == current_user.id)
+        .values(is_default=True)
+        .returning(Brand)
     )
     brand = result.scalar_one_or_none()
     
     if not brand:
         raise HTTPException(status_code=404, detail="Brand not found")
     
-    # Unset all other defaults
-    await db.execute(
-        update(Brand).where(Brand.id != brand_id).values(is_default=False)
-    )
-    
-    # Set this brand as default
-    brand.is_default = True
-    await db.flush()
-    await db.refresh(brand)
+    response = _brand_to_response(brand)
+    await _commit_and_invalidate(db, current_user.id, brand_id, *unset_ids)
     
-    return BrandResponse.model_validate(brand)
+    return response
 
 
 @router.post("/{brand_id}/upload-logo", response_model=BrandResponse)
@@ -236,29 +275,29 @@ async def upload_brand_logo(
     current_user: User = Depends(get_current_active_user),
 ):
     """Upload a logo for a brand."""
+    try:
+        logo_image = await run_in_threadpool(open_upload_image, file.file, LOGO_MAX_SIZE)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Save a downscaled copy to the logos directory
+    logo_path = await run_in_threadpool(save_logo, logo_image)
+    
     result = await db.execute(
-        select(Brand).where(Brand.id == brand_id, Brand.user_id == current_user.id)
+        update(Brand)
+        .where(Brand.id == brand_id, Brand.user_id == current_user.id)
+        .values(logo_url=get_image_url(logo_path))
+        .returning(Brand)
     )
     brand = result.scalar_one_or_none()
     
     if not brand:
         raise HTTPException(status_code=404, detail="Brand not found")
     
-    # Save logo image
-    from PIL import Image
-    import io
-    
-    contents = await file.read()
-    logo_image = Image.open(io.BytesIO(contents))
+    response = _brand_to_response(brand)
+    await _commit_and_invalidate(db, current_user.id, brand_id)
     
-    # Save to logos directory
-    logo_path = save_image(logo_image, "logos")
-    brand.logo_url = get_image_url(logo_path)
-    
-    await db.flush()
-    await db.refresh(brand)
-    
-    return BrandResponse.model_validate(brand)
+    return response
 
 
 @router.post("/extract", response_model=BrandExtractResponse)
@@ -277,7 +316,6 @@ async def extract_brand(
     - Website URL: Analyzes design, colors, typography hints
     - Combines both for comprehensive brand DNA
     """
-    from app.core.brand_extractor import brand_extractor
     
     extracted_data = {
         "primary_color": None,
@@ -291,29 +329,26 @@ async def extract_brand(
     confidence = 0.5
     suggestions = []
     
-    # Extract from logo if provided
+    # Logo and website extraction are independent, so run them concurrently
+    logo_outcome, web_result = await _extract_logo_and_website(logo, website_url)
+    
+    # Merge logo results if provided
     if logo:
-        try:
-            from PIL import Image
-            import io
-            
-            contents = await logo.read()
-            logo_image = Image.open(io.BytesIO(contents))
-            
-            logo_result = await brand_extractor.extract_from_logo(logo_image)
+        if isinstance(logo_outcome, Exception):
+            logger.error(f"Logo extraction failed: {logo_outcome}")
+            suggestions.append("Logo analysis failed - try a clearer image")
+        else:
+            logo_result, _ = logo_outcome
             extracted_data.update(logo_result.get("colors", {}))
             extracted_data["mood"] = logo_result.get("mood")
             extracted_data["style"] = logo_result.get("style")
             confidence = max(confidence, logo_result.get("confidence", 0.6))
-            
-        except Exception as e:
-            logger.error(f"Logo extraction failed: {e}")
-            suggestions.append("Logo analysis failed - try a clearer image")
     
-    # Extract from website if provided
+    # Merge website results if provided
     if website_url:
         try:
-            web_result = await brand_extractor.extract_from_website(website_url)
+            if isinstance(web_result, Exception):
+                raise web_result
             
             # Merge with logo results, preferring logo colors
             if not extracted_data["primary_color"]:
@@ -328,10 +363,10 @@ async def extract_brand(
                 extracted_data["industry"] = web_result.get("industry")
                 
             # Extend color palette
-            web_colors = web_result.get("color_palette", [])
-            extracted_data["color_palette"] = list(set(
-                extracted_data.get("color_palette", []) + web_colors
-            ))[:8]  # Limit to 8 colors
+            extracted_data["color_palette"] = _merge_palettes(
+                extracted_data.get("color_palette") or (),
+                web_result.get("color_palette") or (),
+            )
             
             confidence = max(confidence, web_result.get("confidence", 0.7))
             
@@ -339,8 +374,8 @@ async def extract_brand(
             logger.error(f"Website extraction failed: {e}")
             suggestions.append("Website analysis failed - check URL accessibility")
     
-    # AI analysis using Gemini if we have data
-    if logo or website_url:
+    # AI analysis using Gemini if we have data it could still improve
+    if (logo or website_url) and _needs_mood_analysis(extracted_data, confidence):
         try:
             ai_result = await brand_extractor.analyze_brand_mood(
                 extracted_data,
@@ -385,45 +420,38 @@ async def extract_and_create_brand(
     
     Combines extraction and creation in one step for convenience.
     """
-    from app.core.brand_extractor import brand_extractor
     
     extracted = {}
     logo_path = None
+    confidence = 0.5
+    
+    # Extract from logo and website concurrently
+    logo_outcome, web_result = await _extract_logo_and_website(logo, website_url, save_logo_copy=True)
     
-    # Extract from logo
     if logo:
-        try:
-            from PIL import Image
-            import io
-            
-            contents = await logo.read()
-            logo_image = Image.open(io.BytesIO(contents))
-            
-            # Save logo
-            logo_path = save_image(logo_image, "logos")
-            
-            # Extract colors and style
-            logo_result = await brand_extractor.extract_from_logo(logo_image)
+        if isinstance(logo_outcome, Exception):
+            logger.error(f"Logo extraction failed: {logo_outcome}")
+        else:
+            logo_result, logo_path = logo_outcome
             extracted.update(logo_result.get("colors", {}))
             extracted["mood"] = logo_result.get("mood")
             extracted["style"] = logo_result.get("style")
-            
-        except Exception as e:
-            logger.error(f"Logo extraction failed: {e}")
+            confidence = max(confidence, logo_result.get("confidence", 0.6))
     
-    # Extract from website
     if website_url:
         try:
-            web_result = await brand_extractor.extract_from_website(website_url)
+            if isinstance(web_result, Exception):
+                raise web_result
             for key in ["primary_color", "secondary_color", "accent_color", "mood", "style", "industry"]:
                 if not extracted.get(key):
                     extracted[key] = web_result.get(key)
+            confidence = max(confidence, web_result.get("confidence", 0.7))
                     
         except Exception as e:
             logger.error(f"Website extraction failed: {e}")
     
     # AI mood analysis
-    if extracted:
+    if extracted and _needs_mood_analysis(extracted, confidence):
         try:
             ai_result = await brand_extractor.analyze_brand_mood(extracted, brand_name=name)
             for key in ["mood", "style", "industry", "target_audience"]:
@@ -432,22 +460,26 @@ async def extract_and_create_brand(
         except Exception:
             pass
     
+    # Keywords are stored lowercase (see Brand._normalize_keyword)
+    for key in ("mood", "style", "industry"):
+        if extracted.get(key):
+            extracted[key] = extracted[key].lower()
+    
     # Enforce usage limits
     await ensure_within_limits(db, current_user, "brands_created", increment=1)
 
-    # If setting as default, unset others
+    # If setting as default, unset the user's existing default
+    unset_ids = []
     if is_default:
-        await db.execute(
-            update(Brand).where(Brand.is_default == True).values(is_default=False)
-        )
+        unset_ids = await _unset_default_brand(db, current_user.id)
     
     # Generate prompt description
     prompt_description = _generate_prompt_description_dict(extracted)
-    suggested_scenes = _get_suggested_scenes(
+    suggested_scenes = list(_get_suggested_scenes(
         extracted.get("mood"), 
         extracted.get("style"), 
         extracted.get("industry")
-    )
+    ))
     preferred_lighting = _get_preferred_lighting(extracted.get("mood"))
     
     # Create brand
@@ -472,10 +504,11 @@ async def extract_and_create_brand(
     )
     
     db.add(db_brand)
-    await db.flush()
-    await db.refresh(db_brand)
+    # One flush at commit writes the usage counter and the INSERT ... RETURNING
+    # (which fills server defaults via eager_defaults)
+    await _commit_and_invalidate(db, current_user.id, *unset_ids)
     
-    return BrandResponse.model_validate(db_brand)
+    return _brand_to_response(db_brand)
 
 
 @router.get("/{brand_id}/prompt", response_model=BrandPromptResponse)
@@ -491,15 +524,9 @@ async def get_brand_prompt(
     Takes a base scene prompt and enhances it with brand attributes
     for consistent brand styling in mockups.
     """
-    result = await db.execute(
-        select(Brand).where(Brand.id == brand_id, Brand.user_id == current_user.id)
-    )
-    brand = result.scalar_one_or_none()
-    
-    if not brand:
-        raise HTTPException(status_code=404, detail="Brand not found")
+    brand = await _get_brand_response(db, current_user.id, brand_id)
     
-    enhanced_prompt, attributes = _enhance_prompt_with_brand(base_prompt, brand)
+    enhanced_prompt, attributes = enhance_prompt_with_brand(base_prompt, brand)
     
     return BrandPromptResponse(
         brand_id=brand_id,
@@ -520,245 +547,329 @@ async def get_brand_scenes(
     
     Returns scenes that match the brand's mood, style, and industry.
     """
-    from app.core.scene_generator import get_template
     
-    result = await db.execute(
-        select(Brand).where(Brand.id == brand_id, Brand.user_id == current_user.id)
-    )
-    brand = result.scalar_one_or_none()
-    
-    if not brand:
-        raise HTTPException(status_code=404, detail="Brand not found")
+    brand = await _get_brand_response(db, current_user.id, brand_id)
     
     # Get suggested scene IDs
     scene_ids = brand.suggested_scenes or _get_suggested_scenes(
         brand.mood, brand.style, brand.industry
     )
     
-    suggestions = []
-    for i, scene_id in enumerate(scene_ids):
-        template = get_template(scene_id)
-        if template:
-            suggestions.append({
-                "template_id": scene_id,
-                "name": template.name,
-                "description": template.description,
-                "reason": _get_scene_reason(scene_id, brand),
-                "relevance": round(1.0 - (i * 0.1), 2),
-            })
-    
     return BrandScenesResponse(
         brand_id=brand_id,
         brand_mood=brand.mood,
         brand_style=brand.style,
-        suggested_scenes=suggestions,
+        suggested_scenes=list(_scene_suggestions(tuple(scene_ids), brand.mood)),
     )
 
 
+# Static lookup tables for the helpers below, built once at import
+
+_INDUSTRY_SCENES: dict[str, tuple[str, ...]] = {
+    "tech": ("lifestyle-desk", "studio-white", "premium-dark"),
+    "beauty": ("lifestyle-bathroom", "premium-marble", "social-instagram"),
+    "food": ("lifestyle-kitchen", "lifestyle-cafe", "outdoor-nature"),
+    "fashion": ("outdoor-urban", "studio-colored", "social-instagram"),
+    "home": ("lifestyle-living-room", "lifestyle-bedroom", "studio-white"),
+    "fitness": ("outdoor-nature", "studio-white", "outdoor-urban"),
+    "jewelry": ("premium-velvet", "premium-marble", "premium-dark"),
+    "electronics": ("lifestyle-desk", "studio-gray", "premium-dark"),
+}
+
+_MOOD_SCENES: dict[str, tuple[str, ...]] = {
+    "luxury": ("premium-dark", "premium-marble", "premium-velvet"),
+    "minimal": ("studio-white", "studio-gray", "lifestyle-desk"),
+    "playful": ("studio-colored", "social-instagram", "outdoor-nature"),
+    "professional": ("studio-white", "lifestyle-desk", "ecommerce-amazon"),
+    "elegant": ("premium-marble", "premium-velvet", "studio-gradient"),
+    "bold": ("studio-colored", "premium-dark", "outdoor-urban"),
+}
+
+# Used when neither industry nor mood matched
+_DEFAULT_SCENES = ("studio-white", "lifestyle-desk", "ecommerce-amazon", "social-instagram")
+
+_LIGHTING_BY_MOOD = {
+    "luxury": "dramatic",
+    "minimal": "soft",
+    "playful": "bright",
+    "professional": "studio",
+    "elegant": "soft",
+    "bold": "dramatic",
+    "casual": "natural",
+    "organic": "natural",
+    "tech": "studio",
+    "vintage": "warm",
+}
+
+# Phrase per brand attribute, in prompt-description order
+_PROMPT_PHRASES = {
+    "mood": "{} aesthetic",
+    "style": "{} style",
+    "primary_color": "featuring {} as primary color",
+    "secondary_color": "with {} accents",
+    "industry": "suitable for {} industry",
+    "target_audience": "targeting {}",
+}
+_PROMPT_FIELDS = ("mood", "style", "primary_color", "secondary_color", "industry")
+_EXTRACTED_PROMPT_FIELDS = ("mood", "style", "primary_color", "industry")
+_DEFAULT_PROMPT_DESCRIPTION = "Clean, professional product photography"
+
+# The AI mood pass is skipped when logo/website extraction already found
+# these with at least this confidence
+_AI_REQUIRED_FIELDS = ("mood", "style", "industry")
+_AI_SKIP_CONFIDENCE = 0.8
+
+_SCENE_REASONS = {
+    "studio-white": "Clean backdrop complements your brand's clarity",
+    "studio-gray": "Neutral setting lets your brand colors stand out",
+    "studio-colored": "Vibrant background matches your brand energy",
+    "lifestyle-desk": "Professional workspace aligns with your audience",
+    "lifestyle-kitchen": "Lifestyle context resonates with your industry",
+    "lifestyle-bathroom": "Self-care setting suits your beauty brand",
+    "premium-dark": "Dramatic backdrop elevates your luxury positioning",
+    "premium-marble": "Elegant surface matches your sophisticated style",
+    "premium-velvet": "Rich texture complements your premium brand",
+    "outdoor-nature": "Natural setting aligns with your organic values",
+    "outdoor-urban": "Urban edge matches your bold aesthetic",
+    "social-instagram": "Optimized for your social media presence",
+    "ecommerce-amazon": "Marketplace-ready for your sales channels",
+}
+
+
 # Helper functions
 
-def _generate_prompt_description(brand: BrandCreate) -> str:
-    """Generate an AI prompt description from brand attributes."""
-    parts = []
+async def _unset_default_brand(db: AsyncSession, user_id: str, exclude_id: Optional[str] = None) -> List[str]:
+    """Clear the user's current default brand (runs before setting a new one).
+
+    Returns the ids of the brands that were unset.
+    """
+    stmt = update(Brand).where(Brand.user_id == user_id, Brand.is_default == True)
+    if exclude_id:
+        stmt = stmt.where(Brand.id != exclude_id)
+    result = await db.execute(stmt.values(is_default=False).returning(Brand.id))
+    return list(result.scalars())
+
+
+async def _extract_logo(logo: UploadFile, save_logo_copy: bool = False) -> tuple[dict, Optional[str]]:
+    """Decode an uploaded logo and extract its colors/style.
+
+    Returns the extraction result and, when ``save_logo_copy`` is set, the
+    path of the saved downscaled logo.
+    """
+    # Decoded once, at no more than the resolution saving/extraction need
+    logo_image = await run_in_threadpool(open_upload_image, logo.file, LOGO_MAX_SIZE)
+    logo_path = await run_in_threadpool(save_logo, logo_image) if save_logo_copy else None
+    return await brand_extractor.extract_from_logo(logo_image), logo_path
+
+
+async def _extract_logo_and_website(
+    logo: Optional[UploadFile],
+    website_url: Optional[str],
+    save_logo_copy: bool = False,
+) -> tuple:
+    """Run logo and website extraction concurrently.
+
+    Returns ``(logo_outcome, website_result)``; each is None when its input
+    was not provided, or the exception raised while extracting it.
+    """
+    async def skipped():
+        return None
+    
+    return tuple(await asyncio.gather(
+        _extract_logo(logo, save_logo_copy) if logo else skipped(),
+        brand_extractor.extract_from_website(website_url) if website_url else skipped(),
+        return_exceptions=True,
+    ))
+
+
+def _brand_cache_ttl() -> int:
+    """TTL with jitter so entries cached together (e.g. after a deploy) don't all expire at once."""
+    return random.randint(_BRAND_CACHE_TTL - _BRAND_CACHE_TTL_JITTER, _BRAND_CACHE_TTL + _BRAND_CACHE_TTL_JITTER)
+
+
+async def _brand_cache_get(key: str) -> Optional[bytes | str]:
+    """Cached brand response, or None (always None without Redis)."""
+    if not settings.redis_url:
+        return None
+    return await cache_get(key)
+
+
+async def _brand_cache_set(key: str, body: bytes | str) -> None:
+    """Cache a serialized brand response; a no-op without Redis."""
+    if settings.redis_url:
+        await cache_set(key, body, _brand_cache_ttl())
+
+
+def _needs_mood_analysis(extracted: dict, confidence: float) -> bool:
+    """Whether the Gemini mood pass could still add anything to the extraction."""
+    return confidence < _AI_SKIP_CONFIDENCE or not all(
+        extracted.get(field) for field in _AI_REQUIRED_FIELDS
+    )
+
+
+def _brand_key(user_id: str, brand_id: str) -> str:
+    return f"brand:{user_id}:{brand_id}"
+
+
+def _default_brand_key(user_id: str) -> str:
+    return f"brand:default:{user_id}"
+
+
+def _brand_list_key(user_id: str) -> str:
+    return f"brands:list:{user_id}"
+
+
+def _brand_to_response(brand: Brand) -> BrandResponse:
+    """Build a BrandResponse from an ORM row.
+
+    Column types already match the schema, so unless TRUST_ORM_TYPES is off
+    the model is constructed without running validation.
+    """
+    if not settings.trust_orm_types:
+        return BrandResponse.model_validate(brand)
+    return BrandResponse.model_construct(
+        **{field: getattr(brand, field) for field in BrandResponse.model_fields}
+    )
+
+
+def _json_response(body: bytes | str) -> Response:
+    """Return already-serialized JSON as-is (response_model still documents it)."""
+    return Response(content=body, media_type="application/json")
+
+
+async def _get_brand_json(db: AsyncSession, user_id: str, brand_id: str) -> bytes | str:
+    """Serialized BrandResponse for one of the user's brands, cached (404 if not owned)."""
+    key = _brand_key(user_id, brand_id)
+    cached = await _brand_cache_get(key)
+    if cached is not None:
+        return cached
     
-    if brand.mood:
-        parts.append(f"{brand.mood} aesthetic")
-    if brand.style:
-        parts.append(f"{brand.style} style")
-    if brand.primary_color:
-        parts.append(f"featuring {brand.primary_color} as primary color")
-    if brand.secondary_color:
-        parts.append(f"with {brand.secondary_color} accents")
-    if brand.industry:
-        parts.append(f"suitable for {brand.industry} industry")
-    if brand.target_audience:
-        parts.append(f"targeting {brand.target_audience}")
+    brand = await db.get(Brand, brand_id)
     
-    if not parts:
-        return "Clean, professional product photography"
+    if not brand or brand.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Brand not found")
     
-    return "Product mockup with " + ", ".join(parts)
+    body = _brand_to_response(brand).model_dump_json()
+    await _brand_cache_set(key, body)
+    return body
+
+
+async def _get_brand_response(db: AsyncSession, user_id: str, brand_id: str) -> BrandResponse:
+    """Load one of the user's brands as a BrandResponse (see _get_brand_json)."""
+    return BrandResponse.model_validate_json(await _get_brand_json(db, user_id, brand_id))
+
+
+async def _commit_and_invalidate(db: AsyncSession, user_id: str, *brand_ids: str) -> None:
+    """Commit brand writes, then drop the cached responses they affect.
+
+    Committing first keeps another request from re-caching the old row
+    between the cache delete and the commit.
+    """
+    await db.commit()
+    await cache_delete(
+        _brand_list_key(user_id),
+        _default_brand_key(user_id),
+        *(_brand_key(user_id, brand_id) for brand_id in brand_ids),
+    )
+
+
+def _build_prompt_description(get, fields: tuple[str, ...]) -> str:
+    """Join the templated phrases for whichever of ``fields`` are set."""
+    parts = ", ".join(
+        _PROMPT_PHRASES[field].format(value) for field in fields if (value := get(field))
+    )
+    return f"Product mockup with {parts}" if parts else _DEFAULT_PROMPT_DESCRIPTION
+
+
+def _brand_values(brand: BrandCreate, user_id: str) -> dict:
+    """Column values for a new brand, including the derived prompt fields."""
+    return dict(
+        user_id=user_id,
+        name=brand.name,
+        description=brand.description,
+        website_url=brand.website_url,
+        primary_color=brand.primary_color,
+        secondary_color=brand.secondary_color,
+        accent_color=brand.accent_color,
+        background_color=brand.background_color,
+        color_palette=brand.color_palette,
+        primary_font=brand.primary_font,
+        secondary_font=brand.secondary_font,
+        font_style=brand.font_style,
+        mood=brand.mood,
+        style=brand.style,
+        industry=brand.industry,
+        target_audience=brand.target_audience,
+        prompt_description=_generate_prompt_description(brand),
+        suggested_scenes=list(_get_suggested_scenes(brand.mood, brand.style, brand.industry)),
+        preferred_lighting=brand.preferred_lighting or _get_preferred_lighting(brand.mood),
+        is_default=brand.is_default,
+        is_extracted=False,
+    )
+
+
+def _generate_prompt_description(brand: BrandCreate) -> str:
+    """Generate an AI prompt description from brand attributes."""
+    return _build_prompt_description(
+        lambda field: getattr(brand, field), _PROMPT_FIELDS + ("target_audience",)
+    )
 
 
 def _generate_prompt_description_from_brand(brand: Brand) -> str:
     """Generate prompt description from existing brand model."""
-    parts = []
-    
-    if brand.mood:
-        parts.append(f"{brand.mood} aesthetic")
-    if brand.style:
-        parts.append(f"{brand.style} style")
-    if brand.primary_color:
-        parts.append(f"featuring {brand.primary_color} as primary color")
-    if brand.secondary_color:
-        parts.append(f"with {brand.secondary_color} accents")
-    if brand.industry:
-        parts.append(f"suitable for {brand.industry} industry")
-    
-    if not parts:
-        return "Clean, professional product photography"
-    
-    return "Product mockup with " + ", ".join(parts)
+    return _build_prompt_description(lambda field: getattr(brand, field), _PROMPT_FIELDS)
 
 
 def _generate_prompt_description_dict(data: dict) -> str:
     """Generate prompt description from dictionary."""
-    parts = []
-    
-    if data.get("mood"):
-        parts.append(f"{data['mood']} aesthetic")
-    if data.get("style"):
-        parts.append(f"{data['style']} style")
-    if data.get("primary_color"):
-        parts.append(f"featuring {data['primary_color']} as primary color")
-    if data.get("industry"):
-        parts.append(f"suitable for {data['industry']} industry")
-    
-    if not parts:
-        return "Clean, professional product photography"
-    
-    return "Product mockup with " + ", ".join(parts)
+    return _build_prompt_description(data.get, _EXTRACTED_PROMPT_FIELDS)
 
 
-def _get_suggested_scenes(mood: Optional[str], style: Optional[str], industry: Optional[str]) -> List[str]:
+def _get_suggested_scenes(mood: Optional[str], style: Optional[str], industry: Optional[str]) -> tuple[str, ...]:
     """Get suggested scene templates based on brand attributes."""
-    scenes = []
-    
-    # Industry-based suggestions
-    industry_scenes = {
-        "tech": ["lifestyle-desk", "studio-white", "premium-dark"],
-        "beauty": ["lifestyle-bathroom", "premium-marble", "social-instagram"],
-        "food": ["lifestyle-kitchen", "lifestyle-cafe", "outdoor-nature"],
-        "fashion": ["outdoor-urban", "studio-colored", "social-instagram"],
-        "home": ["lifestyle-living-room", "lifestyle-bedroom", "studio-white"],
-        "fitness": ["outdoor-nature", "studio-white", "outdoor-urban"],
-        "jewelry": ["premium-velvet", "premium-marble", "premium-dark"],
-        "electronics": ["lifestyle-desk", "studio-gray", "premium-dark"],
-    }
-    
-    if industry and industry.lower() in industry_scenes:
-        scenes.extend(industry_scenes[industry.lower()])
-    
-    # Mood-based additions
-    mood_scenes = {
-        "luxury": ["premium-dark", "premium-marble", "premium-velvet"],
-        "minimal": ["studio-white", "studio-gray", "lifestyle-desk"],
-        "playful": ["studio-colored", "social-instagram", "outdoor-nature"],
-        "professional": ["studio-white", "lifestyle-desk", "ecommerce-amazon"],
-        "elegant": ["premium-marble", "premium-velvet", "studio-gradient"],
-        "bold": ["studio-colored", "premium-dark", "outdoor-urban"],
-    }
-    
-    if mood and mood.lower() in mood_scenes:
-        for scene in mood_scenes[mood.lower()]:
-            if scene not in scenes:
-                scenes.append(scene)
-    
-    # Default scenes if none matched
-    if not scenes:
-        scenes = ["studio-white", "lifestyle-desk", "ecommerce-amazon", "social-instagram"]
-    
-    return scenes[:6]  # Return top 6
+    return _suggested_scenes(mood or "", industry or "")
+
+
+@lru_cache(maxsize=1024)
+def _suggested_scenes(mood: str, industry: str) -> tuple[str, ...]:
+    # Industry scenes first, then mood additions, without duplicates
+    scenes = dict.fromkeys(chain(_INDUSTRY_SCENES.get(industry, ()), _MOOD_SCENES.get(mood, ())))
+    return tuple(islice(scenes, 6)) or _DEFAULT_SCENES
+
+
+def _merge_palettes(*palettes, limit: int = 8) -> List[str]:
+    """Combine color palettes, dropping duplicates but keeping first-seen order."""
+    merged = dict.fromkeys(color for palette in palettes for color in palette)
+    return list(merged)[:limit]
 
 
 def _get_preferred_lighting(mood: Optional[str]) -> str:
     """Get preferred lighting based on brand mood."""
-    lighting_map = {
-        "luxury": "dramatic",
-        "minimal": "soft",
-        "playful": "bright",
-        "professional": "studio",
-        "elegant": "soft",
-        "bold": "dramatic",
-        "casual": "natural",
-        "organic": "natural",
-        "tech": "studio",
-        "vintage": "warm",
-    }
-    
-    if mood and mood.lower() in lighting_map:
-        return lighting_map[mood.lower()]
-    
-    return "natural"
-
-
-def _enhance_prompt_with_brand(base_prompt: str, brand: Brand) -> tuple[str, dict]:
-    """Enhance a scene prompt with brand attributes."""
-    attributes_applied = {}
-    enhancements = []
-    
-    # Add color influence
-    if brand.primary_color:
-        enhancements.append(f"Color scheme influenced by {brand.primary_color}")
-        attributes_applied["primary_color"] = brand.primary_color
-    
-    if brand.secondary_color:
-        enhancements.append(f"accent elements in {brand.secondary_color}")
-        attributes_applied["secondary_color"] = brand.secondary_color
-    
-    # Add mood influence
-    if brand.mood:
-        mood_descriptions = {
-            "luxury": "luxurious, high-end feel with rich textures",
-            "minimal": "clean, minimalist aesthetic with negative space",
-            "playful": "vibrant, energetic atmosphere",
-            "professional": "polished, business-appropriate setting",
-            "elegant": "sophisticated, refined elegance",
-            "bold": "striking, confident visual impact",
-            "organic": "natural, earthy elements",
-            "tech": "sleek, modern technology aesthetic",
+    return _LIGHTING_BY_MOOD.get(mood or "", "natural")
+
+
+@lru_cache(maxsize=1024)
+def _scene_suggestions(scene_ids: tuple[str, ...], mood: Optional[str]) -> tuple[dict, ...]:
+    """Suggestion entries for a brand's scene IDs (only depends on the IDs and mood)."""
+    templates = get_templates(scene_ids)
+    return tuple(
+        {
+            "template_id": scene_id,
+            "name": templates[scene_id].name,
+            "description": templates[scene_id].description,
+            "reason": _get_scene_reason(scene_id, mood),
+            "relevance": round(1.0 - (i * 0.1), 2),
         }
-        mood_desc = mood_descriptions.get(brand.mood.lower(), f"{brand.mood} aesthetic")
-        enhancements.append(mood_desc)
-        attributes_applied["mood"] = brand.mood
-    
-    # Add lighting preference
-    if brand.preferred_lighting:
-        lighting_descriptions = {
-            "dramatic": "dramatic lighting with strong shadows",
-            "soft": "soft, diffused lighting",
-            "bright": "bright, even illumination",
-            "studio": "professional studio lighting",
-            "natural": "natural daylight",
-            "warm": "warm, golden hour lighting",
-        }
-        light_desc = lighting_descriptions.get(
-            brand.preferred_lighting.lower(),
-            f"{brand.preferred_lighting} lighting"
-        )
-        enhancements.append(light_desc)
-        attributes_applied["lighting"] = brand.preferred_lighting
-    
-    # Build enhanced prompt
-    if enhancements:
-        enhanced = f"{base_prompt}. Brand styling: {', '.join(enhancements)}."
-    else:
-        enhanced = base_prompt
-    
-    return enhanced, attributes_applied
+        for i, scene_id in enumerate(scene_ids)
+        if scene_id in templates
+    )
 
 
-def _get_scene_reason(scene_id: str, brand: Brand) -> str:
+def _get_scene_reason(scene_id: str, mood: Optional[str]) -> str:
     """Generate a reason why this scene matches the brand."""
-    reasons = {
-        "studio-white": "Clean backdrop complements your brand's clarity",
-        "studio-gray": "Neutral setting lets your brand colors stand out",
-        "studio-colored": "Vibrant background matches your brand energy",
-        "lifestyle-desk": "Professional workspace aligns with your audience",
-        "lifestyle-kitchen": "Lifestyle context resonates with your industry",
-        "lifestyle-bathroom": "Self-care setting suits your beauty brand",
-        "premium-dark": "Dramatic backdrop elevates your luxury positioning",
-        "premium-marble": "Elegant surface matches your sophisticated style",
-        "premium-velvet": "Rich texture complements your premium brand",
-        "outdoor-nature": "Natural setting aligns with your organic values",
-        "outdoor-urban": "Urban edge matches your bold aesthetic",
-        "social-instagram": "Optimized for your social media presence",
-        "ecommerce-amazon": "Marketplace-ready for your sales channels",
-    }
-    
-    base_reason = reasons.get(scene_id, "Great match for your brand")
+    base_reason = _SCENE_REASONS.get(scene_id, "Great match for your brand")
     
-    if brand.mood:
-        base_reason = f"{base_reason} ({brand.mood} mood)"
+    if mood:
+        base_reason = f"{base_reason} ({mood} mood)"
     
     return base_reason
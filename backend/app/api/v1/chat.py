@@ -1,21 +1,27 @@
 """Chat API endpoints for conversational mockup refinement."""
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
-from typing import List
+from sqlalchemy import func, select
+from sqlalchemy.orm import contains_eager, selectinload
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import re
 
 from app.api.deps import get_current_active_user
-from app.core.database import get_db
-from app.core.storage import get_image, save_image
-from app.core.gemini import gemini_client
-from app.core.utils import get_image_url
+from app.core.database import get_db, strict_loading
+from app.core.cache import cache_get, cache_set, coalesce
+from app.core.storage import get_full_path, get_image, save_image
+from app.core.gemini import REFINE_HISTORY_BLOCK, gemini_client, history_window_size
+from app.core.utils import content_etag, get_image_url, static_json_response
 from app.models import Mockup, ChatSession, ChatMessage, User
 from app.schemas import (
     ChatSessionCreate,
     ChatMessageRequest,
     ChatMessageResponse,
     ChatSessionResponse,
+    ChatSessionSummary,
     RefinementSuggestion,
     RefinementSuggestionsResponse,
 )
@@ -91,6 +97,33 @@ REFINEMENT_SUGGESTIONS = [
     ),
 ]
 
+# The suggestions never change at runtime, so serialize them once
+_SUGGESTIONS_JSON = RefinementSuggestionsResponse(
+    suggestions=REFINEMENT_SUGGESTIONS
+).model_dump_json().encode()
+_SUGGESTIONS_ETAG = content_etag(_SUGGESTIONS_JSON)
+
+# Assistant reply per refinement type (see _generate_response_text)
+_RESPONSE_TEMPLATES = {
+    "lighting": "I've adjusted the lighting: {description}",
+    "color": "I've modified the colors: {description}",
+    "background": "I've updated the background: {description}",
+    "surface": "I've changed the surface: {description}",
+    "style": "I've adjusted the style: {description}",
+    "position": "I've repositioned elements: {description}",
+    "add_element": "I've added elements: {description}",
+    "remove_element": "I've removed elements: {description}",
+    "other": "I've applied the changes: {description}",
+}
+_FALLBACK_RESPONSE_TEMPLATE = "Done! {description}"
+
+# Refined images are immutable files, so a (source image, instruction) hit
+# stays valid for as long as the file exists
+_REFINEMENT_CACHE_TTL = 60 * 60 * 24
+
+# Refinement cache key -> task producing (intent, refined path or None)
+_inflight_refinements: Dict[str, "asyncio.Future[Tuple[dict, Optional[str]]]"] = {}
+
 
 @router.post("/sessions", response_model=ChatSessionResponse)
 async def create_chat_session(
@@ -105,44 +138,33 @@ async def create_chat_session(
     - Initializes conversation with the mockup image
     - Returns session with initial state
     """
-    # Get the mockup
-    result = await db.execute(
-        select(Mockup).where(
+    # Only the mockup's image is needed to seed the session
+    image_path = await db.scalar(
+        select(Mockup.image_path).where(
             Mockup.id == request.mockup_id,
             Mockup.user_id == current_user.id,
         )
     )
-    mockup = result.scalar_one_or_none()
 
-    if not mockup:
+    if image_path is None:
         raise HTTPException(status_code=404, detail="Mockup not found")
 
-    # Create session
+    # Create session with its system message attached through the
+    # relationship, so the flush assigns session_id and the collection is
+    # already populated in memory (no refresh or reload needed)
     session = ChatSession(
-        mockup_id=mockup.id,
-        current_image_path=mockup.image_path,
+        mockup_id=request.mockup_id,
+        current_image_path=image_path,
+        messages=[
+            ChatMessage(
+                role="system",
+                content="Chat session started. You can now refine your mockup using natural language.",
+                image_path=image_path,
+            )
+        ],
     )
     db.add(session)
-
-    # Add system message
-    system_msg = ChatMessage(
-        session_id=session.id,
-        role="system",
-        content="Chat session started. You can now refine your mockup using natural language.",
-        image_path=mockup.image_path,
-    )
-    db.add(system_msg)
-
     await db.flush()
-    await db.refresh(session)
-
-    # Load messages
-    result = await db.execute(
-        select(ChatSession)
-        .where(ChatSession.id == session.id)
-        .options(selectinload(ChatSession.messages))
-    )
-    session = result.scalar_one()
 
     return _build_session_response(session)
 
@@ -154,14 +176,7 @@ async def get_chat_session(
     current_user: User = Depends(get_current_active_user),
 ):
     """Get a chat session with all messages."""
-    result = await db.execute(
-        select(ChatSession)
-        .where(ChatSession.id == session_id)
-        .options(selectinload(ChatSession.messages))
-        .join(Mockup, Mockup.id == ChatSession.mockup_id)
-        .where(Mockup.user_id == current_user.id)
-    )
-    session = result.scalar_one_or_none()
+    session = await _get_owned_session(db, session_id, current_user.id)
 
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -183,15 +198,10 @@ async def send_message(
     - Uses AI to understand and apply the change
     - Returns the new message with refined image
     """
-    # Get session with messages
-    result = await db.execute(
-        select(ChatSession)
-        .where(ChatSession.id == session_id)
-        .join(Mockup, Mockup.id == ChatSession.mockup_id)
-        .where(Mockup.user_id == current_user.id)
-        .options(selectinload(ChatSession.messages))
+    # Only the recent history is needed, and only on a cache miss
+    session = await _get_owned_session(
+        db, session_id, current_user.id, with_messages=False
     )
-    session = result.scalar_one_or_none()
 
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -204,48 +214,47 @@ async def send_message(
     )
     db.add(user_msg)
 
-    # Parse refinement intent
-    intent = await gemini_client.parse_refinement_intent(request.content)
-
-    # Get current image
-    current_image = get_image(session.current_image_path)
-
-    # Build conversation history for context
-    history = [
-        {"role": msg.role, "content": msg.content}
-        for msg in session.messages
-        if msg.role in ("user", "assistant")
-    ]
-
-    # Refine the mockup
-    refined_image = await gemini_client.refine_mockup(
-        current_image=current_image,
-        refinement_instruction=request.content,
-        conversation_history=history,
-    )
-
-    if not refined_image:
-        # If refinement failed, add error message
-        error_msg = ChatMessage(
-            session_id=session.id,
-            role="assistant",
-            content="I couldn't apply that refinement. Please try a different instruction.",
-        )
-        db.add(error_msg)
-        await db.flush()
-        await db.refresh(error_msg)
-
-        return ChatMessageResponse(
-            id=error_msg.id,
-            role=error_msg.role,
-            content=error_msg.content,
-            image_url=None,
-            refinement_type=None,
-            created_at=error_msg.created_at,
+    # Same instruction on the same image: reuse the earlier refinement
+    cache_key = _refinement_cache_key(session.current_image_path, request.content)
+    cached = await cache_get(cache_key)
+    if cached is not None:
+        cached = json.loads(cached)
+        if not get_full_path(cached["path"]).exists():
+            cached = None
+
+    if cached is not None:
+        intent = cached["intent"]
+        refined_path = cached["path"]
+    else:
+        # Build conversation history for context
+        history = await _recent_history(db, session.id)
+
+        # Identical refinements already in flight (e.g. a double-click)
+        # share one Gemini round trip instead of racing to write two images
+        intent, refined_path = await coalesce(
+            _inflight_refinements,
+            cache_key,
+            lambda: _refine(cache_key, session.current_image_path, request.content, history),
         )
 
-    # Save refined image
-    refined_path = save_image(refined_image, "refinements")
+        if refined_path is None:
+            # If refinement failed, add error message
+            error_msg = ChatMessage(
+                session_id=session.id,
+                role="assistant",
+                content="I couldn't apply that refinement. Please try a different instruction.",
+            )
+            db.add(error_msg)
+            await db.flush()
+
+            return ChatMessageResponse(
+                id=error_msg.id,
+                role=error_msg.role,
+                content=error_msg.content,
+                image_url=None,
+                refinement_type=None,
+                created_at=error_msg.created_at,
+            )
 
     # Update session's current image
     session.current_image_path = refined_path
@@ -263,7 +272,6 @@ async def send_message(
     db.add(assistant_msg)
 
     await db.flush()
-    await db.refresh(assistant_msg)
 
     return ChatMessageResponse(
         id=assistant_msg.id,
@@ -286,42 +294,41 @@ async def undo_last_refinement(
 
     Returns the previous state.
     """
-    result = await db.execute(
-        select(ChatSession)
-        .where(ChatSession.id == session_id)
-        .join(Mockup, Mockup.id == ChatSession.mockup_id)
-        .where(Mockup.user_id == current_user.id)
-        .options(selectinload(ChatSession.messages))
+    session = await _get_owned_session(
+        db, session_id, current_user.id, with_messages=False
     )
-    session = result.scalar_one_or_none()
 
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    # Find messages with images (excluding system)
-    image_messages = [
-        m for m in session.messages
-        if m.image_path and m.role != "system"
-    ]
+    # Image of the second-to-last non-system message that has one
+    previous_image_path = await db.scalar(
+        select(ChatMessage.image_path)
+        .where(
+            ChatMessage.session_id == session.id,
+            ChatMessage.image_path.is_not(None),
+            ChatMessage.role != "system",
+        )
+        .order_by(ChatMessage.created_at.desc())
+        .offset(1)
+        .limit(1)
+    )
 
-    if len(image_messages) < 2:
+    if previous_image_path is None:
         raise HTTPException(status_code=400, detail="Nothing to undo")
 
-    # Get the previous image
-    previous_msg = image_messages[-2]
-    session.current_image_path = previous_msg.image_path
+    session.current_image_path = previous_image_path
 
     # Add undo message
     undo_msg = ChatMessage(
         session_id=session.id,
         role="assistant",
         content="Reverted to previous version.",
-        image_path=previous_msg.image_path,
+        image_path=previous_image_path,
     )
     db.add(undo_msg)
 
     await db.flush()
-    await db.refresh(undo_msg)
 
     return ChatMessageResponse(
         id=undo_msg.id,
@@ -334,24 +341,44 @@ async def undo_last_refinement(
 
 
 @router.get("/suggestions", response_model=RefinementSuggestionsResponse)
-async def get_refinement_suggestions():
-    """Get pre-defined refinement suggestions for quick actions."""
-    return RefinementSuggestionsResponse(suggestions=REFINEMENT_SUGGESTIONS)
+async def get_refinement_suggestions(request: Request):
+    """
+    Get pre-defined refinement suggestions for quick actions.
+
+    Send the returned ETag as If-None-Match to get an empty 304.
+    """
+    return static_json_response(request, _SUGGESTIONS_JSON, _SUGGESTIONS_ETAG)
 
 
-@router.get("/sessions", response_model=List[ChatSessionResponse])
+@router.get("/sessions", response_model=List[ChatSessionSummary])
 async def list_chat_sessions(
     mockup_id: str = None,
     limit: int = 20,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
-    """List chat sessions, optionally filtered by mockup."""
+    """
+    List chat sessions, optionally filtered by mockup.
+
+    Returns message counts only; fetch a session for its messages.
+    """
+    message_count = (
+        select(func.count())
+        .where(ChatMessage.session_id == ChatSession.id)
+        .correlate(ChatSession)
+        .scalar_subquery()
+    )
     query = (
-        select(ChatSession)
+        select(
+            ChatSession.id,
+            ChatSession.mockup_id,
+            ChatSession.current_image_path,
+            ChatSession.created_at,
+            ChatSession.updated_at,
+            message_count.label("message_count"),
+        )
         .join(Mockup, Mockup.id == ChatSession.mockup_id)
         .where(Mockup.user_id == current_user.id)
-        .options(selectinload(ChatSession.messages))
         .order_by(ChatSession.updated_at.desc())
         .limit(limit)
     )
@@ -360,9 +387,72 @@ async def list_chat_sessions(
         query = query.where(ChatSession.mockup_id == mockup_id)
 
     result = await db.execute(query)
-    sessions = result.scalars().all()
 
-    return [_build_session_response(s) for s in sessions]
+    return [
+        ChatSessionSummary(
+            id=row.id,
+            mockup_id=row.mockup_id,
+            current_image_url=get_image_url(row.current_image_path),
+            message_count=row.message_count,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+        )
+        for row in result
+    ]
+
+
+def _owned_sessions_query(user_id: str, with_messages: bool = True):
+    """
+    Chat sessions belonging to ``user_id``, with their messages.
+
+    The Mockup join that authorizes the session also populates
+    ``ChatSession.mockup``, so it costs no extra query.
+    """
+    options = [contains_eager(ChatSession.mockup)]
+    if with_messages:
+        options.append(selectinload(ChatSession.messages))
+    return (
+        select(ChatSession)
+        .join(ChatSession.mockup)
+        .where(Mockup.user_id == user_id)
+        .options(*options, *strict_loading())
+    )
+
+
+async def _get_owned_session(
+    db: AsyncSession, session_id: str, user_id: str, with_messages: bool = True
+) -> ChatSession | None:
+    result = await db.execute(
+        _owned_sessions_query(user_id, with_messages).where(ChatSession.id == session_id)
+    )
+    return result.unique().scalar_one_or_none()
+
+
+async def _recent_history(db: AsyncSession, session_id: str) -> List[dict]:
+    """
+    The user/assistant tail that refine_mockup keeps, oldest first.
+
+    Fetches at most one window of rows (plus the total count, which fixes
+    where the window starts) instead of replaying the whole session.
+    """
+    # no_autoflush: the pending message for this turn is not history yet.
+    # A turn's user and assistant rows share a flush (and so created_at);
+    # ordering by role breaks that tie as assistant-after-user.
+    with db.no_autoflush:
+        result = await db.execute(
+            select(ChatMessage.role, ChatMessage.content, func.count().over())
+            .where(
+                ChatMessage.session_id == session_id,
+                ChatMessage.role.in_(("user", "assistant")),
+            )
+            .order_by(ChatMessage.created_at.desc(), ChatMessage.role)
+            .limit(2 * REFINE_HISTORY_BLOCK - 1)
+        )
+    rows = result.all()
+    if not rows:
+        return []
+    keep = history_window_size(rows[0][2])
+    return [{"role": role, "content": content} for role, content, _ in reversed(rows[:keep])]
 
 
 def _build_session_response(session: ChatSession) -> ChatSessionResponse:
@@ -387,21 +477,59 @@ def _build_session_response(session: ChatSession) -> ChatSessionResponse:
     )
 
 
+async def _refine(
+    cache_key: str, image_path: str, instruction: str, history: List[dict]
+) -> Tuple[dict, Optional[str]]:
+    """
+    Run a refinement through Gemini and store the result.
+
+    Returns (intent, refined image path or None on failure). Runs as a
+    shared task, so it must not touch any request's DB session.
+    """
+    # Send the current image by File API reference when one is already
+    # cached; otherwise send it inline rather than waiting on an upload
+    image_file = await gemini_client.cached_image_file(image_path)
+    current_image = None if image_file else await asyncio.to_thread(get_image, image_path)
+
+    # The intent only shapes the reply text, so parse it while the
+    # mockup is being refined
+    intent, refined_image = await asyncio.gather(
+        gemini_client.parse_refinement_intent(instruction),
+        gemini_client.refine_mockup(
+            current_image=current_image,
+            refinement_instruction=instruction,
+            conversation_history=history,
+            image_file=image_file,
+        ),
+    )
+
+    if not refined_image:
+        return intent, None
+
+    # Save refined image
+    refined_path = await asyncio.to_thread(save_image, refined_image, "refinements")
+    # The next turn refines this image; upload it now so that turn can
+    # send a reference
+    gemini_client.upload_in_background(refined_path)
+    await cache_set(
+        cache_key,
+        json.dumps({"path": refined_path, "intent": intent}),
+        _REFINEMENT_CACHE_TTL,
+    )
+    return intent, refined_path
+
+
+def _refinement_cache_key(image_path: str, instruction: str) -> str:
+    """Key refinements by source image and case/punctuation-insensitive instruction."""
+    normalized = " ".join(re.sub(r"[^\w\s]", " ", instruction.lower()).split())
+    digest = hashlib.sha256(f"{image_path}\n{normalized}".encode()).hexdigest()
+    return f"chat_refine:{digest}"
+
+
 def _generate_response_text(intent: dict) -> str:
     """Generate a friendly response based on the refinement intent."""
     refinement_type = intent.get("type", "other")
     description = intent.get("description", "the requested changes")
 
-    responses = {
-        "lighting": f"I've adjusted the lighting: {description}",
-        "color": f"I've modified the colors: {description}",
-        "background": f"I've updated the background: {description}",
-        "surface": f"I've changed the surface: {description}",
-        "style": f"I've adjusted the style: {description}",
-        "position": f"I've repositioned elements: {description}",
-        "add_element": f"I've added elements: {description}",
-        "remove_element": f"I've removed elements: {description}",
-        "other": f"I've applied the changes: {description}",
-    }
-
-    return responses.get(refinement_type, f"Done! {description}")
+    template = _RESPONSE_TEMPLATES.get(refinement_type, _FALLBACK_RESPONSE_TEMPLATE)
+    return template.format(description=description)
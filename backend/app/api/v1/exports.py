@@ -1,5 +1,5 @@
 """Export endpoints for mockup downloads with platform optimization."""
-from fastapi import APIRouter, HTTPException, Depends, Response
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
@@ -9,13 +9,20 @@ import io
 
 from app.api.deps import get_current_active_user
 from app.core.database import get_db
-from app.core.utils import get_image_url
+from app.core.utils import content_etag, get_image_url, static_json_response
 from app.models import Mockup, User
 from app.services.export_service import export_service
 from app.services.usage_service import ensure_within_limits
 
 router = APIRouter()
 
+_CONTENT_TYPES = {
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "webp": "image/webp",
+}
+
 
 # Request/Response schemas
 class ExportRequest(BaseModel):
@@ -66,16 +73,22 @@ class ExportResponse(BaseModel):
     filename: Optional[str] = None
 
 
+# Presets are static, so the response body is encoded once at import
+_PRESETS_JSON = ExportPresetsResponse(
+    presets=export_service.get_presets(),
+    categories=export_service.get_presets_by_category(),
+).model_dump_json().encode()
+_PRESETS_ETAG = content_etag(_PRESETS_JSON)
+
+
 @router.get("/presets", response_model=ExportPresetsResponse)
-async def get_export_presets():
-    """Get all available export presets organized by category."""
-    presets = export_service.get_presets()
-    categories = export_service.get_presets_by_category()
-
-    return ExportPresetsResponse(
-        presets=presets,
-        categories=categories,
-    )
+async def get_export_presets(request: Request):
+    """
+    Get all available export presets organized by category.
+
+    Send the returned ETag as If-None-Match to get an empty 304.
+    """
+    return static_json_response(request, _PRESETS_JSON, _PRESETS_ETAG)
 
 
 @router.post("/single")
@@ -119,13 +132,7 @@ async def export_single(
         filename = f"mockup_{mockup.id[:8]}{preset_suffix}.{request.format}"
 
         # Determine content type
-        content_types = {
-            "png": "image/png",
-            "jpg": "image/jpeg",
-            "jpeg": "image/jpeg",
-            "webp": "image/webp",
-        }
-        content_type = content_types.get(request.format.lower(), "image/png")
+        content_type = _CONTENT_TYPES.get(request.format.lower(), "image/png")
 
         return Response(
             content=image_bytes,
@@ -156,45 +163,47 @@ async def export_batch(
     if len(request.mockup_ids) > 50:
         raise HTTPException(status_code=400, detail="Maximum 50 mockups per batch")
 
-    # Get mockups from database
+    # Get mockups from database (only the paths are needed, so plain rows
+    # instead of ORM objects)
     result = await db.execute(
-        select(Mockup).where(
+        select(Mockup.id, Mockup.image_path).where(
             Mockup.id.in_(request.mockup_ids),
             Mockup.user_id == current_user.id,
         )
     )
-    mockups = result.scalars().all()
+    paths_by_id = dict(result.all())
 
-    if not mockups:
+    if not paths_by_id:
         raise HTTPException(status_code=404, detail="No mockups found")
 
-    try:
-        await ensure_within_limits(db, current_user, "exports", increment=1)
-        # Get image paths
-        image_paths = [m.image_path for m in mockups]
-
-        # Export to ZIP
-        zip_bytes = await export_service.export_batch_to_zip(
-            image_paths=image_paths,
-            preset_id=request.preset_id,
-            format=request.format,
-            quality=request.quality,
-        )
-
-        # Generate filename
-        preset_suffix = f"_{request.preset_id}" if request.preset_id else ""
-        filename = f"mockups_batch{preset_suffix}.zip"
+    # ZIP entries follow the requested order, not the database's
+    image_paths = [
+        paths_by_id[mockup_id]
+        for mockup_id in dict.fromkeys(request.mockup_ids)
+        if mockup_id in paths_by_id
+    ]
+
+    await ensure_within_limits(db, current_user, "exports", increment=1)
+
+    # Stream the ZIP as each image is added instead of buffering it whole
+    zip_stream = export_service.stream_batch_to_zip(
+        image_paths=image_paths,
+        preset_id=request.preset_id,
+        format=request.format,
+        quality=request.quality,
+    )
 
-        return Response(
-            content=zip_bytes,
-            media_type="application/zip",
-            headers={
-                "Content-Disposition": f'attachment; filename="{filename}"',
-            },
-        )
+    # Generate filename
+    preset_suffix = f"_{request.preset_id}" if request.preset_id else ""
+    filename = f"mockups_batch{preset_suffix}.zip"
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Batch export failed: {str(e)}")
+    return StreamingResponse(
+        zip_stream,
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+        },
+    )
 
 
 @router.post("/multi-preset")
@@ -226,26 +235,22 @@ async def export_multi_preset(
     if not mockup:
         raise HTTPException(status_code=404, detail="Mockup not found")
 
-    try:
-        await ensure_within_limits(db, current_user, "exports", increment=1)
-        # Export to multiple presets
-        zip_bytes = await export_service.export_multi_preset(
-            image_path=mockup.image_path,
-            preset_ids=request.preset_ids,
-        )
+    await ensure_within_limits(db, current_user, "exports", increment=1)
 
-        filename = f"mockup_{mockup.id[:8]}_all_formats.zip"
+    zip_stream = export_service.stream_multi_preset(
+        image_path=mockup.image_path,
+        preset_ids=request.preset_ids,
+    )
 
-        return Response(
-            content=zip_bytes,
-            media_type="application/zip",
-            headers={
-                "Content-Disposition": f'attachment; filename="{filename}"',
-            },
-        )
+    filename = f"mockup_{mockup.id[:8]}_all_formats.zip"
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Multi-preset export failed: {str(e)}")
+    return StreamingResponse(
+        zip_stream,
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+        },
+    )
 
 
 @router.get("/download/{mockup_id}")
@@ -282,13 +287,7 @@ async def download_mockup(
         preset_suffix = f"_{preset_id}" if preset_id else ""
         filename = f"mockup_{mockup.id[:8]}{preset_suffix}.{format}"
 
-        content_types = {
-            "png": "image/png",
-            "jpg": "image/jpeg",
-            "jpeg": "image/jpeg",
-            "webp": "image/webp",
-        }
-        content_type = content_types.get(format.lower(), "image/png")
+        content_type = _CONTENT_TYPES.get(format.lower(), "image/png")
 
         return Response(
             content=image_bytes,
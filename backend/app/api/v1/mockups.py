@@ -1,120 +1,35 @@
 """Mockup generation endpoints."""
+import asyncio
+import hashlib
+
+import orjson
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import Response
+from PIL import Image
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import delete, insert, select
 from typing import Optional
 
 from app.api.deps import get_current_active_user
-from app.core.database import get_db
-from app.core.storage import get_image, save_image
-from app.core.gemini import gemini_client
+from app.config import settings
+from app.core.cache import coalesce
+from app.core.database import get_db, strict_loading
+from app.core.storage import save_image
+from app.core.gemini import gemini_client, mockup_batcher
 from app.core.compositor import compositor
-from app.core.scene_generator import get_template, build_customized_prompt
-from app.core.utils import get_image_url
-from app.models import Product, Mockup, Brand, User
-from app.schemas import MockupGenerateRequest, MockupResponse, MockupUpdateRequest
+from app.core.scene_generator import get_template, build_customized_prompt, enhance_prompt_with_brand
+from app.core.utils import IMAGE_URL_BASE, get_image_url
+from app.models import Product, Mockup, Brand, User, ChatSession, ChatMessage
+from app.schemas import MockupBatchGenerateRequest, MockupGenerateRequest, MockupResponse, MockupUpdateRequest
+from app.services.product_service import load_gemini_image
 from app.services.usage_service import ensure_within_limits
 
 router = APIRouter()
 
 
-def _enhance_prompt_with_brand(base_prompt: str, brand: Brand) -> tuple[str, dict]:
-    """Enhance a scene prompt with brand attributes."""
-    attributes_applied = {}
-    enhancements = []
-    
-    # Add color influence
-    if brand.primary_color:
-        enhancements.append(f"Color scheme influenced by {brand.primary_color}")
-        attributes_applied["primary_color"] = brand.primary_color
-    
-    if brand.secondary_color:
-        enhancements.append(f"accent elements in {brand.secondary_color}")
-        attributes_applied["secondary_color"] = brand.secondary_color
-    
-    # Add mood influence
-    if brand.mood:
-        mood_descriptions = {
-            "luxury": "luxurious, high-end feel with rich textures",
-            "minimal": "clean, minimalist aesthetic with negative space",
-            "playful": "vibrant, energetic atmosphere",
-            "professional": "polished, business-appropriate setting",
-            "elegant": "sophisticated, refined elegance",
-            "bold": "striking, confident visual impact",
-            "organic": "natural, earthy elements",
-            "tech": "sleek, modern technology aesthetic",
-        }
-        mood_desc = mood_descriptions.get(brand.mood.lower(), f"{brand.mood} aesthetic")
-        enhancements.append(mood_desc)
-        attributes_applied["mood"] = brand.mood
-    
-    # Add lighting preference
-    if brand.preferred_lighting:
-        lighting_descriptions = {
-            "dramatic": "dramatic lighting with strong shadows",
-            "soft": "soft, diffused lighting",
-            "bright": "bright, even illumination",
-            "studio": "professional studio lighting",
-            "natural": "natural daylight",
-            "warm": "warm, golden hour lighting",
-        }
-        light_desc = lighting_descriptions.get(
-            brand.preferred_lighting.lower(),
-            f"{brand.preferred_lighting} lighting"
-        )
-        enhancements.append(light_desc)
-        attributes_applied["lighting"] = brand.preferred_lighting
-    
-    # Build enhanced prompt
-    if enhancements:
-        enhanced = f"{base_prompt}. Brand styling: {', '.join(enhancements)}."
-    else:
-        enhanced = base_prompt
-    
-    return enhanced, attributes_applied
-
-
-@router.post("/generate", response_model=MockupResponse)
-async def generate_mockup(
-    request: MockupGenerateRequest,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
-):
-    """
-    Generate a mockup for a product.
-
-    - Takes product ID and scene template
-    - Supports customization (color, surface, lighting, angle)
-    - Supports brand DNA for consistent styling
-    - Uses AI to generate the mockup
-    - Saves and returns the result
-    """
-    # Get product
-    result = await db.execute(
-        select(Product).where(
-            Product.id == request.product_id,
-            Product.user_id == current_user.id,
-        )
-    )
-    product = result.scalar_one_or_none()
-
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-
-    # Get brand if specified
-    brand: Optional[Brand] = None
+def _scene_prompt(request: MockupGenerateRequest, brand: Optional[Brand]) -> tuple[str, Optional[dict]]:
+    """(scene prompt, brand details applied) for a generation request."""
     brand_applied = None
-    
-    if request.brand_id:
-        result = await db.execute(
-            select(Brand).where(
-                Brand.id == request.brand_id,
-                Brand.user_id == current_user.id,
-            )
-        )
-        brand = result.scalar_one_or_none()
-        if not brand:
-            raise HTTPException(status_code=404, detail="Brand not found")
 
     # Get scene template
     template = get_template(request.scene_template_id or "studio-white")
@@ -134,19 +49,51 @@ async def generate_mockup(
         scene_prompt = build_customized_prompt(template.id, customizations)
     else:
         scene_prompt = template.prompt
-    
+
     # Apply brand styling to prompt
     if brand:
-        scene_prompt, brand_applied = _enhance_prompt_with_brand(scene_prompt, brand)
+        scene_prompt, brand_applied = enhance_prompt_with_brand(scene_prompt, brand)
 
-    # Load product image (use processed if available)
-    image_path = product.processed_image_path or product.original_image_path
-    product_image = get_image(image_path)
+    return scene_prompt, brand_applied
 
-    # Try generating a background and performing smart compositing first
-    mockup_image = None
-    pipeline_used = "smart_composite"
 
+def _generation_params(request: MockupGenerateRequest, brand: Optional[Brand], pipeline: str) -> dict:
+    """Generation params stored on the mockup row."""
+    generation_params = {
+        "scene_template": request.scene_template_id,
+        "custom_prompt": request.custom_prompt,
+    }
+    if request.customization:
+        generation_params["customization"] = request.customization.model_dump()
+    if brand:
+        generation_params["brand_id"] = brand.id
+        generation_params["brand_name"] = brand.name
+    generation_params["pipeline"] = pipeline
+    return generation_params
+
+
+def _mockup_response(mockup: Mockup) -> MockupResponse:
+    return MockupResponse(
+        id=mockup.id,
+        product_id=mockup.product_id,
+        image_url=get_image_url(mockup.image_path),
+        scene_template_id=mockup.scene_template_id,
+        prompt_used=mockup.prompt_used,
+        brand_id=mockup.brand_id,
+        brand_applied=mockup.brand_applied,
+        canvas_data=mockup.canvas_data,
+        created_at=mockup.created_at,
+    )
+
+
+async def _generate_sequential(
+    product_image: Image.Image,
+    scene_prompt: str,
+    lighting_hint: Optional[str],
+    angle_hint: Optional[str],
+) -> tuple[Optional[Image.Image], str]:
+    """(mockup image, pipeline used), trying the direct AI mockup only after compositing fails."""
+    # Try generating a background and performing smart compositing first
     background_image = await gemini_client.generate_scene_image(
         scene_prompt=scene_prompt,
         product_image=product_image,
@@ -156,71 +103,275 @@ async def generate_mockup(
         mockup_image = await compositor.smart_composite(
             product=product_image,
             background=background_image,
-            lighting_hint=request.customization.lighting if request.customization else None,
-            angle_hint=request.customization.angle if request.customization else None,
+            lighting_hint=lighting_hint,
+            angle_hint=angle_hint,
         )
-    else:
-        pipeline_used = "ai-direct"
+        if mockup_image is not None:
+            return mockup_image, "smart_composite"
 
     # Fallback to direct AI mockup if background generation/compositing fails
-    if mockup_image is None:
-        mockup_image = await gemini_client.generate_mockup(
+    mockup_image = await mockup_batcher.generate_mockup(
+        product_image=product_image,
+        scene_description=scene_prompt,
+    )
+    return mockup_image, "ai-direct"
+
+
+async def _generate_speculative(
+    product_image: Image.Image,
+    scene_prompt: str,
+    lighting_hint: Optional[str],
+    angle_hint: Optional[str],
+) -> tuple[Optional[Image.Image], str]:
+    """
+    (mockup image, pipeline used), hedging the direct AI fallback.
+
+    Same choice as _generate_sequential (the composite wins whenever it
+    succeeds), but if background generation is still running after
+    speculative_hedge_ms the direct AI mockup is started alongside it, so a
+    failed background no longer costs a second full Gemini round trip.
+    The fallback is cancelled once the composite succeeds.
+    """
+    background_task = asyncio.create_task(gemini_client.generate_scene_image(
+        scene_prompt=scene_prompt,
+        product_image=product_image,
+    ))
+    direct_task: Optional[asyncio.Task] = None
+
+    def start_direct() -> asyncio.Task:
+        return asyncio.create_task(mockup_batcher.generate_mockup(
             product_image=product_image,
             scene_description=scene_prompt,
+        ))
+
+    try:
+        done, _ = await asyncio.wait({background_task}, timeout=settings.speculative_hedge_ms / 1000)
+        if not done:
+            direct_task = start_direct()
+
+        background_image = await background_task
+        if background_image:
+            mockup_image = await compositor.smart_composite(
+                product=product_image,
+                background=background_image,
+                lighting_hint=lighting_hint,
+                angle_hint=angle_hint,
+            )
+            if mockup_image is not None:
+                return mockup_image, "smart_composite"
+
+        if direct_task is None:
+            direct_task = start_direct()
+        return await direct_task, "ai-direct"
+    finally:
+        background_task.cancel()
+        if direct_task is not None:
+            direct_task.cancel()
+
+
+# Generation key -> in-flight (mockup path, pipeline) task, so concurrent
+# identical requests (double submits, client retries) share one Gemini run
+# (see coalesce).
+_inflight: dict[str, asyncio.Future] = {}
+
+
+def _generation_key(request: MockupGenerateRequest) -> str:
+    """Stable hash of everything that determines the generated image."""
+    payload = orjson.dumps(
+        {
+            "product_id": request.product_id,
+            "scene_template_id": request.scene_template_id,
+            "customization": request.customization.model_dump() if request.customization else None,
+            "brand_id": request.brand_id,
+            "custom_prompt": request.custom_prompt,
+        },
+        option=orjson.OPT_SORT_KEYS,
+    )
+    return hashlib.sha256(payload).hexdigest()
+
+
+async def _generate_and_save(
+    product_image: Image.Image,
+    scene_prompt: str,
+    lighting_hint: Optional[str],
+    angle_hint: Optional[str],
+) -> tuple[Optional[str], str]:
+    """(saved mockup path or None, pipeline used)."""
+    generate = _generate_speculative if settings.speculative_pipeline else _generate_sequential
+    mockup_image, pipeline_used = await generate(product_image, scene_prompt, lighting_hint, angle_hint)
+    if not mockup_image:
+        return None, pipeline_used
+    return await asyncio.to_thread(save_image, mockup_image, "mockups"), pipeline_used
+
+
+@router.post("/generate", response_model=MockupResponse)
+async def generate_mockup(
+    request: MockupGenerateRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Generate a mockup for a product.
+
+    - Takes product ID and scene template
+    - Supports customization (color, surface, lighting, angle)
+    - Supports brand DNA for consistent styling
+    - Uses AI to generate the mockup
+    - Saves and returns the result
+    """
+    # Get product
+    result = await db.execute(
+        select(Product).where(
+            Product.id == request.product_id,
+            Product.user_id == current_user.id,
         )
-        pipeline_used = "ai-direct"
+    )
+    product = result.scalar_one_or_none()
 
-    if not mockup_image:
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+
+    # Load the downscaled product image on a worker thread while the brand,
+    # if specified, is fetched. The product query can't join them: an
+    # AsyncSession runs one statement at a time.
+    brand: Optional[Brand]
+    brand, product_image = await asyncio.gather(
+        db.get(Brand, request.brand_id) if request.brand_id else asyncio.sleep(0),
+        load_gemini_image(product),
+    )
+
+    if request.brand_id and (not brand or brand.user_id != current_user.id):
+        raise HTTPException(status_code=404, detail="Brand not found")
+
+    scene_prompt, brand_applied = _scene_prompt(request, brand)
+
+    # Generate and save the mockup; identical concurrent requests share the
+    # image file but each still gets its own row below
+    lighting_hint = request.customization.lighting if request.customization else None
+    angle_hint = request.customization.angle if request.customization else None
+    mockup_path, pipeline_used = await coalesce(
+        _inflight,
+        _generation_key(request),
+        lambda: _generate_and_save(product_image, scene_prompt, lighting_hint, angle_hint),
+    )
+
+    if not mockup_path:
         raise HTTPException(
             status_code=500,
             detail="Failed to generate mockup. Please check your Gemini API key."
         )
 
-    # Save mockup
-    mockup_path = save_image(mockup_image, "mockups")
+    # Enforce usage limits
+    await ensure_within_limits(db, current_user, "mockups_generated", increment=1)
 
-    # Build generation params for storage
-    generation_params = {
-        "scene_template": request.scene_template_id,
-        "custom_prompt": request.custom_prompt,
+    # Create database record; RETURNING hands back id and created_at in
+    # the same round trip
+    mockup = await db.scalar(
+        insert(Mockup)
+        .values(
+            product_id=product.id,
+            user_id=current_user.id,
+            brand_id=brand.id if brand else None,
+            image_path=mockup_path,
+            scene_template_id=request.scene_template_id,
+            prompt_used=scene_prompt,
+            generation_params=_generation_params(request, brand, pipeline_used),
+            brand_applied=brand_applied,
+        )
+        .returning(Mockup)
+    )
+
+    return _mockup_response(mockup)
+
+
+@router.post("/generate/batch", response_model=list[MockupResponse])
+async def generate_mockup_batch(
+    batch: MockupBatchGenerateRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Generate several mockups in one call.
+
+    Products and brands are loaded in one query each, every prompt is built
+    up front, and the generations run concurrently through the direct AI
+    pipeline. Successful mockups are inserted in a single statement and
+    returned in request order; items whose generation failed are left out.
+    """
+    requests = batch.requests
+
+    product_ids = {r.product_id for r in requests}
+    products = {
+        p.id: p
+        for p in (await db.scalars(
+            select(Product).where(Product.id.in_(product_ids), Product.user_id == current_user.id)
+        )).all()
     }
-    if request.customization:
-        generation_params["customization"] = request.customization.model_dump()
-    if brand:
-        generation_params["brand_id"] = brand.id
-        generation_params["brand_name"] = brand.name
-    generation_params["pipeline"] = pipeline_used
+    if len(products) != len(product_ids):
+        raise HTTPException(status_code=404, detail="Product not found")
 
-    # Enforce usage limits
-    await ensure_within_limits(db, current_user, "mockups_generated", increment=1)
+    brand_ids = {r.brand_id for r in requests if r.brand_id}
+    brands: dict[str, Brand] = {}
+    if brand_ids:
+        brands = {
+            b.id: b
+            for b in (await db.scalars(
+                select(Brand).where(Brand.id.in_(brand_ids), Brand.user_id == current_user.id)
+            )).all()
+        }
+        if len(brands) != len(brand_ids):
+            raise HTTPException(status_code=404, detail="Brand not found")
 
-    # Create database record
-    mockup = Mockup(
-        product_id=product.id,
-        user_id=current_user.id,
-        brand_id=brand.id if brand else None,
-        image_path=mockup_path,
-        scene_template_id=request.scene_template_id,
-        prompt_used=scene_prompt,
-        generation_params=generation_params,
-        brand_applied=brand_applied,
+    # Each product image is read once, however many requests share it
+    product_images = dict(zip(
+        products,
+        await asyncio.gather(*(load_gemini_image(p) for p in products.values())),
+    ))
+
+    prompts = [_scene_prompt(r, brands.get(r.brand_id)) for r in requests]
+    images = await gemini_client.generate_mockups_batch(
+        items=[(product_images[r.product_id], prompt) for r, (prompt, _) in zip(requests, prompts)]
     )
-    db.add(mockup)
-    await db.flush()
-    await db.refresh(mockup)
 
-    return MockupResponse(
-        id=mockup.id,
-        product_id=mockup.product_id,
-        image_url=get_image_url(mockup.image_path),
-        scene_template_id=mockup.scene_template_id,
-        prompt_used=mockup.prompt_used,
-        brand_id=mockup.brand_id,
-        brand_applied=mockup.brand_applied,
-        canvas_data=mockup.canvas_data,
-        created_at=mockup.created_at,
+    generated = [
+        (r, prompt, applied, image)
+        for r, (prompt, applied), image in zip(requests, prompts, images)
+        if image is not None
+    ]
+    if not generated:
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to generate mockups. Please check your Gemini API key."
+        )
+
+    paths = await asyncio.gather(
+        *(asyncio.to_thread(save_image, image, "mockups") for *_, image in generated)
     )
 
+    # Enforce usage limits
+    await ensure_within_limits(db, current_user, "mockups_generated", increment=len(generated))
+
+    rows = [
+        {
+            "product_id": r.product_id,
+            "user_id": current_user.id,
+            "brand_id": r.brand_id,
+            "image_path": path,
+            "scene_template_id": r.scene_template_id,
+            "prompt_used": prompt,
+            "generation_params": _generation_params(r, brands.get(r.brand_id), "ai-direct"),
+            "brand_applied": applied,
+        }
+        for (r, prompt, applied, _), path in zip(generated, paths)
+    ]
+    # One multi-row INSERT ... RETURNING, rows back in request order
+    mockups = (await db.scalars(
+        insert(Mockup).returning(Mockup, sort_by_parameter_order=True),
+        rows,
+    )).all()
+
+    return [_mockup_response(m) for m in mockups]
+
 
 @router.get("/", response_model=list[MockupResponse])
 async def list_mockups(
@@ -231,8 +382,20 @@ async def list_mockups(
     current_user: User = Depends(get_current_active_user),
 ):
     """List mockups, optionally filtered by product or brand."""
+    # Plain rows: the list only maps columns into responses, so skip
+    # ORM object hydration (generation_params is not returned)
     query = (
-        select(Mockup)
+        select(
+            Mockup.id,
+            Mockup.product_id,
+            Mockup.image_path,
+            Mockup.scene_template_id,
+            Mockup.prompt_used,
+            Mockup.brand_id,
+            Mockup.brand_applied,
+            Mockup.canvas_data,
+            Mockup.created_at,
+        )
         .where(Mockup.user_id == current_user.id)
         .order_by(Mockup.created_at.desc())
         .limit(limit)
@@ -244,22 +407,25 @@ async def list_mockups(
         query = query.where(Mockup.brand_id == brand_id)
 
     result = await db.execute(query)
-    mockups = result.scalars().all()
-
-    return [
-        MockupResponse(
-            id=m.id,
-            product_id=m.product_id,
-            image_url=get_image_url(m.image_path),
-            scene_template_id=m.scene_template_id,
-            prompt_used=m.prompt_used,
-            brand_id=m.brand_id,
-            brand_applied=m.brand_applied,
-            canvas_data=m.canvas_data,
-            created_at=m.created_at,
-        )
-        for m in mockups
-    ]
+
+    # Columns already have the response types, so encode the rows directly;
+    # returning a Response skips response_model validation
+    base = IMAGE_URL_BASE
+    body = orjson.dumps([
+        {
+            "id": m.id,
+            "product_id": m.product_id,
+            "image_url": base + m.image_path,
+            "scene_template_id": m.scene_template_id,
+            "prompt_used": m.prompt_used,
+            "brand_id": m.brand_id,
+            "brand_applied": m.brand_applied,
+            "canvas_data": m.canvas_data,
+            "created_at": m.created_at,
+        }
+        for m in result
+    ])
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/{mockup_id}", response_model=MockupResponse)
@@ -270,24 +436,16 @@ async def get_mockup(
 ):
     """Get a specific mockup."""
     result = await db.execute(
-        select(Mockup).where(Mockup.id == mockup_id, Mockup.user_id == current_user.id)
+        select(Mockup)
+        .where(Mockup.id == mockup_id, Mockup.user_id == current_user.id)
+        .options(*strict_loading())
     )
     mockup = result.scalar_one_or_none()
 
     if not mockup:
         raise HTTPException(status_code=404, detail="Mockup not found")
 
-    return MockupResponse(
-        id=mockup.id,
-        product_id=mockup.product_id,
-        image_url=get_image_url(mockup.image_path),
-        scene_template_id=mockup.scene_template_id,
-        prompt_used=mockup.prompt_used,
-        brand_id=mockup.brand_id,
-        brand_applied=mockup.brand_applied,
-        canvas_data=mockup.canvas_data,
-        created_at=mockup.created_at,
-    )
+    return _mockup_response(mockup)
 
 
 @router.put("/{mockup_id}", response_model=MockupResponse)
@@ -310,20 +468,11 @@ async def update_mockup(
     if request.canvas_data is not None:
         mockup.canvas_data = request.canvas_data
 
+    # Nothing server-generated changes on update, so the in-memory row is
+    # already current; no refresh SELECT
     await db.flush()
-    await db.refresh(mockup)
 
-    return MockupResponse(
-        id=mockup.id,
-        product_id=mockup.product_id,
-        image_url=get_image_url(mockup.image_path),
-        scene_template_id=mockup.scene_template_id,
-        prompt_used=mockup.prompt_used,
-        brand_id=mockup.brand_id,
-        brand_applied=mockup.brand_applied,
-        canvas_data=mockup.canvas_data,
-        created_at=mockup.created_at,
-    )
+    return _mockup_response(mockup)
 
 
 @router.delete("/{mockup_id}")
@@ -332,14 +481,32 @@ async def delete_mockup(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
-    """Delete a mockup."""
+    """Delete a mockup and its chat sessions."""
+    # Chat history can't outlive its mockup (chat_sessions.mockup_id is
+    # NOT NULL); every statement is scoped to the user's own mockup
+    owned_mockup = (
+        select(Mockup.id)
+        .where(Mockup.id == mockup_id, Mockup.user_id == current_user.id)
+        .scalar_subquery()
+    )
+    owned_sessions = select(ChatSession.id).where(ChatSession.mockup_id == owned_mockup)
+    await db.execute(
+        delete(ChatMessage)
+        .where(ChatMessage.session_id.in_(owned_sessions))
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        delete(ChatSession)
+        .where(ChatSession.mockup_id == owned_mockup)
+        .execution_options(synchronize_session=False)
+    )
     result = await db.execute(
-        select(Mockup).where(Mockup.id == mockup_id, Mockup.user_id == current_user.id)
+        delete(Mockup)
+        .where(Mockup.id == mockup_id, Mockup.user_id == current_user.id)
+        .returning(Mockup.id)
     )
-    mockup = result.scalar_one_or_none()
 
-    if not mockup:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Mockup not found")
 
-    await db.delete(mockup)
     return {"message": "Mockup deleted", "id": mockup_id}
@@ -1,16 +1,20 @@
 """Product upload and management endpoints."""
+import orjson
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from PIL import Image
-import io
+import asyncio
+import os
+from typing import BinaryIO
 
 from app.core.database import get_db
 from app.api.deps import get_current_active_user
-from app.core.storage import save_upload, get_image, save_image
+from app.core.storage import get_image, open_upload_image, save_downscaled, save_image, save_upload_file
 from app.core.background_remover import remove_background
-from app.core.gemini import gemini_client
-from app.core.utils import get_image_url
+from app.core.gemini import GEMINI_IMAGE_MAX_SIZE, gemini_client
+from app.core.utils import IMAGE_URL_BASE, get_image_url
 from app.models import Product, User
 from app.schemas import ProductResponse
 from app.config import settings
@@ -18,6 +22,14 @@ from app.config import settings
 router = APIRouter()
 
 
+def _decode_and_normalize(fileobj: BinaryIO) -> Image.Image:
+    """Fully decode an uploaded file into an RGB or RGBA image."""
+    image = open_upload_image(fileobj)
+    if image.mode not in ("RGB", "RGBA"):
+        return image.convert("RGB")
+    return image
+
+
 @router.post("/upload", response_model=ProductResponse)
 async def upload_product(
     file: UploadFile = File(...),
@@ -36,25 +48,31 @@ async def upload_product(
     if not file.content_type or not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="File must be an image")
 
-    # Read and validate file
-    contents = await file.read()
-    if len(contents) > settings.max_upload_size:
+    # Validate size. Starlette has already spooled the body (to disk past
+    # 1 MB), so work from that file rather than copying it into memory.
+    file.file.seek(0, os.SEEK_END)
+    if file.file.tell() > settings.max_upload_size:
         raise HTTPException(status_code=400, detail="File too large (max 10MB)")
 
+    # Decoding, background removal and file writes all block, so they run
+    # on worker threads to keep the event loop serving other requests
     try:
-        # Load image
-        image = Image.open(io.BytesIO(contents))
-        if image.mode not in ("RGB", "RGBA"):
-            image = image.convert("RGB")
+        image = await asyncio.to_thread(_decode_and_normalize, file.file)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid image file")
 
-    # Save original
-    original_path = save_upload(contents, "products", file.filename or "upload.png")
+    # Save original, streamed from the spooled upload in chunks
+    original_path = await asyncio.to_thread(
+        save_upload_file, file.file, "products", file.filename or "upload.png"
+    )
 
     # Remove background
     processed_image = await remove_background(image)
-    processed_path = save_image(processed_image, "products")
+    # Along with a downscaled copy that mockup generation sends to Gemini
+    processed_path, gemini_path = await asyncio.gather(
+        asyncio.to_thread(save_image, processed_image, "products"),
+        asyncio.to_thread(save_downscaled, processed_image, "products", GEMINI_IMAGE_MAX_SIZE),
+    )
 
     # Analyze with AI
     analysis = await gemini_client.analyze_product(image)
@@ -73,12 +91,13 @@ async def upload_product(
         user_id=current_user.id,
         original_image_path=original_path,
         processed_image_path=processed_path,
+        gemini_preprocessed_path=gemini_path,
         category=analysis.get("category"),
         attributes=attributes,
     )
     db.add(product)
+    # created_at comes back with the INSERT (eager_defaults)
     await db.flush()
-    await db.refresh(product)
 
     return ProductResponse(
         id=product.id,
@@ -97,25 +116,36 @@ async def list_products(
     current_user: User = Depends(get_current_active_user),
 ):
     """List all products."""
-    result = await db.execute(
-        select(Product)
+    # Plain column rows: no identity-map bookkeeping for a read-only listing
+    products = await db.execute(
+        select(
+            Product.id,
+            Product.original_image_path,
+            Product.processed_image_path,
+            Product.category,
+            Product.attributes,
+            Product.created_at,
+        )
         .where(Product.user_id == current_user.id)
         .order_by(Product.created_at.desc())
         .limit(limit)
     )
-    products = result.scalars().all()
-
-    return [
-        ProductResponse(
-            id=p.id,
-            original_image_url=get_image_url(p.original_image_path),
-            processed_image_url=get_image_url(p.processed_image_path) if p.processed_image_path else None,
-            category=p.category,
-            attributes=p.attributes,
-            created_at=p.created_at,
-        )
+
+    # Columns already have the response types, so encode the rows directly;
+    # returning a Response skips response_model validation
+    base = IMAGE_URL_BASE
+    body = orjson.dumps([
+        {
+            "id": p.id,
+            "original_image_url": base + p.original_image_path,
+            "processed_image_url": base + p.processed_image_path if p.processed_image_path else None,
+            "category": p.category,
+            "attributes": p.attributes,
+            "created_at": p.created_at,
+        }
         for p in products
-    ]
+    ])
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
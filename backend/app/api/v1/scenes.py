@@ -1,6 +1,9 @@
 """Scene templates API endpoints."""
 import logging
-from fastapi import APIRouter, Query, Depends, HTTPException
+from functools import lru_cache
+
+import orjson
+from fastapi import APIRouter, Query, Depends, HTTPException, Request
 from typing import Optional, List
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -10,6 +13,9 @@ from app.core.scene_generator import (
     get_all_templates,
     get_templates_by_category,
     get_template,
+    get_template_ids_by_tags,
+    get_category_counts,
+    get_tag_counts,
     search_templates,
     get_categories,
     build_customized_prompt,
@@ -18,6 +24,7 @@ from app.core.scene_generator import (
     build_scene_suggestions,
 )
 from app.core.database import get_db
+from app.core.utils import content_etag, static_json_response
 from app.models import Product, Brand, Mockup
 
 router = APIRouter()
@@ -61,6 +68,82 @@ class SceneTemplateResponse(BaseModel):
         )
 
 
+@lru_cache(maxsize=None)
+def _template_response(template_id: str) -> SceneTemplateResponse:
+    """Response model for a template; templates are static, so built once per ID."""
+    return SceneTemplateResponse.from_template(get_template(template_id))
+
+
+# Pre-encoded JSON per template; list and detail responses are assembled
+# from these instead of validating and serializing models per request
+_TEMPLATE_JSON: dict[str, bytes] = {
+    t.id: orjson.dumps(_template_response(t.id).model_dump()) for t in get_all_templates()
+}
+_TEMPLATE_ETAGS = {tid: content_etag(body) for tid, body in _TEMPLATE_JSON.items()}
+
+# The whole catalog (popularity order) for clients that filter locally
+_CATALOG_JSON = b"[%s]" % b",".join(_TEMPLATE_JSON[t.id] for t in get_all_templates())
+_CATALOG_ETAG = content_etag(_CATALOG_JSON)
+
+
+# Category and tag bodies come straight from the scene_generator indexes
+_CATEGORIES_JSON = orjson.dumps({
+    "categories": get_categories(),
+    "counts": get_category_counts(),
+})
+_CATEGORIES_ETAG = content_etag(_CATEGORIES_JSON)
+
+_TAGS_JSON = orjson.dumps({
+    "tags": [{"name": tag, "count": count} for tag, count in get_tag_counts()],
+})
+_TAGS_ETAG = content_etag(_TAGS_JSON)
+
+
+@lru_cache(maxsize=1024)
+def _template_list_body(
+    category: Optional[str],
+    search: Optional[str],
+    tags: tuple[str, ...],
+    premium_only: bool,
+    limit: int,
+) -> tuple[bytes, str]:
+    """
+    (JSON body, ETag) for a template listing.
+
+    A pure function of the static template set, so each distinct filter
+    combination is encoded once per process.
+    """
+    # Get templates based on filters
+    if search:
+        templates = search_templates(search)
+    elif category:
+        try:
+            cat_enum = SceneCategory(category)
+            templates = get_templates_by_category(cat_enum)
+        except ValueError:
+            templates = get_all_templates()
+    else:
+        templates = get_all_templates()
+
+    # Apply tag filter
+    if tags:
+        tagged_ids = get_template_ids_by_tags(tags)
+        templates = [t for t in templates if t.id in tagged_ids]
+
+    # Apply premium filter
+    if premium_only:
+        templates = [t for t in templates if t.is_premium]
+
+    # Apply limit
+    templates = templates[:limit]
+
+    body = b'{"templates":[%s],"total":%d}' % (
+        b",".join(_TEMPLATE_JSON[t.id] for t in templates),
+        len(templates),
+    )
+    return body, content_etag(body)
+
+
 class CustomizeRequest(BaseModel):
     template_id: str
     color: Optional[str] = None
@@ -134,6 +217,7 @@ async def _get_trending_scenes(
 
 @router.get("/templates", response_model=dict)
 async def list_scene_templates(
+    request: Request,
     category: Optional[str] = Query(None, description="Filter by category"),
     search: Optional[str] = Query(None, description="Search templates"),
     tags: Optional[str] = Query(None, description="Comma-separated tags to filter by"),
@@ -148,86 +232,47 @@ async def list_scene_templates(
     - Filter by tags
     - Filter premium templates
     """
-    # Get templates based on filters
-    if search:
-        templates = search_templates(search)
-    elif category:
-        try:
-            cat_enum = SceneCategory(category)
-            templates = get_templates_by_category(cat_enum)
-        except ValueError:
-            templates = get_all_templates()
-    else:
-        templates = get_all_templates()
-
-    # Apply tag filter
-    if tags:
-        tag_list = [t.strip().lower() for t in tags.split(",")]
-        templates = [
-            t for t in templates
-            if any(tag in t.tags for tag in tag_list)
-        ]
+    # Normalize the filters so equivalent queries share a cache entry.
+    # Returning a Response skips response_model validation.
+    tag_key = tuple(sorted({t.strip().lower() for t in tags.split(",")})) if tags else ()
+    body, etag = _template_list_body(
+        category, search.lower() if search else None, tag_key, premium_only, limit
+    )
+    return static_json_response(request, body, etag)
 
-    # Apply premium filter
-    if premium_only:
-        templates = [t for t in templates if t.is_premium]
 
-    # Apply limit
-    templates = templates[:limit]
+@router.get("/catalog", response_model=List[SceneTemplateResponse])
+async def get_scene_catalog(request: Request):
+    """
+    Every scene template, most popular first.
 
-    return {
-        "templates": [SceneTemplateResponse.from_template(t) for t in templates],
-        "total": len(templates),
-    }
+    Static per deploy and served with an ETag, so clients can fetch it once
+    and filter/search locally instead of calling /templates per query.
+    """
+    return static_json_response(request, _CATALOG_JSON, _CATALOG_ETAG)
 
 
 @router.get("/templates/{template_id}", response_model=SceneTemplateResponse)
-async def get_scene_template(template_id: str):
+async def get_scene_template(template_id: str, request: Request):
     """Get details for a specific scene template including customization options."""
     template = get_template(template_id)
 
     if not template:
         return {"error": "Template not found"}
 
-    return SceneTemplateResponse.from_template(template)
+    return static_json_response(request, _TEMPLATE_JSON[template.id], _TEMPLATE_ETAGS[template.id])
 
 
 @router.get("/categories")
-async def list_categories():
+async def list_categories(request: Request):
     """List all scene categories with counts."""
-    categories = get_categories()
-    all_templates = get_all_templates()
-
-    category_counts = {}
-    for cat in categories:
-        count = len([t for t in all_templates if t.category.value == cat])
-        category_counts[cat] = count
-
-    return {
-        "categories": categories,
-        "counts": category_counts,
-    }
+    return static_json_response(request, _CATEGORIES_JSON, _CATEGORIES_ETAG)
 
 
 @router.get("/tags")
-async def list_tags():
+async def list_tags(request: Request):
     """List all unique tags across templates."""
-    all_templates = get_all_templates()
-    tags = set()
-    for template in all_templates:
-        tags.update(template.tags)
-
-    # Sort by frequency
-    tag_counts = {}
-    for tag in tags:
-        count = sum(1 for t in all_templates if tag in t.tags)
-        tag_counts[tag] = count
-
-    sorted_tags = sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)
-
-    return {
-        "tags": [{"name": t[0], "count": t[1]} for t in sorted_tags],
-    }
+    return static_json_response(request, _TAGS_JSON, _TAGS_ETAG)
 
 
 @router.post("/customize")
@@ -277,10 +322,13 @@ async def get_scene_suggestions(
     attributes = {}
     brand_context = {}
 
-    # Load product context when provided
+    # Load product context when provided (only the columns used here, not
+    # the whole row)
     if product_id:
-        product_result = await db.execute(select(Product).where(Product.id == product_id))
-        product = product_result.scalar_one_or_none()
+        product_result = await db.execute(
+            select(Product.category, Product.attributes).where(Product.id == product_id)
+        )
+        product = product_result.one_or_none()
         if not product:
             raise HTTPException(status_code=404, detail="Product not found")
 
@@ -289,10 +337,18 @@ async def get_scene_suggestions(
         if product.category and not product_category:
             product_category = product.category
 
-    # Load brand context
+    # Load brand context, likewise skipping colors, logo and the rest
     if brand_id:
-        brand_result = await db.execute(select(Brand).where(Brand.id == brand_id))
-        brand = brand_result.scalar_one_or_none()
+        brand_result = await db.execute(
+            select(
+                Brand.mood,
+                Brand.style,
+                Brand.industry,
+                Brand.preferred_lighting,
+                Brand.suggested_scenes,
+            ).where(Brand.id == brand_id)
+        )
+        brand = brand_result.one_or_none()
         if not brand:
             raise HTTPException(status_code=404, detail="Brand not found")
 
@@ -316,7 +372,7 @@ async def get_scene_suggestions(
 
     suggestions = [
         SceneSuggestionItem(
-            template=SceneTemplateResponse.from_template(item["template"]),
+            template=_template_response(item["template"].id),
             relevance=item["relevance"],
             reasons=[SceneSuggestionReason(**reason) for reason in item.get("reasons", [])],
             trending=item.get("trending", False),
@@ -1,8 +1,10 @@
 """Team management stubs for Agency tier."""
+from collections import defaultdict
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 
 from app.api.deps import get_current_active_user
 from app.core.database import get_db
@@ -20,8 +22,7 @@ class MemberResponse(BaseModel):
     email: str
     role: MembershipRole
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class TeamResponse(BaseModel):
@@ -30,8 +31,7 @@ class TeamResponse(BaseModel):
     role: MembershipRole
     members: list[MemberResponse] = []
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 def _require_agency(user: User):
@@ -72,38 +72,33 @@ async def list_teams(
 ):
     _require_agency(current_user)
 
+    # The caller's teams with their role in each...
     result = await db.execute(
-        select(TeamMembership).where(TeamMembership.user_id == current_user.id)
+        select(Team.id, Team.name, TeamMembership.role)
+        .join(TeamMembership, TeamMembership.team_id == Team.id)
+        .where(TeamMembership.user_id == current_user.id)
+    )
+    my_teams = result.all()
+    if not my_teams:
+        return []
+
+    # ...and the members of all of them in one more query, grouped here
+    # instead of one query per team
+    member_rows = await db.execute(
+        select(TeamMembership.team_id, TeamMembership.role, User.id.label("user_id"), User.email)
+        .join(User, User.id == TeamMembership.user_id)
+        .where(TeamMembership.team_id.in_([t.id for t in my_teams]))
     )
-    memberships = result.scalars().all()
-    team_ids = [m.team_id for m in memberships]
-
-    teams: list[TeamResponse] = []
-    if not team_ids:
-        return teams
-
-    result = await db.execute(select(Team).where(Team.id.in_(team_ids)))
-    db_teams = {t.id: t for t in result.scalars().all()}
-
-    for m in memberships:
-        team = db_teams.get(m.team_id)
-        if not team:
-            continue
-        member_rows = await db.execute(
-            select(TeamMembership, User)
-            .join(User, User.id == TeamMembership.user_id)
-            .where(TeamMembership.team_id == team.id)
+    members_by_team: defaultdict[str, list[MemberResponse]] = defaultdict(list)
+    for row in member_rows:
+        members_by_team[row.team_id].append(
+            MemberResponse(user_id=row.user_id, email=row.email, role=row.role)
         )
-        members = [
-            MemberResponse(
-                user_id=row.User.id,
-                email=row.User.email,
-                role=row.TeamMembership.role,
-            )
-            for row in member_rows
-        ]
-        teams.append(TeamResponse(id=team.id, name=team.name, role=m.role, members=members))
-    return teams
+
+    return [
+        TeamResponse(id=t.id, name=t.name, role=t.role, members=members_by_team[t.id])
+        for t in my_teams
+    ]
 
 
 class InviteRequest(BaseModel):
@@ -22,9 +22,56 @@ class Settings(BaseSettings):
 
     # Database (SQLite for MVP simplicity)
     database_url: str = "sqlite+aiosqlite:///./mockupai.db"
+    # Connection pool (ignored for SQLite). Sizes are per worker process:
+    # workers * (pool_size + max_overflow) must fit the server's max_connections
+    db_pool_size: int = 20
+    db_max_overflow: int = 40
+    db_pool_recycle: int = 1800
+    # Open pool_size connections at startup instead of on first use
+    db_pool_prewarm: bool = True
+    # Compiled SQL statements kept per engine (1200 is SQLAlchemy's default)
+    db_query_cache_size: int = 1200
+    # Prepared statements cached per asyncpg connection
+    db_statement_cache_size: int = 1024
+
+    # Raise instead of lazy-loading relationships on list/detail queries, so
+    # a missing eager load fails in dev/CI rather than becoming an N+1
+    raiseload_strict: bool = False
+
+    # Build API responses from ORM rows without re-running Pydantic validation
+    trust_orm_types: bool = True
+
+    # Redis (optional - per-process fallbacks are used when unset)
+    redis_url: str = ""
 
     # Gemini API
     gemini_api_key: str = ""
+    # Hedge background generation: if it has not finished after
+    # speculative_hedge_ms, start the direct-AI fallback alongside it instead
+    # of only after it fails. Lower worst-case latency, but every hedged
+    # request pays for a second Gemini call, so it is opt-in.
+    speculative_pipeline: bool = False
+    speculative_hedge_ms: int = 8000
+    # Collect direct-AI mockup calls for up to gemini_batch_window_ms and send
+    # them as one generate_mockups_batch (at most gemini_batch_max_items)
+    gemini_batch_enabled: bool = False
+    gemini_batch_window_ms: int = 30
+    gemini_batch_max_items: int = 16
+
+    # Processes per worker for CPU-bound scene compositing (0 = worker thread)
+    composite_workers: int = 2
+
+    # Background removal model (rembg)
+    rembg_model: str = "u2net"
+    # Run background removal on CUDA. Needs onnxruntime-gpu instead of
+    # onnxruntime; with several workers, pin each to a device through
+    # CUDA_VISIBLE_DEVICES. Falls back to CPU if the CUDA session fails.
+    enable_gpu: bool = False
+    # Concurrent background removals per worker; each inference already
+    # uses several ONNX Runtime threads
+    bg_workers: int = 2
+    # Matte large uploads at a bounded size and upsample only the alpha
+    bg_fast_mode: bool = True
 
     # Local storage (MVP - no S3 needed)
     upload_dir: Path = Path("uploads")
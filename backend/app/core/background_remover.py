@@ -1,52 +1,131 @@
 """Background removal service using rembg with post-processing refinements."""
-from PIL import Image, ImageFilter, ImageOps
-from rembg import remove
-import io
+from PIL import Image, ImageFilter
+from onnxruntime.capi.onnxruntime_pybind11_state import Fail as OrtFail
+from rembg import new_session, remove
+import asyncio
 import logging
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Dedicated pool: uploads queue here instead of filling the default executor
+# that every other asyncio.to_thread call (file IO, image loads) shares.
+# ONNX Runtime and numpy release the GIL, so threads are enough.
+_EXECUTOR = ThreadPoolExecutor(max_workers=settings.bg_workers, thread_name_prefix="rembg")
+
+# Longest side rembg (and its alpha matting) works at in fast mode. U2Net
+# predicts its mask at 320px anyway; matting cost grows with pixel count.
+BG_MATTING_MAX_SIZE = 1024
+
+
+@lru_cache(maxsize=1)
+def _rembg_session():
+    """
+    The rembg ONNX session, created on first use and shared by all calls.
+
+    Without one, every remove() loads the model and probes providers again.
+    A failed load is not cached, so the next upload retries.
+    """
+    if settings.enable_gpu:
+        try:
+            return new_session(
+                settings.rembg_model,
+                providers=["CUDAExecutionProvider", "CPUExecutionProvider"],
+            )
+        except OrtFail as e:
+            logger.warning("CUDA rembg session failed, using CPU: %s", e)
+    return new_session(settings.rembg_model, providers=["CPUExecutionProvider"])
+
+
+def _dilate(plane: np.ndarray, radius: int) -> np.ndarray:
+    """
+    Square max filter of side ``2 * radius + 1`` with edge replication.
+
+    Same result as ImageFilter.MaxFilter, but separable (a row pass then a
+    column pass), which is two orders of magnitude faster on large images.
+    """
+    height, width = plane.shape
+    padded = np.pad(plane, radius, mode="edge")
+    rows = padded[:, :width].copy()
+    for offset in range(1, 2 * radius + 1):
+        np.maximum(rows, padded[:, offset:offset + width], out=rows)
+    out = rows[:height].copy()
+    for offset in range(1, 2 * radius + 1):
+        np.maximum(out, rows[offset:offset + height], out=out)
+    return out
+
 
 def _refine_alpha(matte: Image.Image, original: Image.Image) -> Image.Image:
     """Feather edges, rescue glass/reflective areas, and keep soft shadows."""
     if matte.mode != "RGBA":
         matte = matte.convert("RGBA")
-    if original.mode != "RGBA":
-        original = original.convert("RGBA")
 
+    # Each step works in place on one float32 alpha plane and reads the
+    # original as uint8, so a 2K image is not re-materialised per pass.
     r, g, b, alpha = matte.split()
-    alpha_np = np.array(alpha).astype(np.float32)
 
-    # Feather edges to avoid harsh cutouts
-    feathered = Image.fromarray(alpha_np).filter(ImageFilter.GaussianBlur(radius=1.5))
-    alpha_np = np.array(feathered).astype(np.float32)
+    # Feather edges to avoid harsh cutouts (blurred as 8-bit: Pillow has no
+    # Gaussian blur for float images)
+    alpha_np = np.asarray(alpha.filter(ImageFilter.GaussianBlur(radius=1.5)), dtype=np.float32)
 
     # Recover highlights on transparent/glass products by lifting alpha where
-    # the product is bright but got cut too aggressively.
-    original_np = np.array(original.convert("RGB")).astype(np.float32)
-    brightness = original_np.mean(axis=2)
-    glass_mask = (brightness > 200) & (alpha_np < 120)
-    alpha_np = np.where(glass_mask, alpha_np * 0.4 + 80, alpha_np)
-
-    # Re-introduce soft contact shadows near the product footprint
-    alpha_img = Image.fromarray(alpha_np.astype(np.uint8))
-    dilated = alpha_img.filter(ImageFilter.MaxFilter(size=5))
-    dilated_np = np.array(dilated).astype(np.float32) / 255.0
-    gray = ImageOps.grayscale(original)
-    gray_np = np.array(gray).astype(np.float32) / 255.0
-    shadow_candidates = (1.0 - dilated_np) * (0.6 - gray_np)
-    shadow_mask = np.clip(shadow_candidates * 255 * 0.5, 0, 50)
-    alpha_np = np.clip(alpha_np + shadow_mask, 0, 255)
+    # the product is bright (mean channel > 200) but got cut too aggressively.
+    # RGB(A) originals are read band by band, without an RGB copy.
+    if original.mode not in ("RGB", "RGBA"):
+        original = original.convert("RGB")
+    red, green, blue = (np.asarray(original.getchannel(band), dtype=np.uint16) for band in "RGB")
+    brightness_sum = red + green + blue
+    glass_mask = (brightness_sum > 600) & (alpha_np < 120)
+    alpha_np[glass_mask] = alpha_np[glass_mask] * 0.4 + 80
+
+    # Re-introduce soft contact shadows near the product footprint:
+    # (1 - dilated) * (0.6 - gray) * 127.5, clipped to [0, 50], on 0-255 inputs
+    shadow = _dilate(alpha_np.astype(np.uint8), 2).astype(np.float32)
+    np.subtract(255.0, shadow, out=shadow)
+    gray = np.asarray(original.convert("L"), dtype=np.float32)
+    np.subtract(0.6 * 255.0, gray, out=gray)
+    shadow *= gray
+    shadow *= 127.5 / (255.0 * 255.0)
+    np.clip(shadow, 0, 50, out=shadow)
+
+    alpha_np += shadow
+    np.minimum(alpha_np, 255, out=alpha_np)
 
     refined_alpha = Image.fromarray(alpha_np.astype(np.uint8))
     return Image.merge("RGBA", (r, g, b, refined_alpha))
 
 
+def _upscale_matte(matte: Image.Image, original: Image.Image) -> Image.Image:
+    """
+    Full-size cutout from a matte computed on a downscaled copy.
+
+    Only the alpha is upsampled; colours come from the original, so no
+    detail is lost. Fully transparent pixels are black, as in rembg's own
+    cutouts (the contact shadow added by _refine_alpha relies on that).
+    """
+    alpha = np.asarray(matte.getchannel("A").resize(original.size, Image.Resampling.BICUBIC))
+    cutout = np.array(original.convert("RGBA"))
+    cutout[..., 3] = alpha
+    cutout[alpha == 0, :3] = 0
+    return Image.fromarray(cutout)
+
+
 async def remove_background(image: Image.Image) -> Image.Image:
+    """Remove background from a product image on the background-removal pool."""
+    return await asyncio.get_running_loop().run_in_executor(_EXECUTOR, remove_background_sync, image)
+
+
+def remove_background_sync(image: Image.Image) -> Image.Image:
     """
     Remove background from a product image.
 
+    CPU-bound (rembg inference plus numpy post-processing); async callers
+    should go through remove_background.
+
     Args:
         image: PIL Image with product
 
@@ -54,22 +133,32 @@ async def remove_background(image: Image.Image) -> Image.Image:
         PIL Image with transparent background
     """
     try:
-        # Convert to bytes for rembg
-        img_byte_arr = io.BytesIO()
-        image.save(img_byte_arr, format="PNG")
-        img_bytes = img_byte_arr.getvalue()
+        source = image if image.mode in ("RGB", "RGBA") else image.convert("RGB")
+        scale = BG_MATTING_MAX_SIZE / max(image.size)
+        if settings.bg_fast_mode and scale < 1:
+            source = source.resize(
+                (max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+                Image.Resampling.LANCZOS,
+            )
+
+        # Hand rembg raw pixels rather than PNG bytes: no encode/decode
+        # round trip, and (as with PNG) no EXIF rotation of the matte
+        pixels = np.asarray(source)
 
         # Remove background with alpha matting to keep fine details
-        output_bytes = remove(
-            img_bytes,
+        output = remove(
+            pixels,
+            session=_rembg_session(),
             alpha_matting=True,
             alpha_matting_foreground_threshold=240,
             alpha_matting_background_threshold=10,
             alpha_matting_erode_size=10,
         )
 
-        # Convert back to PIL Image and refine mask
-        matte = Image.open(io.BytesIO(output_bytes)).convert("RGBA")
+        # Back to a PIL Image (RGBA array) at full size and refine mask
+        matte = Image.fromarray(output).convert("RGBA")
+        if matte.size != image.size:
+            matte = _upscale_matte(matte, image)
         return _refine_alpha(matte, image)
 
     except Exception as e:
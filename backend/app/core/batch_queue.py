@@ -5,6 +5,8 @@ MVP implementation using asyncio for simplicity.
 Can be migrated to Redis + Celery/ARQ for production scaling.
 """
 import asyncio
+import bisect
+import itertools
 import uuid
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Callable, Awaitable
@@ -44,6 +46,10 @@ class BatchJob:
     completed_at: Optional[datetime] = None
     error: Optional[str] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # Creation order and update counter, maintained by BatchQueue
+    seq: int = field(default=0, repr=False, compare=False)
+    version: int = field(default=0, repr=False, compare=False)
+    _dict_cache: Optional[tuple] = field(default=None, repr=False, compare=False)
 
     @property
     def progress(self) -> float:
@@ -57,8 +63,26 @@ class BatchJob:
         """Check if job is finished (completed or failed)."""
         return self.status in [JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED]
 
+    def progress_event(self) -> Dict[str, Any]:
+        """Compact progress snapshot pushed to status stream subscribers."""
+        return {
+            "id": self.id,
+            "status": self.status.value,
+            "total_items": self.total_items,
+            "completed_items": self.completed_items,
+            "failed_items": self.failed_items,
+            "progress": self.progress,
+            "error": self.error,
+            "is_done": self.is_done,
+        }
+
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for API response."""
+        """Convert to dictionary for API response (cached until the next update)."""
+        if self._dict_cache is None or self._dict_cache[0] != self.version:
+            self._dict_cache = (self.version, self._build_dict())
+        return dict(self._dict_cache[1])
+
+    def _build_dict(self) -> Dict[str, Any]:
         return {
             "id": self.id,
             "job_type": self.job_type,
@@ -92,12 +116,17 @@ class BatchQueue:
     - Progress tracking
     - Graceful error handling
     - Job cancellation support
+    - Progress push to subscribers (for SSE status streams)
     """
 
     def __init__(self, max_concurrent: int = 3):
         self.jobs: Dict[str, BatchJob] = {}
         self.max_concurrent = max_concurrent
         self._tasks: Dict[str, asyncio.Task] = {}
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+        # Per-status (seq, job_id) lists kept sorted by creation order
+        self._by_status: Dict[JobStatus, List[tuple]] = {s: [] for s in JobStatus}
+        self._seq = itertools.count()
 
     def create_job(
         self,
@@ -112,31 +141,71 @@ class BatchQueue:
             status=JobStatus.PENDING,
             total_items=total_items,
             metadata=metadata or {},
+            seq=next(self._seq),
         )
         self.jobs[job.id] = job
+        self._by_status[job.status].append((job.seq, job.id))
         return job
 
+    def _set_status(self, job: BatchJob, status: JobStatus) -> None:
+        """Move a job to another status bucket."""
+        if job.status == status:
+            return
+        entry = (job.seq, job.id)
+        old = self._by_status[job.status]
+        i = bisect.bisect_left(old, entry)
+        if i < len(old) and old[i] == entry:
+            del old[i]
+        bisect.insort(self._by_status[status], entry)
+        job.status = status
+
     def get_job(self, job_id: str) -> Optional[BatchJob]:
         """Get job by ID."""
         return self.jobs.get(job_id)
 
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        """Get a queue that receives a progress event on every job update."""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, []).append(queue)
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        """Stop delivering progress events to a subscriber queue."""
+        queues = self._subscribers.get(job_id)
+        if not queues:
+            return
+        if queue in queues:
+            queues.remove(queue)
+        if not queues:
+            del self._subscribers[job_id]
+
+    def _publish(self, job: BatchJob) -> None:
+        """Record a job update and push its progress to all subscribers."""
+        job.version += 1
+        queues = self._subscribers.get(job.id)
+        if not queues:
+            return
+        event = job.progress_event()
+        for queue in queues:
+            queue.put_nowait(event)
+
     def list_jobs(
         self,
         job_type: Optional[str] = None,
         status: Optional[JobStatus] = None,
         limit: int = 20,
     ) -> List[BatchJob]:
-        """List jobs with optional filtering."""
-        jobs = list(self.jobs.values())
+        """List newest jobs first, with optional filtering."""
+        if status:
+            entries = reversed(self._by_status[status])
+            candidates = (self.jobs[job_id] for _, job_id in entries)
+        else:
+            candidates = reversed(self.jobs.values())
 
         if job_type:
-            jobs = [j for j in jobs if j.job_type == job_type]
-        if status:
-            jobs = [j for j in jobs if j.status == status]
+            candidates = (j for j in candidates if j.job_type == job_type)
 
-        # Sort by created_at descending
-        jobs.sort(key=lambda j: j.created_at, reverse=True)
-        return jobs[:limit]
+        return list(itertools.islice(candidates, limit))
 
     async def run_job(
         self,
@@ -159,8 +228,9 @@ class BatchQueue:
         if not job:
             raise ValueError(f"Job {job_id} not found")
 
-        job.status = JobStatus.IN_PROGRESS
+        self._set_status(job, JobStatus.IN_PROGRESS)
         job.started_at = datetime.utcnow()
+        self._publish(job)
 
         # Create semaphore for concurrency control
         semaphore = asyncio.Semaphore(self.max_concurrent)
@@ -171,6 +241,7 @@ class BatchQueue:
                 try:
                     result = await processor(item)
                     job.completed_items += 1
+                    self._publish(job)
                     return JobResult(
                         item_id=item_id,
                         success=True,
@@ -178,6 +249,7 @@ class BatchQueue:
                     )
                 except Exception as e:
                     job.failed_items += 1
+                    self._publish(job)
                     return JobResult(
                         item_id=item_id,
                         success=False,
@@ -194,21 +266,22 @@ class BatchQueue:
 
             # Determine final status
             if job.failed_items == job.total_items:
-                job.status = JobStatus.FAILED
+                self._set_status(job, JobStatus.FAILED)
                 job.error = "All items failed to process"
             elif job.failed_items > 0:
-                job.status = JobStatus.COMPLETED  # Partial success
+                self._set_status(job, JobStatus.COMPLETED)  # Partial success
             else:
-                job.status = JobStatus.COMPLETED
+                self._set_status(job, JobStatus.COMPLETED)
 
         except asyncio.CancelledError:
-            job.status = JobStatus.CANCELLED
+            self._set_status(job, JobStatus.CANCELLED)
             job.error = "Job was cancelled"
         except Exception as e:
-            job.status = JobStatus.FAILED
+            self._set_status(job, JobStatus.FAILED)
             job.error = str(e)
 
         job.completed_at = datetime.utcnow()
+        self._publish(job)
         return job
 
     def start_job_async(
@@ -231,8 +304,9 @@ class BatchQueue:
 
         job = self.jobs.get(job_id)
         if job and not job.is_done:
-            job.status = JobStatus.CANCELLED
+            self._set_status(job, JobStatus.CANCELLED)
             job.completed_at = datetime.utcnow()
+            self._publish(job)
             return True
 
         return False
@@ -247,6 +321,7 @@ class BatchQueue:
             age_hours = (cutoff - job.created_at).total_seconds() / 3600
             if age_hours > max_age_hours and job.is_done:
                 del self.jobs[job_id]
+                self._by_status[job.status].remove((job.seq, job_id))
                 if job_id in self._tasks:
                     del self._tasks[job_id]
                 removed += 1
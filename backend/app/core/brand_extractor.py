@@ -1,13 +1,35 @@
 """Brand extraction service for analyzing logos and websites."""
+import asyncio
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable
 from PIL import Image
 import colorsys
+import hashlib
 import io
+import json
 from collections import Counter
 
+from app.core.cache import cache_get, cache_set
+
 logger = logging.getLogger(__name__)
 
+# Mood analysis only depends on the colors/guesses sent to Gemini
+MOOD_CACHE_TTL = 24 * 60 * 60
+
+# Max Gemini / color-quantization calls running in worker threads at once
+MAX_BLOCKING_CALLS = 4
+
+# URL substrings hinting at a brand's industry, checked in order
+INDUSTRY_URL_KEYWORDS: Dict[str, List[str]] = {
+    "tech": ["tech", "app", "software", "digital", "ai", "cloud", "data"],
+    "beauty": ["beauty", "cosmetic", "skin", "makeup", "hair", "spa"],
+    "food": ["food", "eat", "restaurant", "cafe", "kitchen", "cook", "recipe"],
+    "fashion": ["fashion", "style", "wear", "cloth", "apparel", "boutique"],
+    "fitness": ["fit", "gym", "workout", "sport", "health", "wellness"],
+    "home": ["home", "house", "decor", "furniture", "living", "interior"],
+    "jewelry": ["jewel", "gold", "silver", "diamond", "ring", "watch"],
+}
+
 
 class BrandExtractor:
     """
@@ -23,6 +45,12 @@ class BrandExtractor:
     def __init__(self):
         from app.core.gemini import gemini_client
         self.gemini = gemini_client
+        self._blocking = asyncio.Semaphore(MAX_BLOCKING_CALLS)
+    
+    async def _run_blocking(self, func: Callable, *args):
+        """Run a sync Gemini/Pillow call in a worker thread, bounded by a semaphore."""
+        async with self._blocking:
+            return await asyncio.to_thread(func, *args)
     
     async def extract_from_logo(self, logo_image: Image.Image) -> Dict[str, Any]:
         """
@@ -40,7 +68,7 @@ class BrandExtractor:
         
         try:
             # Extract colors using color quantization
-            colors = self._extract_dominant_colors(logo_image, num_colors=6)
+            colors = await self._run_blocking(self._extract_dominant_colors, logo_image, 6)
             
             if colors:
                 # Assign roles to colors based on prominence and contrast
@@ -112,8 +140,12 @@ class BrandExtractor:
         if not self.gemini.is_configured:
             return {}
         
+        cache_key = self._mood_cache_key(brand_data, brand_name)
+        cached = await cache_get(cache_key)
+        if cached is not None:
+            return json.loads(cached)
+        
         try:
-            import json
             
             # Build analysis prompt
             prompt = f"""Analyze this brand data and determine the brand's personality.
@@ -142,7 +174,7 @@ Consider:
 - High contrast indicates bold/modern
 - Pastels suggest soft/feminine"""
 
-            response = self.gemini.model.generate_content(prompt)
+            response = await self._run_blocking(self.gemini.model.generate_content, prompt)
             text = response.text.strip()
             
             # Parse JSON response
@@ -151,12 +183,21 @@ Consider:
                 if text.startswith("json"):
                     text = text[4:]
             
-            return json.loads(text)
+            result = json.loads(text)
+            await cache_set(cache_key, json.dumps(result), MOOD_CACHE_TTL)
+            return result
             
         except Exception as e:
             logger.error(f"Brand mood analysis failed: {e}")
             return {}
     
+    def _mood_cache_key(self, brand_data: Dict[str, Any], brand_name: Optional[str]) -> str:
+        fields = ("primary_color", "secondary_color", "accent_color", "mood", "style")
+        payload = json.dumps(
+            [brand_name] + [brand_data.get(field) for field in fields]
+        )
+        return "brand_mood:" + hashlib.sha256(payload.encode()).hexdigest()
+    
     def _extract_dominant_colors(
         self,
         image: Image.Image,
@@ -168,6 +209,10 @@ Consider:
         Returns list of hex colors sorted by dominance.
         """
         try:
+            # Resize first so the conversions below touch few pixels
+            image = image.copy()
+            image.thumbnail((200, 200))
+            
             # Convert to RGB if necessary
             if image.mode != "RGB":
                 # Handle RGBA by compositing on white background
@@ -178,10 +223,6 @@ Consider:
                 else:
                     image = image.convert("RGB")
             
-            # Resize for faster processing
-            image = image.copy()
-            image.thumbnail((200, 200))
-            
             # Quantize to get dominant colors
             quantized = image.quantize(colors=num_colors, method=Image.Quantize.MEDIANCUT)
             palette = quantized.getpalette()[:num_colors * 3]
@@ -283,7 +324,6 @@ Consider:
     ) -> Optional[Dict[str, Any]]:
         """Use Gemini to analyze logo style and mood."""
         try:
-            import json
             
             color_info = ", ".join(extracted_colors[:3]) if extracted_colors else "not detected"
             
@@ -304,7 +344,7 @@ Consider:
 - Typography hints if visible
 - Overall composition"""
 
-            response = self.gemini.model.generate_content([prompt, logo_image])
+            response = await self._run_blocking(self.gemini.model.generate_content, [prompt, logo_image])
             text = response.text.strip()
             
             if text.startswith("```"):
@@ -321,7 +361,6 @@ Consider:
     async def _analyze_website_with_ai(self, url: str) -> Optional[Dict[str, Any]]:
         """Use AI to infer brand attributes from website URL."""
         try:
-            import json
             
             prompt = f"""Based on this website URL, infer likely brand attributes.
             
@@ -341,7 +380,7 @@ Respond with ONLY valid JSON:
     "confidence": 0.0-1.0 (lower since we're just guessing from URL)
 }}"""
 
-            response = self.gemini.model.generate_content(prompt)
+            response = await self._run_blocking(self.gemini.model.generate_content, prompt)
             text = response.text.strip()
             
             if text.startswith("```"):
@@ -359,17 +398,7 @@ Respond with ONLY valid JSON:
         """Extract industry hints from URL patterns."""
         url_lower = url.lower()
         
-        industry_keywords = {
-            "tech": ["tech", "app", "software", "digital", "ai", "cloud", "data"],
-            "beauty": ["beauty", "cosmetic", "skin", "makeup", "hair", "spa"],
-            "food": ["food", "eat", "restaurant", "cafe", "kitchen", "cook", "recipe"],
-            "fashion": ["fashion", "style", "wear", "cloth", "apparel", "boutique"],
-            "fitness": ["fit", "gym", "workout", "sport", "health", "wellness"],
-            "home": ["home", "house", "decor", "furniture", "living", "interior"],
-            "jewelry": ["jewel", "gold", "silver", "diamond", "ring", "watch"],
-        }
-        
-        for industry, keywords in industry_keywords.items():
+        for industry, keywords in INDUSTRY_URL_KEYWORDS.items():
             if any(kw in url_lower for kw in keywords):
                 return industry
         
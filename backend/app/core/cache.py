@@ -0,0 +1,141 @@
+"""In-process caching helpers, with optional Redis for shared entries."""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+T = TypeVar("T")
+
+
+class TTLCache:
+    """
+    Bounded mapping whose entries expire after ``ttl`` seconds.
+
+    Per-process only (like the rate limiter), so it is meant for hot-path
+    memoization where a miss simply falls back to the slow path.
+    Oldest entries are evicted first once ``maxsize`` is reached.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value, or ``default`` if missing or expired."""
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the oldest entries when full."""
+        self._data[key] = (time.monotonic() + (ttl if ttl is not None else self.ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove a key and return its value if it was still live."""
+        value = self.get(key, default)
+        self._data.pop(key, None)
+        return value
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_redis = None
+
+
+def get_redis():
+    """Shared async Redis client, or None when REDIS_URL is not configured."""
+    global _redis
+    if not settings.redis_url:
+        return None
+    if _redis is None:
+        from redis import asyncio as aioredis
+
+        _redis = aioredis.from_url(settings.redis_url)
+    return _redis
+
+
+# Fallback store for cache_get/cache_set when Redis is not configured
+_local = TTLCache(maxsize=4096, ttl=300)
+
+
+async def cache_get(key: str) -> Optional[bytes]:
+    """Fetch a shared cache entry (Redis if configured, else per-process)."""
+    redis = get_redis()
+    if redis is None:
+        return _local.get(key)
+    try:
+        return await redis.get(key)
+    except Exception as e:
+        logger.warning("Redis get failed for %s: %s", key, e)
+        return None
+
+
+async def cache_set(key: str, value: bytes | str, ttl: int = 300) -> None:
+    """Store a shared cache entry for ``ttl`` seconds."""
+    redis = get_redis()
+    if redis is None:
+        _local.set(key, value, ttl)
+        return
+    try:
+        await redis.set(key, value, ex=ttl)
+    except Exception as e:
+        logger.warning("Redis set failed for %s: %s", key, e)
+
+
+async def cache_delete(*keys: str) -> None:
+    """Drop shared cache entries."""
+    if not keys:
+        return
+    redis = get_redis()
+    if redis is None:
+        for key in keys:
+            _local.pop(key)
+        return
+    try:
+        await redis.delete(*keys)
+    except Exception as e:
+        logger.warning("Redis delete failed for %s: %s", keys, e)
+
+
+async def coalesce(
+    inflight: Dict[Hashable, "asyncio.Future[T]"],
+    key: Hashable,
+    factory: Callable[[], Awaitable[T]],
+) -> T:
+    """
+    Await ``factory()``, or join the run already in flight under ``key``.
+
+    Concurrent identical requests (double submits, client retries) share one
+    run; ``inflight`` is the caller's key -> task map and the entry is dropped
+    once the run finishes. The shared task is shielded, so one caller
+    disconnecting does not cancel it for the others.
+    """
+    task = inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(factory())
+        inflight[key] = task
+        task.add_done_callback(lambda _: inflight.pop(key, None))
+    return await asyncio.shield(task)
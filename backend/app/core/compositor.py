@@ -1,11 +1,37 @@
 from PIL import Image, ImageFilter, ImageEnhance, ImageDraw
+import asyncio
+import multiprocessing
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional, Tuple, Dict
 
+from app.config import settings
+
 
 class Compositor:
     """Handles compositing products onto scene backgrounds."""
 
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _process_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Shared compositing pool, created on first use (None when disabled)."""
+        if settings.composite_workers <= 0:
+            return None
+        if self._pool is None:
+            # spawn, not fork: the parent already runs threads (gRPC, DB pool)
+            self._pool = ProcessPoolExecutor(
+                max_workers=settings.composite_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    def shutdown(self) -> None:
+        """Stop the compositing processes (call on app shutdown)."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
     async def smart_composite(
         self,
         product: Image.Image,
@@ -24,7 +50,37 @@ class Compositor:
         - Matches product color/brightness to scene
         - Adds reflections when surface likely supports it
         - Applies subtle depth-of-field and sharpening
+
+        Runs smart_composite_sync in the compositing process pool (or a
+        thread when COMPOSITE_WORKERS is 0), off the event loop.
         """
+        kwargs = dict(
+            product=product,
+            background=background,
+            position=position,
+            scale=scale,
+            lighting_hint=lighting_hint,
+            angle_hint=angle_hint,
+            add_reflection=add_reflection,
+            add_depth_of_field=add_depth_of_field,
+        )
+        pool = self._process_pool()
+        if pool is None:
+            return await asyncio.to_thread(self.smart_composite_sync, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(pool, _smart_composite_job, kwargs)
+
+    def smart_composite_sync(
+        self,
+        product: Image.Image,
+        background: Image.Image,
+        position: Tuple[int, int] = None,
+        scale: float = None,
+        lighting_hint: Optional[str] = None,
+        angle_hint: Optional[str] = None,
+        add_reflection: bool = True,
+        add_depth_of_field: bool = True,
+    ) -> Image.Image:
+        """Blocking smart_composite; CPU-bound."""
         product = product.convert("RGBA")
         background = background.convert("RGBA")
 
@@ -43,7 +99,7 @@ class Compositor:
         )
 
         # Light/temperature match
-        product = await self.match_lighting(product, background)
+        product = self._match_lighting(product, background)
 
         # Perspective alignment based on angle hints
         if angle_hint:
@@ -68,7 +124,7 @@ class Compositor:
         result = base_bg
 
         # Add shadow
-        shadow = await self._create_shadow(
+        shadow = self._shadow(
             product,
             shadow_opacity,
             shadow_offset,
@@ -85,9 +141,8 @@ class Compositor:
 
         # Optional reflection for glossy/flat surfaces
         if add_reflection and bg_stats["supports_reflection"]:
-            reflection = await self.add_reflection(
+            reflection = self._reflection(
                 product,
-                background,
                 reflection_opacity=bg_stats["reflection_strength"],
                 reflection_height=0.28,
             )
@@ -193,6 +248,15 @@ class Compositor:
         blur: int,
     ) -> Image.Image:
         """Create a drop shadow for the product."""
+        return self._shadow(product, opacity, offset, blur)
+
+    def _shadow(
+        self,
+        product: Image.Image,
+        opacity: float,
+        offset: Tuple[int, int],
+        blur: int,
+    ) -> Image.Image:
         # Extract alpha channel
         alpha = product.split()[3]
 
@@ -230,6 +294,14 @@ class Compositor:
         Returns:
             Image with reflection added
         """
+        return self._reflection(product, reflection_opacity, reflection_height)
+
+    def _reflection(
+        self,
+        product: Image.Image,
+        reflection_opacity: float = 0.3,
+        reflection_height: float = 0.3,
+    ) -> Image.Image:
         if product.mode != "RGBA":
             product = product.convert("RGBA")
 
@@ -269,6 +341,9 @@ class Compositor:
         Returns:
             Color-adjusted product image
         """
+        return self._match_lighting(product, background)
+
+    def _match_lighting(self, product: Image.Image, background: Image.Image) -> Image.Image:
         # Analyze background average color/brightness
         bg_array = np.array(background.convert("RGB"))
         bg_mean = bg_array.mean(axis=(0, 1))
@@ -463,3 +538,8 @@ class Compositor:
 
 # Singleton instance
 compositor = Compositor()
+
+
+def _smart_composite_job(kwargs: dict) -> Image.Image:
+    """Process-pool entry point (module level so it pickles by reference)."""
+    return compositor.smart_composite_sync(**kwargs)
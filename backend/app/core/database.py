@@ -1,20 +1,50 @@
 """Database connection and session management."""
+import asyncio
+import logging
+
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, raiseload
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 
 class Base(DeclarativeBase):
     """Base class for all models."""
     pass
 
 
+# Pool tuning only applies to server databases (e.g. postgresql+asyncpg);
+# aiosqlite uses its own single-file pool.
+_engine_options = {}
+if not settings.database_url.startswith("sqlite"):
+    _engine_options = {
+        # The async engine's default, made explicit so a stray NullPool /
+        # poolclass override can't silently turn off connection reuse
+        "poolclass": AsyncAdaptedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_pre_ping": True,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+if settings.database_url.startswith("postgresql+asyncpg"):
+    _engine_options["connect_args"] = {
+        # SQLAlchemy's per-connection prepared statement cache and asyncpg's own
+        "prepared_statement_cache_size": settings.db_statement_cache_size,
+        "statement_cache_size": settings.db_statement_cache_size,
+        # Short OLTP queries only pay JIT compile cost, never recoup it
+        "server_settings": {"jit": "off"},
+    }
+
 # Create async engine
 engine = create_async_engine(
     settings.database_url,
     echo=settings.debug,
     future=True,
+    query_cache_size=settings.db_query_cache_size,
+    **_engine_options,
 )
 
 # Session factory
@@ -25,6 +55,16 @@ async_session = async_sessionmaker(
 )
 
 
+def strict_loading() -> tuple:
+    """
+    Loader options that forbid implicit relationship loads.
+
+    Append to queries whose results are serialized, after their explicit
+    eager loads; a no-op unless RAISELOAD_STRICT is enabled.
+    """
+    return (raiseload("*"),) if settings.raiseload_strict else ()
+
+
 async def get_db() -> AsyncSession:
     """Dependency to get database session."""
     async with async_session() as session:
@@ -42,3 +82,24 @@ async def init_db():
     """Initialize database tables."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+
+
+async def warm_pool():
+    """Open pool_size connections up front; SQLAlchemy otherwise connects lazily."""
+    if not _engine_options or not settings.db_pool_prewarm:
+        return
+    results = await asyncio.gather(
+        *(engine.connect().start() for _ in range(settings.db_pool_size)),
+        return_exceptions=True,
+    )
+    # Close (return to the pool) every connection that did open, even if
+    # others failed, so none stay checked out
+    errors = [r for r in results if isinstance(r, BaseException)]
+    for conn in results:
+        if not isinstance(conn, BaseException):
+            await conn.close()
+    if errors:
+        logger.warning(
+            "Connection pool pre-warm failed for %d of %d connections: %s",
+            len(errors), len(results), errors[0],
+        )
@@ -1,4 +1,5 @@
 from PIL import Image
+import asyncio
 import io
 from typing import Optional, Tuple, List
 from dataclasses import dataclass
@@ -14,6 +15,10 @@ class ExportPreset:
     background_color: Optional[str] = None  # For JPG exports
 
 
+# Downscales of more than this factor box-reduce first (see Image.resize)
+RESIZE_REDUCING_GAP = 3.0
+
+
 # Platform-specific presets
 EXPORT_PRESETS = {
     # Instagram
@@ -96,6 +101,29 @@ class ExportOptimizer:
         Returns:
             Image bytes in the specified format
         """
+        # Resize/encode is CPU-bound; Pillow releases the GIL for most of it,
+        # so threads let several exports run in parallel
+        return await asyncio.to_thread(
+            self._export_sync,
+            image,
+            preset_id,
+            width,
+            height,
+            format,
+            quality,
+            background_color,
+        )
+
+    def _export_sync(
+        self,
+        image: Image.Image,
+        preset_id: Optional[str],
+        width: Optional[int],
+        height: Optional[int],
+        format: str,
+        quality: int,
+        background_color: Optional[str],
+    ) -> bytes:
         # Apply preset if provided
         if preset_id:
             preset = self.get_preset(preset_id)
@@ -108,6 +136,10 @@ class ExportOptimizer:
 
         # Resize if dimensions provided
         if width and height:
+            # JPEG sources can decode straight at a reduced scale (never
+            # below the target size); a no-op for other formats
+            if image.format == "JPEG":
+                image.draft(None, (width, height))
             image = self._smart_resize(image, width, height)
 
         # Handle transparency for JPG
@@ -154,8 +186,13 @@ class ExportOptimizer:
             new_height = target_height
             new_width = int(target_height * img_ratio)
 
-        # Resize image
-        resized = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        # Resize image. reducing_gap box-reduces large downscales by an integer
+        # factor before Lanczos: several times faster, visually identical
+        resized = image.resize(
+            (new_width, new_height),
+            Image.Resampling.LANCZOS,
+            reducing_gap=RESIZE_REDUCING_GAP,
+        )
 
         # Create canvas and center image
         if image.mode == "RGBA":
@@ -199,11 +236,9 @@ class ExportOptimizer:
         preset_id: str,
     ) -> List[bytes]:
         """Export multiple images with the same preset."""
-        results = []
-        for image in images:
-            result = await self.export(image, preset_id=preset_id)
-            results.append(result)
-        return results
+        return list(await asyncio.gather(
+            *(self.export(image, preset_id=preset_id) for image in images)
+        ))
 
 
 # Singleton instance
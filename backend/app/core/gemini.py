@@ -1,22 +1,99 @@
 """Gemini API client for image analysis and generation."""
 import google.generativeai as genai
+from google.generativeai import client as genai_client
 from google.generativeai import types
 from PIL import Image
+import asyncio
 import io
 import base64
 import json
 import logging
-from typing import Optional
+import mimetypes
+from typing import List, Optional, Sequence, Tuple
 
 from app.config import settings
+from app.core.cache import cache_get, cache_set
 
 logger = logging.getLogger(__name__)
 
+REFINE_PROMPT_PREAMBLE = """Refine the attached product mockup image based on the instruction below.
+
+Requirements:
+- Apply the requested changes while maintaining the product's integrity
+- Keep the professional photography quality
+- Preserve product details and proportions
+- Make the changes look natural and realistic
+- If the instruction is unclear, make reasonable assumptions
+"""
+
+# Longest side of product images sent to Gemini; larger inputs only add
+# upload time, the model works at about this resolution
+GEMINI_IMAGE_MAX_SIZE = 1024
+
+# Gemini deletes uploaded files after 48h; stop reusing handles before that
+GEMINI_FILE_TTL = 47 * 60 * 60
+
+# Refinement history is sent in blocks of this many messages (three
+# user/assistant turns, so a window never starts mid-turn)
+REFINE_HISTORY_BLOCK = 6
+
+
+def history_window_size(count: int, block: int = REFINE_HISTORY_BLOCK) -> int:
+    """
+    How many of the last ``count`` history messages a refinement prompt keeps.
+
+    A plain last-N window shifts by one message every turn, changing the
+    whole prompt; this keeps between ``block`` and ``2 * block - 1`` messages
+    and only drops the oldest block once a new one is complete.
+    """
+    start = max(0, count - block)
+    return count - (start - start % block)
+
+
+MOCKUP_PROMPT = """Create a professional product mockup image.
+
+Take this product and place it naturally in this scene: {scene_description}
+
+Requirements:
+- Product should be the clear focal point
+- Natural lighting and shadows
+- Professional product photography style
+- The product should look like it belongs in the scene
+- Maintain product proportions and details
+
+Generate the final mockup image."""
+
+# Startup never waits longer than this for the Gemini channel warm-up
+GEMINI_WARMUP_TIMEOUT = 5
+
+# Upper bound on in-flight mockup generations per process, shared by
+# single calls and batches
+MOCKUP_CONCURRENCY = 8
+
+
+def _first_image(response) -> Optional[Image.Image]:
+    """First inline image in a generate_content response, if any."""
+    if response.candidates and response.candidates[0].content.parts:
+        for part in response.candidates[0].content.parts:
+            if hasattr(part, 'inline_data') and part.inline_data:
+                return Image.open(io.BytesIO(part.inline_data.data))
+    return None
+
+
+def _history_window(history: list) -> list:
+    """Recent history, trimmed only at block boundaries."""
+    return history[len(history) - history_window_size(len(history)):]
+
 
 class GeminiClient:
     """Client for Gemini API interactions."""
 
     def __init__(self):
+        # upload_in_background tasks, referenced so they are not collected
+        self._background_uploads: set[asyncio.Task] = set()
+        # Global cap on in-flight generate_mockup calls
+        self._mockup_slots = asyncio.Semaphore(MOCKUP_CONCURRENCY)
+
         if not settings.gemini_api_key:
             logger.warning("GEMINI_API_KEY not set - AI features will not work")
             self._configured = False
@@ -32,6 +109,28 @@ class GeminiClient:
     def is_configured(self) -> bool:
         return self._configured
 
+    async def warm_up(self) -> None:
+        """
+        Open the shared async gRPC channel before the first real request.
+
+        The SDK keeps one grpc_asyncio client per process (HTTP/2, so
+        concurrent calls multiplex on one connection) but only connects on
+        first use, leaving that request to pay the TLS handshake. A
+        count_tokens call is free and establishes the channel.
+        """
+        if not self._configured:
+            return
+        try:
+            await asyncio.wait_for(self.model.count_tokens_async("ping"), GEMINI_WARMUP_TIMEOUT)
+        except Exception as e:
+            logger.warning("Gemini channel warm-up failed: %r", e)
+
+    async def aclose(self) -> None:
+        """Close the shared async gRPC channel (call on shutdown)."""
+        if not self._configured:
+            return
+        await genai_client.get_default_generative_async_client().transport.close()
+
     async def analyze_product(self, image: Image.Image) -> dict:
         """
         Analyze a product image to detect category and rich attributes.
@@ -106,7 +205,7 @@ Requirements:
 
 Generate this scene as an image."""
 
-            response = self.model.generate_content(
+            response = await self.model.generate_content_async(
                 full_prompt,
                 generation_config=types.GenerationConfig(
                     response_mime_type="image/png",
@@ -136,83 +235,124 @@ Generate this scene as an image."""
         Generate a complete mockup with product in scene.
 
         Uses Gemini's multimodal capabilities to create the final mockup.
+        At most MOCKUP_CONCURRENCY calls are in flight at once; the rest wait.
         """
         if not self._configured:
             return None
 
         try:
-            prompt = f"""Create a professional product mockup image.
+            async with self._mockup_slots:
+                response = await self.model.generate_content_async(
+                    [MOCKUP_PROMPT.format(scene_description=scene_description), product_image],
+                    generation_config=types.GenerationConfig(
+                        response_mime_type="image/png",
+                    )
+                )
+            return _first_image(response)
 
-Take this product and place it naturally in this scene: {scene_description}
+        except Exception as e:
+            logger.error(f"Mockup generation failed: {e}")
+            return None
 
-Requirements:
-- Product should be the clear focal point
-- Natural lighting and shadows
-- Professional product photography style
-- The product should look like it belongs in the scene
-- Maintain product proportions and details
+    async def generate_mockups_batch(
+        self,
+        items: Sequence[Tuple[Image.Image, str]],
+    ) -> List[Optional[Image.Image]]:
+        """
+        Generate one mockup per (product_image, scene_description) pair.
 
-Generate the final mockup image."""
+        Requests go out concurrently over the client's shared connection,
+        within the same MOCKUP_CONCURRENCY cap as single calls. Results are
+        in input order, with None for items that failed.
+        """
+        if not self._configured:
+            return [None] * len(items)
 
-            response = self.model.generate_content(
-                [prompt, product_image],
-                generation_config=types.GenerationConfig(
-                    response_mime_type="image/png",
-                )
-            )
+        return list(await asyncio.gather(
+            *(self.generate_mockup(image, prompt) for image, prompt in items)
+        ))
 
-            # Extract image from response
-            if response.candidates and response.candidates[0].content.parts:
-                for part in response.candidates[0].content.parts:
-                    if hasattr(part, 'inline_data') and part.inline_data:
-                        image_data = part.inline_data.data
-                        return Image.open(io.BytesIO(image_data))
+    async def upload_image(self, relative_path: str) -> Optional[dict]:
+        """
+        Gemini File API reference for a stored image, uploading it on first use.
 
+        Stored images never change, so the handle is cached by path and
+        later calls on the same image (retries, undo targets, other
+        sessions) send a reference instead of the image bytes. Returns None
+        when not configured or the upload fails; callers then send the
+        image inline.
+        """
+        if not self._configured:
             return None
 
+        cached = await self.cached_image_file(relative_path)
+        if cached is not None:
+            return cached
+
+        full_path = settings.upload_dir / relative_path
+        mime_type = mimetypes.guess_type(full_path.name)[0] or "image/png"
+        try:
+            uploaded = await asyncio.to_thread(genai.upload_file, full_path, mime_type=mime_type)
         except Exception as e:
-            logger.error(f"Mockup generation failed: {e}")
+            logger.warning(f"Gemini file upload failed for {relative_path}: {e}")
             return None
 
+        file_ref = {"mime_type": uploaded.mime_type, "file_uri": uploaded.uri}
+        await cache_set(f"gemini_file:{relative_path}", json.dumps(file_ref), GEMINI_FILE_TTL)
+        return file_ref
+
+    async def cached_image_file(self, relative_path: str) -> Optional[dict]:
+        """File API reference for a stored image if one was already uploaded, else None."""
+        if not self._configured:
+            return None
+        cached = await cache_get(f"gemini_file:{relative_path}")
+        return json.loads(cached) if cached is not None else None
+
+    def upload_in_background(self, relative_path: str) -> None:
+        """
+        Start upload_image without waiting for it.
+
+        Used right after an image is saved so the next request on it (the
+        next chat turn) finds the reference cached instead of uploading first.
+        """
+        if not self._configured:
+            return
+        task = asyncio.create_task(self.upload_image(relative_path))
+        self._background_uploads.add(task)
+        task.add_done_callback(self._background_uploads.discard)
+
     async def refine_mockup(
         self,
-        current_image: Image.Image,
+        current_image: Optional[Image.Image],
         refinement_instruction: str,
         conversation_history: Optional[list] = None,
+        image_file: Optional[dict] = None,
     ) -> Optional[Image.Image]:
         """
         Refine an existing mockup based on user instructions.
 
         This enables conversational refinement where users can iteratively
-        improve their mockups through natural language.
+        improve their mockups through natural language. The image is sent
+        by reference when ``image_file`` (from upload_image) is given.
         """
         if not self._configured:
             return None
 
+        image_part = {"file_data": image_file} if image_file else current_image
+
         try:
-            # Build context from conversation history
-            context = ""
+            # Static instructions first and history appended in stable
+            # blocks, so consecutive turns share a byte-identical prefix
+            # that Gemini's implicit prompt cache can reuse
+            prompt = REFINE_PROMPT_PREAMBLE
             if conversation_history:
-                context = "Previous refinements:\n"
-                for msg in conversation_history[-5:]:  # Last 5 messages for context
-                    context += f"- {msg['role']}: {msg['content']}\n"
-                context += "\n"
-
-            prompt = f"""{context}Refine this product mockup image based on the following instruction:
-
-Instruction: {refinement_instruction}
-
-Requirements:
-- Apply the requested changes while maintaining the product's integrity
-- Keep the professional photography quality
-- Preserve product details and proportions
-- Make the changes look natural and realistic
-- If the instruction is unclear, make reasonable assumptions
-
-Generate the refined mockup image."""
+                prompt += "\nPrevious refinements:\n"
+                for msg in _history_window(conversation_history):
+                    prompt += f"- {msg['role']}: {msg['content']}\n"
+            prompt += f"\nInstruction: {refinement_instruction}\n\nGenerate the refined mockup image."
 
-            response = self.model.generate_content(
-                [prompt, current_image],
+            response = await self.model.generate_content_async(
+                [prompt, image_part],
                 generation_config=types.GenerationConfig(
                     response_mime_type="image/png",
                 )
@@ -268,7 +408,7 @@ Common refinement types:
 - add_element: props, decorations
 - remove_element: remove items"""
 
-            response = self.model.generate_content(prompt)
+            response = await self.model.generate_content_async(prompt)
             text = response.text.strip()
 
             # Remove markdown code blocks if present
@@ -302,5 +442,105 @@ Common refinement types:
         }
 
 
-# Singleton instance
+class MockupMicroBatcher:
+    """
+    Coalesce concurrent direct-AI mockup requests into short batches.
+
+    Requests arriving within ``window`` seconds of the first queued one are
+    sent together through generate_mockups_batch (up to ``max_items`` per
+    batch); every call, batched or not, waits for one of the client's
+    MOCKUP_CONCURRENCY slots, so a burst is smoothed under that cap. Each batch runs as its own task, so requests arriving
+    while one is in flight are collected straight away instead of waiting
+    for it. Callers fall back to a direct call while the worker is not
+    running; stop() cancels whatever is still queued or in flight.
+    """
+
+    def __init__(self, client: GeminiClient, window: float, max_items: int):
+        self.client = client
+        self.window = window
+        self.max_items = max_items
+        self._queue: "asyncio.Queue[tuple[Image.Image, str, asyncio.Future]]" = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        self._batches: set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is None:
+            return
+        tasks = [self._worker, *self._batches]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._worker = None
+
+        # Callers still waiting in the queue get a cancellation, not a hang
+        while not self._queue.empty():
+            _, _, future = self._queue.get_nowait()
+            future.cancel()
+
+    async def generate_mockup(
+        self,
+        product_image: Image.Image,
+        scene_description: str,
+    ) -> Optional[Image.Image]:
+        """Same contract as GeminiClient.generate_mockup."""
+        if self._worker is None:
+            return await self.client.generate_mockup(product_image, scene_description)
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((product_image, scene_description, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            try:
+                while len(batch) < self.max_items:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # Stopped mid-window: these were already taken off the queue
+                for _, _, future in batch:
+                    future.cancel()
+                raise
+
+            # Callers that gave up (request cancelled) are dropped
+            batch = [item for item in batch if not item[2].done()]
+            if batch:
+                task = asyncio.create_task(self._dispatch(batch))
+                self._batches.add(task)
+                task.add_done_callback(self._batches.discard)
+
+    async def _dispatch(self, batch: list) -> None:
+        try:
+            images = await self.client.generate_mockups_batch(
+                items=[(image, prompt) for image, prompt, _ in batch]
+            )
+        except asyncio.CancelledError:
+            for _, _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            logger.error(f"Mockup micro-batch failed: {e}")
+            images = [None] * len(batch)
+        for (_, _, future), image in zip(batch, images):
+            if not future.done():
+                future.set_result(image)
+
+
+# Singleton instances
 gemini_client = GeminiClient()
+mockup_batcher = MockupMicroBatcher(
+    gemini_client,
+    window=settings.gemini_batch_window_ms / 1000,
+    max_items=settings.gemini_batch_max_items,
+)
@@ -1,6 +1,10 @@
 """Scene templates and generation logic."""
-from typing import Optional, List, Dict, Tuple
+import bisect
+import math
+import re
+from typing import Optional, List, Dict, Iterable, Set, Tuple
 from dataclasses import dataclass, field
+from functools import lru_cache
 from enum import Enum
 from datetime import datetime
 
@@ -410,14 +414,100 @@ SCENE_TEMPLATES: Dict[str, SceneTemplate] = {
 }
 
 
+# Templates are static, so the popularity ordering is computed once
+_TEMPLATES_BY_POPULARITY: Tuple[SceneTemplate, ...] = tuple(
+    sorted(SCENE_TEMPLATES.values(), key=lambda x: x.popularity, reverse=True)
+)
+
+# ...and so are the category and tag indexes (popularity order within each)
+_CATEGORY_INDEX: Dict[SceneCategory, Tuple[SceneTemplate, ...]] = {
+    category: tuple(t for t in _TEMPLATES_BY_POPULARITY if t.category == category)
+    for category in SceneCategory
+}
+_TAG_INDEX: Dict[str, Tuple[SceneTemplate, ...]] = {}
+for _template in _TEMPLATES_BY_POPULARITY:
+    for _tag in _template.tags:
+        _TAG_INDEX[_tag] = _TAG_INDEX.get(_tag, ()) + (_template,)
+del _template, _tag
+
+_CATEGORY_COUNTS: Dict[str, int] = {c.value: len(ts) for c, ts in _CATEGORY_INDEX.items()}
+# Most used first, ties by name so the order is stable across restarts
+_TAG_COUNTS: Tuple[Tuple[str, int], ...] = tuple(
+    sorted(((tag, len(ts)) for tag, ts in _TAG_INDEX.items()), key=lambda x: (-x[1], x[0]))
+)
+
+
 def get_all_templates() -> List[SceneTemplate]:
     """Get all scene templates sorted by popularity."""
-    return sorted(SCENE_TEMPLATES.values(), key=lambda x: x.popularity, reverse=True)
+    return list(_TEMPLATES_BY_POPULARITY)
 
 
 def get_templates_by_category(category: SceneCategory) -> List[SceneTemplate]:
     """Get templates filtered by category."""
-    return [t for t in get_all_templates() if t.category == category]
+    return list(_CATEGORY_INDEX[category])
+
+
+def get_template_ids_by_tags(tags: Iterable[str]) -> Set[str]:
+    """IDs of the templates carrying any of ``tags``."""
+    return {t.id for tag in tags for t in _TAG_INDEX.get(tag, ())}
+
+
+def get_category_counts() -> Dict[str, int]:
+    """Number of templates per category value."""
+    return dict(_CATEGORY_COUNTS)
+
+
+def get_tag_counts() -> List[Tuple[str, int]]:
+    """(tag, template count) pairs, most used first."""
+    return list(_TAG_COUNTS)
+
+
+# BM25+ search index over name, description and tags, built once
+BM25_K1 = 1.2
+BM25_B = 0.75
+BM25_DELTA = 1.0
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _build_search_index() -> Tuple[Dict[str, List[Tuple[str, int]]], Dict[str, float], Dict[str, int], float]:
+    """(term -> [(template id, tf)], term -> idf, template id -> length, average length)."""
+    postings: Dict[str, List[Tuple[str, int]]] = {}
+    doc_len: Dict[str, int] = {}
+    for template in _TEMPLATES_BY_POPULARITY:
+        tokens = _tokenize(" ".join([template.name, template.description, *template.tags]))
+        doc_len[template.id] = len(tokens)
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for term, tf in counts.items():
+            postings.setdefault(term, []).append((template.id, tf))
+
+    n = len(doc_len)
+    idf = {
+        term: math.log((n - len(docs) + 0.5) / (len(docs) + 0.5) + 1)
+        for term, docs in postings.items()
+    }
+    return postings, idf, doc_len, sum(doc_len.values()) / max(n, 1)
+
+
+_POSTINGS, _IDF, _DOC_LEN, _AVG_DOC_LEN = _build_search_index()
+# Sorted vocabulary, so a query token also matches terms it prefixes ("minim")
+_VOCABULARY = sorted(_POSTINGS)
+# Shorter tokens ("e" in "e-commerce") only match exactly
+SEARCH_PREFIX_MIN_LEN = 3
+
+
+def _expand_prefix(token: str) -> List[str]:
+    if len(token) < SEARCH_PREFIX_MIN_LEN:
+        return [token] if token in _POSTINGS else []
+    start = bisect.bisect_left(_VOCABULARY, token)
+    end = bisect.bisect_left(_VOCABULARY, token + "\uffff", start)
+    return _VOCABULARY[start:end]
 
 
 def get_template(template_id: str) -> Optional[SceneTemplate]:
@@ -425,17 +515,33 @@ def get_template(template_id: str) -> Optional[SceneTemplate]:
     return SCENE_TEMPLATES.get(template_id)
 
 
+def get_templates(template_ids: Iterable[str]) -> Dict[str, SceneTemplate]:
+    """Get the known templates among ``template_ids``, keyed by ID."""
+    return {tid: SCENE_TEMPLATES[tid] for tid in template_ids if tid in SCENE_TEMPLATES}
+
+
 def search_templates(query: str) -> List[SceneTemplate]:
-    """Search templates by name, tags, or description."""
-    query = query.lower()
-    results = []
-    for template in SCENE_TEMPLATES.values():
-        # Search in name, tags, and description
-        if (query in template.name.lower() or
-            query in template.description.lower() or
-            any(query in tag for tag in template.tags)):
-            results.append(template)
-    return sorted(results, key=lambda x: x.popularity, reverse=True)
+    """
+    Search templates by name, tags, or description, most relevant first.
+
+    Scores are BM25+ over the precomputed postings, so only templates that
+    share a term with the query are touched. Query words also match longer
+    terms they prefix; ties go to the more popular template.
+    """
+    scores: Dict[str, float] = {}
+    for token in set(_tokenize(query)):
+        for term in _expand_prefix(token):
+            idf = _IDF[term]
+            for template_id, tf in _POSTINGS[term]:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * _DOC_LEN[template_id] / _AVG_DOC_LEN)
+                scores[template_id] = scores.get(template_id, 0.0) + idf * (
+                    tf * (BM25_K1 + 1) / (tf + norm) + BM25_DELTA
+                )
+
+    return sorted(
+        (SCENE_TEMPLATES[tid] for tid in scores),
+        key=lambda t: (-scores[t.id], -t.popularity),
+    )
 
 
 def get_categories() -> List[str]:
@@ -563,21 +669,23 @@ SEASONAL_SCENES: Dict[str, List[str]] = {
 DEFAULT_SCENES = ["studio-white", "lifestyle-desk", "ecommerce-amazon", "social-instagram"]
 
 
+CATEGORY_ALIASES: Dict[str, str] = {
+    "tech": "electronics",
+    "electronics/tech": "electronics",
+    "beauty/skincare": "beauty",
+    "food/beverage": "food",
+    "fashion/apparel": "fashion",
+    "home/furniture": "home",
+    "sports/fitness": "fitness",
+}
+
+
 def normalize_category(category: Optional[str]) -> str:
     """Normalize category strings to canonical keys."""
     if not category:
         return "other"
     c = category.lower()
-    aliases = {
-        "tech": "electronics",
-        "electronics/tech": "electronics",
-        "beauty/skincare": "beauty",
-        "food/beverage": "food",
-        "fashion/apparel": "fashion",
-        "home/furniture": "home",
-        "sports/fitness": "fitness",
-    }
-    return aliases.get(c, c)
+    return CATEGORY_ALIASES.get(c, c)
 
 
 def _detect_season(now: Optional[datetime] = None) -> Optional[str]:
@@ -824,3 +932,75 @@ def build_scene_suggestions(
     )
 
     return suggestions[:limit]
+
+
+# ---------- Brand styling ----------
+
+BRAND_MOOD_DESCRIPTIONS: Dict[str, str] = {
+    "luxury": "luxurious, high-end feel with rich textures",
+    "minimal": "clean, minimalist aesthetic with negative space",
+    "playful": "vibrant, energetic atmosphere",
+    "professional": "polished, business-appropriate setting",
+    "elegant": "sophisticated, refined elegance",
+    "bold": "striking, confident visual impact",
+    "organic": "natural, earthy elements",
+    "tech": "sleek, modern technology aesthetic",
+}
+
+BRAND_LIGHTING_DESCRIPTIONS: Dict[str, str] = {
+    "dramatic": "dramatic lighting with strong shadows",
+    "soft": "soft, diffused lighting",
+    "bright": "bright, even illumination",
+    "studio": "professional studio lighting",
+    "natural": "natural daylight",
+    "warm": "warm, golden hour lighting",
+}
+
+
+def enhance_prompt_with_brand(base_prompt: str, brand) -> Tuple[str, Dict[str, str]]:
+    """
+    Append brand styling (colors, mood, lighting) to a scene prompt.
+
+    ``brand`` is a Brand row or BrandResponse (mood and lighting are stored
+    lowercase). Returns the enhanced prompt and the brand attributes that
+    were applied.
+    """
+    suffix, applied = _brand_enhancement(
+        brand.primary_color, brand.secondary_color, brand.mood, brand.preferred_lighting
+    )
+    if not applied:
+        return base_prompt, {}
+    # Fresh dict: callers store it on the mockup row
+    return f"{base_prompt}. Brand styling: {suffix}.", dict(applied)
+
+
+@lru_cache(maxsize=1024)
+def _brand_enhancement(
+    primary: Optional[str],
+    secondary: Optional[str],
+    mood: Optional[str],
+    lighting: Optional[str],
+) -> Tuple[str, Tuple[Tuple[str, str], ...]]:
+    """
+    (styling suffix, applied attributes) for a brand's styling values.
+
+    Keyed on the values themselves, so an edited brand simply misses the
+    cache; no invalidation needed.
+    """
+    enhancements = (
+        primary and f"Color scheme influenced by {primary}",
+        secondary and f"accent elements in {secondary}",
+        mood and (BRAND_MOOD_DESCRIPTIONS.get(mood) or f"{mood} aesthetic"),
+        lighting and (BRAND_LIGHTING_DESCRIPTIONS.get(lighting) or f"{lighting} lighting"),
+    )
+    applied = tuple(
+        (key, value)
+        for key, value in (
+            ("primary_color", primary),
+            ("secondary_color", secondary),
+            ("mood", mood),
+            ("lighting", lighting),
+        )
+        if value
+    )
+    return ", ".join(filter(None, enhancements)), applied
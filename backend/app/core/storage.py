@@ -1,9 +1,12 @@
 """Local file storage for MVP."""
 from pathlib import Path
+from typing import BinaryIO, Optional
 from PIL import Image
 import uuid
 import io
+import shutil
 from datetime import datetime
+from functools import lru_cache
 
 from app.config import settings
 
@@ -35,6 +38,57 @@ def save_image(image: Image.Image, folder: str, filename: str = None) -> str:
     return f"{folder}/{filename}"
 
 
+# Longest side of stored logos; also all brand extraction needs
+LOGO_MAX_SIZE = 512
+
+
+def save_logo(image: Image.Image, folder: str = "logos", max_size: int = LOGO_MAX_SIZE) -> str:
+    """Save a logo; logos are only displayed small, so they are capped at ``max_size`` px."""
+    return save_downscaled(image, folder, max_size)
+
+
+def save_downscaled(image: Image.Image, folder: str, max_size: int) -> str:
+    """
+    Save a downscaled, compressed copy of an image.
+
+    The longest side is capped at ``max_size`` px. Opaque images (including
+    RGBA whose alpha is fully opaque) are stored as progressive JPEG,
+    anything with transparency or a palette as optimized PNG. The input image is untouched.
+
+    Returns:
+        Relative path to saved file
+    """
+    if image.mode == "CMYK" or _is_opaque_rgba(image):
+        resized = image.convert("RGB")
+    else:
+        resized = image.copy()
+    resized.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    stem = f"{timestamp}_{uuid.uuid4().hex[:8]}"
+
+    folder_path = settings.upload_dir / folder
+    folder_path.mkdir(parents=True, exist_ok=True)
+
+    if resized.mode in ("RGB", "L"):
+        filename = f"{stem}.jpg"
+        resized.save(folder_path / filename, format="JPEG", quality=85, optimize=True, progressive=True)
+    else:
+        filename = f"{stem}.png"
+        resized.save(folder_path / filename, format="PNG", optimize=True, compress_level=6)
+
+    return f"{folder}/{filename}"
+
+
+def _is_opaque_rgba(image: Image.Image) -> bool:
+    """Whether an RGBA image's alpha channel is 255 everywhere."""
+    return image.mode == "RGBA" and image.getchannel("A").getextrema() == (255, 255)
+
+
+# Chunk size for streaming uploads to disk
+UPLOAD_COPY_CHUNK = 64 * 1024
+
+
 def save_upload(file_bytes: bytes, folder: str, original_filename: str) -> str:
     """
     Save uploaded file bytes to local storage.
@@ -47,6 +101,28 @@ def save_upload(file_bytes: bytes, folder: str, original_filename: str) -> str:
     Returns:
         Relative path to saved file
     """
+    file_path, relative_path = _upload_destination(folder, original_filename)
+    file_path.write_bytes(file_bytes)
+    return relative_path
+
+
+def save_upload_file(fileobj: BinaryIO, folder: str, original_filename: str) -> str:
+    """
+    Copy an uploaded file object to local storage in fixed-size chunks.
+
+    Like save_upload, but streams from UploadFile.file (already spooled by
+    Starlette) so the upload is never held in memory as one bytes object.
+    Blocking - call through a thread from async code.
+    """
+    file_path, relative_path = _upload_destination(folder, original_filename)
+    fileobj.seek(0)
+    with open(file_path, "wb") as out:
+        shutil.copyfileobj(fileobj, out, UPLOAD_COPY_CHUNK)
+    return relative_path
+
+
+def _upload_destination(folder: str, original_filename: str) -> tuple[Path, str]:
+    """(absolute path, relative path) for a new upload, keeping its extension."""
     ext = Path(original_filename).suffix or ".png"
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"{timestamp}_{uuid.uuid4().hex[:8]}{ext}"
@@ -54,10 +130,43 @@ def save_upload(file_bytes: bytes, folder: str, original_filename: str) -> str:
     folder_path = settings.upload_dir / folder
     folder_path.mkdir(parents=True, exist_ok=True)
 
-    file_path = folder_path / filename
-    file_path.write_bytes(file_bytes)
+    return folder_path / filename, f"{folder}/{filename}"
 
-    return f"{folder}/{filename}"
+
+# Image formats accepted from uploads (skips Pillow's full format sniffing)
+UPLOAD_IMAGE_FORMATS = ("JPEG", "PNG", "WEBP", "GIF")
+
+# Reject decompression bombs from the header, before any pixel data is decoded
+MAX_UPLOAD_PIXELS = 40_000_000
+
+
+def open_upload_image(fileobj: BinaryIO, max_size: Optional[int] = None) -> Image.Image:
+    """
+    Decode an uploaded image directly from its file object.
+
+    UploadFile.file is already spooled to disk for large uploads, so this
+    avoids reading the whole body into a bytes copy first. With ``max_size``,
+    JPEGs are decoded at the smallest DCT scale still at least that large
+    instead of at full resolution. Blocking - call through run_in_threadpool
+    from async code.
+
+    Raises:
+        ValueError: If the image is not a supported format or is too large
+    """
+    fileobj.seek(0)
+    try:
+        image = Image.open(fileobj, formats=UPLOAD_IMAGE_FORMATS)
+    except Image.UnidentifiedImageError as e:
+        raise ValueError("Unsupported image format") from e
+
+    width, height = image.size
+    if width * height > MAX_UPLOAD_PIXELS:
+        raise ValueError("Image dimensions too large")
+
+    if max_size:
+        image.draft(None, (max_size, max_size))
+    image.load()
+    return image
 
 
 def get_image(relative_path: str) -> Image.Image:
@@ -66,6 +175,37 @@ def get_image(relative_path: str) -> Image.Image:
     return Image.open(file_path)
 
 
+# Small files only (downscaled Gemini inputs, a few MB at most), so the
+# cache stays in the low hundreds of MB per worker
+@lru_cache(maxsize=64)
+def read_cached_bytes(relative_path: str) -> bytes:
+    """
+    File contents, memoized per process.
+
+    Only for small write-once files: stored names are unique, so a path
+    never points at different bytes.
+    """
+    return (settings.upload_dir / relative_path).read_bytes()
+
+
+def get_cached_image(relative_path: str) -> Image.Image:
+    """
+    Decode a small stored image from the byte cache.
+
+    Each call returns a fresh image, so callers may modify it.
+    """
+    image = Image.open(io.BytesIO(read_cached_bytes(relative_path)))
+    image.load()
+    return image
+
+
+def save_downscaled_copy(relative_path: str, folder: str, max_size: int) -> str:
+    """Store a save_downscaled copy of an already stored image; returns its path."""
+    with Image.open(settings.upload_dir / relative_path) as image:
+        image.draft(None, (max_size, max_size))
+        return save_downscaled(image, folder, max_size)
+
+
 def get_full_path(relative_path: str) -> Path:
     """Get full path from relative path."""
     return settings.upload_dir / relative_path
@@ -111,6 +251,9 @@ class StorageService:
     def save_upload(self, file_bytes: bytes, folder: str, original_filename: str) -> str:
         return save_upload(file_bytes, folder, original_filename)
 
+    def save_upload_file(self, fileobj: BinaryIO, folder: str, original_filename: str) -> str:
+        return save_upload_file(fileobj, folder, original_filename)
+
     def save_bytes(self, data: bytes, folder: str, filename: str) -> str:
         return save_bytes(data, folder, filename)
 
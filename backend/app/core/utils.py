@@ -1,7 +1,36 @@
 """Shared utility functions."""
+import hashlib
+
+from fastapi import Request, Response
+
 from app.config import settings
 
+# Static payloads only change on deploy, so an hour of caching is safe
+STATIC_CACHE_CONTROL = "public, max-age=3600, immutable"
+
+
+# Settings are fixed per process, so the URL prefix for stored files is too;
+# hot listing loops concatenate onto it directly instead of calling get_image_url
+IMAGE_URL_BASE = f"{settings.backend_url}/uploads/"
+
 
 def get_image_url(path: str) -> str:
     """Convert a storage path to a full URL."""
-    return f"{settings.backend_url}/uploads/{path}"
+    return IMAGE_URL_BASE + path
+
+
+def content_etag(body: bytes) -> str:
+    """Strong ETag derived from a response body."""
+    return f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+
+
+def static_json_response(request: Request, body: bytes, etag: str) -> Response:
+    """
+    Serve a pre-encoded static JSON body with HTTP caching headers.
+
+    A matching If-None-Match gets an empty 304.
+    """
+    headers = {"ETag": etag, "Cache-Control": STATIC_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
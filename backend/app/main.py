@@ -1,5 +1,6 @@
 """FastAPI application entry point."""
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
@@ -7,7 +8,10 @@ import logging
 
 from app.config import settings
 from app.api.v1.router import api_router
-from app.core.database import init_db
+from app.api.deps import AuthMiddleware
+from app.core.database import init_db, warm_pool
+from app.core.compositor import compositor
+from app.core.gemini import gemini_client, mockup_batcher
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,10 +24,17 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info(f"Starting {settings.app_name}...")
     await init_db()
+    await warm_pool()
     logger.info("Database initialized")
+    await gemini_client.warm_up()
+    if settings.gemini_batch_enabled:
+        mockup_batcher.start()
     yield
     # Shutdown
     logger.info(f"Shutting down {settings.app_name}...")
+    await mockup_batcher.stop()
+    await gemini_client.aclose()
+    compositor.shutdown()
 
 
 app = FastAPI(
@@ -31,6 +42,7 @@ app = FastAPI(
     description="AI-powered product mockup generator using Gemini",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware - allow frontend
@@ -42,6 +54,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Verify bearer tokens once per request (see app.api.deps)
+app.add_middleware(AuthMiddleware)
+
 # Serve uploaded files
 app.mount("/uploads", StaticFiles(directory=str(settings.upload_dir)), name="uploads")
 
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, JSON, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, JSON, Text, Index, text
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 import uuid
 
@@ -14,6 +14,18 @@ class Brand(Base):
     descriptions used for prompt injection.
     """
     __tablename__ = "brands"
+    # Fetch server defaults / onupdate timestamps in the same flush statement
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        # At most one default brand per user; also serves the unset-default UPDATE
+        Index(
+            "ix_brands_default_per_user",
+            "user_id",
+            unique=True,
+            postgresql_where=text("is_default"),
+            sqlite_where=text("is_default"),
+        ),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"), nullable=True)  # nullable for demo
@@ -64,3 +76,8 @@ class Brand(Base):
     # Relationships
     user = relationship("User", back_populates="brands")
     mockups = relationship("Mockup", back_populates="brand")
+
+    @validates("mood", "style", "industry", "preferred_lighting")
+    def _normalize_keyword(self, key, value):
+        # Stored lowercase so lookups by these keywords never re-normalize
+        return value.lower() if value else value
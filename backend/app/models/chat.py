@@ -18,6 +18,7 @@ class MessageRole(str, enum.Enum):
 class ChatSession(Base):
     """A chat session for refining a mockup."""
     __tablename__ = "chat_sessions"
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     mockup_id = Column(String, ForeignKey("mockups.id"), nullable=False)
@@ -30,13 +31,16 @@ class ChatSession(Base):
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     # Relationships
-    mockup = relationship("Mockup", backref="chat_sessions")
+    # Small many-to-one that every session lookup needs for authorization;
+    # messages stay lazy and are opted into per query with selectinload
+    mockup = relationship("Mockup", backref="chat_sessions", lazy="joined")
     messages = relationship("ChatMessage", back_populates="session", order_by="ChatMessage.created_at")
 
 
 class ChatMessage(Base):
     """A single message in a chat session."""
     __tablename__ = "chat_messages"
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     session_id = Column(String, ForeignKey("chat_sessions.id"), nullable=False)
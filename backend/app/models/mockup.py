@@ -1,5 +1,6 @@
 """Mockup model - stores generated mockup images."""
-from sqlalchemy import Column, String, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -9,6 +10,12 @@ from app.core.database import Base
 
 class Mockup(Base):
     __tablename__ = "mockups"
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        # Every mockup query is scoped to its owner; also serves the
+        # newest-first listing
+        Index("ix_mockups_user_id_created_at", "user_id", "created_at"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     product_id = Column(String, ForeignKey("products.id"), nullable=False)
@@ -27,7 +34,7 @@ class Mockup(Base):
     brand_applied = Column(JSON, nullable=True)  # {"colors_used": [...], "mood": "...", etc.}
 
     # Canvas editor data (for Phase 9)
-    canvas_data = Column(JSON, nullable=True)  # Fabric.js canvas state for editing
+    canvas_data = Column(JSON().with_variant(JSONB, "postgresql"), nullable=True)  # Fabric.js canvas state for editing
 
     # Timestamps
     created_at = Column(DateTime, server_default=func.now())
@@ -35,4 +42,5 @@ class Mockup(Base):
     # Relationships
     product = relationship("Product", back_populates="mockups")
     brand = relationship("Brand", back_populates="mockups")
-    user = relationship("User", back_populates="mockups")
+    # Ownership is checked via user_id; never load the owner implicitly
+    user = relationship("User", back_populates="mockups", lazy="raise")
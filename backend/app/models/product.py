@@ -1,5 +1,5 @@
 """Product model - stores uploaded product images."""
-from sqlalchemy import Column, String, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, String, DateTime, JSON, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -9,6 +9,12 @@ from app.core.database import Base
 
 class Product(Base):
     __tablename__ = "products"
+    # Fetch the created_at server default in the INSERT itself
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        # Product listings are per owner, newest first
+        Index("ix_products_user_id_created_at", "user_id", "created_at"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
 
@@ -17,6 +23,7 @@ class Product(Base):
     # Image paths (local storage for MVP)
     original_image_path = Column(String, nullable=False)
     processed_image_path = Column(String, nullable=True)  # Background removed
+    gemini_preprocessed_path = Column(String, nullable=True)  # Downscaled copy sent to Gemini
 
     # AI-detected metadata
     category = Column(String, nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, Enum, JSON
+from sqlalchemy import Column, String, DateTime, Boolean, Enum, JSON, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -30,6 +30,23 @@ def _default_usage():
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Token lookups in verify/reset flows; partial so NULLs aren't indexed
+        Index(
+            "ix_users_verify_token",
+            "verify_token",
+            unique=True,
+            postgresql_where=text("verify_token IS NOT NULL"),
+            sqlite_where=text("verify_token IS NOT NULL"),
+        ),
+        Index(
+            "ix_users_reset_token",
+            "reset_token",
+            unique=True,
+            postgresql_where=text("reset_token IS NOT NULL"),
+            sqlite_where=text("reset_token IS NOT NULL"),
+        ),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     email = Column(String, unique=True, nullable=False, index=True)
@@ -64,7 +81,8 @@ class User(Base):
 
     # Relationships
     products = relationship("Product", back_populates="user", cascade="all, delete-orphan")
-    mockups = relationship("Mockup", back_populates="user", cascade="all, delete-orphan")
+    # Potentially large; list endpoints query Mockup by user_id instead
+    mockups = relationship("Mockup", back_populates="user", cascade="all, delete-orphan", lazy="raise")
     brands = relationship("Brand", back_populates="user", cascade="all, delete-orphan")
     teams_owned = relationship("Team", back_populates="owner", cascade="all, delete-orphan")
     team_memberships = relationship("TeamMembership", back_populates="user", cascade="all, delete-orphan")
@@ -1,11 +1,12 @@
 """Pydantic schemas."""
 from app.schemas.product import ProductBase, ProductCreate, ProductResponse
-from app.schemas.mockup import MockupGenerateRequest, MockupResponse, MockupUpdateRequest, GenerationStatus
+from app.schemas.mockup import MockupGenerateRequest, MockupBatchGenerateRequest, MockupResponse, MockupUpdateRequest, GenerationStatus
 from app.schemas.chat import (
     ChatSessionCreate,
     ChatMessageRequest,
     ChatMessageResponse,
     ChatSessionResponse,
+    ChatSessionSummary,
     RefinementSuggestion,
     RefinementSuggestionsResponse,
 )
@@ -35,6 +36,7 @@ __all__ = [
     "ProductCreate",
     "ProductResponse",
     "MockupGenerateRequest",
+    "MockupBatchGenerateRequest",
     "MockupResponse",
     "MockupUpdateRequest",
     "GenerationStatus",
@@ -42,6 +44,7 @@ __all__ = [
     "ChatMessageRequest",
     "ChatMessageResponse",
     "ChatSessionResponse",
+    "ChatSessionSummary",
     "RefinementSuggestion",
     "RefinementSuggestionsResponse",
     # Brand schemas
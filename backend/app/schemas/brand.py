@@ -1,5 +1,5 @@
 """Brand Pydantic schemas for API validation and serialization."""
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import Optional, List
 from datetime import datetime
 import re
@@ -86,9 +86,9 @@ class BrandCreate(BrandBase):
             return v.lower()
         return v.lower() if v else None
     
-    @field_validator('style')
+    @field_validator('style', 'industry', 'preferred_lighting')
     @classmethod
-    def validate_style(cls, v):
+    def normalize_keywords(cls, v):
         if v is not None:
             return v.lower()
         return None
@@ -127,6 +127,11 @@ class BrandUpdate(BaseModel):
     @classmethod
     def validate_colors(cls, v):
         return validate_hex_color(v)
+    
+    @field_validator('mood', 'style', 'industry', 'preferred_lighting')
+    @classmethod
+    def normalize_keywords(cls, v):
+        return v.lower() if v else v
 
 
 class BrandResponse(BaseModel):
@@ -168,8 +173,7 @@ class BrandResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class BrandExtractRequest(BaseModel):
@@ -1,5 +1,5 @@
 """Chat schemas for refinement conversations."""
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
@@ -23,8 +23,7 @@ class ChatMessageResponse(BaseModel):
     refinement_type: Optional[str] = None
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ChatSessionResponse(BaseModel):
@@ -36,8 +35,17 @@ class ChatSessionResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ChatSessionSummary(BaseModel):
+    """List view of a chat session: a message count instead of the messages."""
+    id: str
+    mockup_id: str
+    current_image_url: str
+    message_count: int
+    created_at: datetime
+    updated_at: datetime
 
 
 class RefinementSuggestion(BaseModel):
@@ -1,6 +1,6 @@
 """Mockup schemas."""
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 
@@ -22,6 +22,11 @@ class MockupGenerateRequest(BaseModel):
     brand_id: Optional[str] = None  # Apply brand styling to generation
 
 
+class MockupBatchGenerateRequest(BaseModel):
+    """Request schema for generating several mockups in one call."""
+    requests: List[MockupGenerateRequest] = Field(..., min_length=1, max_length=20)
+
+
 class MockupResponse(BaseModel):
     """Schema for mockup API response."""
     id: str
@@ -34,8 +39,7 @@ class MockupResponse(BaseModel):
     canvas_data: Optional[Dict[str, Any]] = None  # Canvas editor state (Phase 9)
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class MockupUpdateRequest(BaseModel):
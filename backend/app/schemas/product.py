@@ -1,5 +1,5 @@
 """Product schemas."""
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, Dict, Any
 from datetime import datetime
 
@@ -23,5 +23,4 @@ class ProductResponse(ProductBase):
     processed_image_url: Optional[str] = None
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
@@ -2,6 +2,7 @@
 from app.services.batch_service import batch_service
 from app.services.export_service import export_service
 from app.services import auth_service
+from app.services import product_service
 from app.services import usage_service
 
-__all__ = ["batch_service", "export_service", "auth_service", "usage_service"]
+__all__ = ["batch_service", "export_service", "auth_service", "product_service", "usage_service"]
@@ -7,16 +7,17 @@ Handles:
 - Progress tracking
 """
 import asyncio
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 from dataclasses import dataclass
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import insert, select
 
 from app.core.batch_queue import batch_queue, BatchJob, JobStatus
-from app.core.storage import get_image, save_image
+from app.core.storage import get_cached_image, save_image
 from app.core.gemini import gemini_client
 from app.core.scene_generator import get_template, get_all_templates, build_customized_prompt
 from app.models import Product, Mockup
+from app.services.product_service import ensure_gemini_image
 
 
 @dataclass
@@ -59,6 +60,13 @@ VARIATION_PRESETS = {
 }
 
 
+def _variation_fields(variation: Any) -> Tuple[str, Dict[str, str]]:
+    """(template_id, customization) from a variation dict or request model."""
+    if isinstance(variation, dict):
+        return variation["template_id"], variation.get("customization") or {}
+    return variation.template_id, variation.customization or {}
+
+
 class BatchGenerationService:
     """Service for batch mockup generation with variations."""
 
@@ -84,9 +92,10 @@ class BatchGenerationService:
         # Build customized prompt
         scene_prompt = build_customized_prompt(template.id, customization)
 
-        # Load product image
-        image_path = product.processed_image_path or product.original_image_path
-        product_image = get_image(image_path)
+        # Load the downscaled product image (file IO off the event loop so
+        # concurrent variations overlap their reads/writes; the bytes are
+        # cached, so only the first variation touches the disk)
+        product_image = await asyncio.to_thread(get_cached_image, product.gemini_preprocessed_path)
 
         # Generate with AI
         mockup_image = await gemini_client.generate_mockup(
@@ -98,7 +107,7 @@ class BatchGenerationService:
             raise Exception("Failed to generate mockup image")
 
         # Save mockup
-        mockup_path = save_image(mockup_image, "mockups")
+        mockup_path = await asyncio.to_thread(save_image, mockup_image, "mockups")
 
         return {
             "image_path": mockup_path,
@@ -147,7 +156,7 @@ class BatchGenerationService:
         scene_template_ids: Optional[List[str]] = None,
         variation_preset: str = "standard",
         max_variations: int = 10,
-        custom_variations: Optional[List[Dict[str, Any]]] = None,
+        custom_variations: Optional[Sequence[Any]] = None,
     ) -> BatchJob:
         """
         Start a batch generation job.
@@ -158,7 +167,8 @@ class BatchGenerationService:
             scene_template_ids: Specific templates to use (optional)
             variation_preset: One of quick/standard/comprehensive
             max_variations: Maximum number of variations to generate
-            custom_variations: Custom variation configs (overrides preset)
+            custom_variations: Custom variations (overrides preset), either
+                request models with template_id/customization attributes or dicts
 
         Returns:
             BatchJob that can be tracked for progress
@@ -169,6 +179,10 @@ class BatchGenerationService:
         if not product:
             raise ValueError(f"Product {product_id} not found")
 
+        # Create the downscaled Gemini input (if missing) while the session
+        # is still open; the variations run after this request has finished
+        await ensure_gemini_image(product)
+
         # Build variation list
         if custom_variations:
             variations = custom_variations[:max_variations]
@@ -198,11 +212,12 @@ class BatchGenerationService:
         )
 
         # Define processor function that captures product
-        async def process_variation(variation: Dict[str, Any]) -> Dict[str, Any]:
+        async def process_variation(variation: Any) -> Dict[str, Any]:
+            template_id, customization = _variation_fields(variation)
             return await self.generate_single_variation(
                 product=product,
-                scene_template_id=variation["template_id"],
-                customization=variation.get("customization", {}),
+                scene_template_id=template_id,
+                customization=customization,
             )
 
         # Start job in background
@@ -215,38 +230,36 @@ class BatchGenerationService:
         db: AsyncSession,
         job: BatchJob,
         product_id: str,
-    ) -> List[Mockup]:
+    ) -> List[Tuple[str, Dict[str, Any]]]:
         """
         Save completed mockups from a batch job to database.
 
-        Call this after job completes to persist results.
+        Call this after job completes to persist results. All rows go out in
+        a single INSERT ... RETURNING; returns (mockup_id, result data) pairs
+        in job order.
         """
-        mockups = []
-
-        for result in job.results:
-            if not result.success or not result.result:
-                continue
-
-            data = result.result
-            mockup = Mockup(
-                product_id=product_id,
-                image_path=data["image_path"],
-                scene_template_id=data.get("scene_template_id"),
-                prompt_used=data.get("prompt_used"),
-                generation_params={
+        results = [r.result for r in job.results if r.success and r.result]
+        if not results:
+            return []
+
+        rows = [
+            {
+                "product_id": product_id,
+                "image_path": data["image_path"],
+                "scene_template_id": data.get("scene_template_id"),
+                "prompt_used": data.get("prompt_used"),
+                "generation_params": {
                     "batch_job_id": job.id,
                     "customization": data.get("customization"),
                 },
-            )
-            db.add(mockup)
-            mockups.append(mockup)
-
-        if mockups:
-            await db.flush()
-            for mockup in mockups:
-                await db.refresh(mockup)
-
-        return mockups
+            }
+            for data in results
+        ]
+        inserted = await db.execute(
+            insert(Mockup).returning(Mockup.id, sort_by_parameter_order=True),
+            rows,
+        )
+        return list(zip(inserted.scalars().all(), results))
 
     def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
         """Get status of a batch job."""
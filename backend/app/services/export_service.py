@@ -6,10 +6,13 @@ Handles:
 - Batch exports to ZIP files
 - Platform-specific optimization
 """
+import asyncio
 import io
+import os
 import zipfile
+from collections import deque
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, Iterable, List, Optional, Dict, Any, Tuple
 from pathlib import Path
 
 from PIL import Image
@@ -20,6 +23,60 @@ from app.core.batch_queue import batch_queue
 from app.config import settings
 
 
+# Exports encoded concurrently per ZIP; finished ones wait in order, so this
+# also bounds how many encoded images are held at once
+EXPORT_CONCURRENCY = os.cpu_count() or 4
+
+# Listing category per export preset; unlisted presets fall under "website"
+PRESET_CATEGORIES: Dict[str, str] = {
+    "instagram-post": "social",
+    "instagram-story": "social",
+    "instagram-reel-cover": "social",
+    "facebook-ad": "social",
+    "facebook-post": "social",
+    "twitter-post": "social",
+    "linkedin-post": "social",
+    "pinterest": "social",
+    "amazon-main": "ecommerce",
+    "amazon-lifestyle": "ecommerce",
+    "amazon-zoom": "ecommerce",
+    "shopify-product": "ecommerce",
+    "etsy-listing": "ecommerce",
+    "ebay-gallery": "ecommerce",
+    "website-hero": "website",
+    "website-thumbnail": "website",
+    "website-banner": "website",
+    "print-a4": "print",
+    "print-letter": "print",
+}
+
+
+class _ZipChunks(io.RawIOBase):
+    """
+    Write-only sink for zipfile that hands back what was written so far.
+
+    It is not seekable, so zipfile writes data descriptors instead of
+    seeking back into earlier output, and the archive can be sent as it
+    is built.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
 class ExportService:
     """Service for exporting mockups in various formats and sizes."""
 
@@ -40,31 +97,9 @@ class ExportService:
             "print": [],
         }
 
-        category_mapping = {
-            "instagram-post": "social",
-            "instagram-story": "social",
-            "instagram-reel-cover": "social",
-            "facebook-ad": "social",
-            "facebook-post": "social",
-            "twitter-post": "social",
-            "linkedin-post": "social",
-            "pinterest": "social",
-            "amazon-main": "ecommerce",
-            "amazon-lifestyle": "ecommerce",
-            "amazon-zoom": "ecommerce",
-            "shopify-product": "ecommerce",
-            "etsy-listing": "ecommerce",
-            "ebay-gallery": "ecommerce",
-            "website-hero": "website",
-            "website-thumbnail": "website",
-            "website-banner": "website",
-            "print-a4": "print",
-            "print-letter": "print",
-        }
-
         presets = self.get_presets()
         for preset_id, preset_data in presets.items():
-            category = category_mapping.get(preset_id, "website")
+            category = PRESET_CATEGORIES.get(preset_id, "website")
             categories[category].append({
                 "id": preset_id,
                 **preset_data,
@@ -151,20 +186,23 @@ class ExportService:
         export_path = f"exports/{filename}"
         full_path = settings.upload_dir / "exports" / filename
 
-        with open(full_path, "wb") as f:
-            f.write(image_bytes)
+        await asyncio.to_thread(full_path.write_bytes, image_bytes)
 
         return export_path
 
-    async def export_batch_to_zip(
+    async def stream_batch_to_zip(
         self,
         image_paths: List[str],
         preset_id: Optional[str] = None,
         format: str = "png",
         quality: int = 95,
-    ) -> bytes:
+    ) -> AsyncIterator[bytes]:
         """
-        Export multiple mockups as a ZIP file.
+        Export multiple mockups as a ZIP file, yielding it as it is built.
+
+        Up to EXPORT_CONCURRENCY images are exported at once, so at most
+        that many encoded images are held in memory; each is written to the
+        archive and yielded in order as soon as it and those before it are done.
 
         Args:
             image_paths: List of image paths to export
@@ -172,33 +210,55 @@ class ExportService:
             format: Output format for all images
             quality: Quality for lossy formats
 
-        Returns:
-            ZIP file bytes
+        Yields:
+            Consecutive chunks of the ZIP file
         """
-        zip_buffer = io.BytesIO()
-
-        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-            for i, image_path in enumerate(image_paths):
-                try:
-                    image_bytes = await self.export_single(
-                        image_path=image_path,
-                        preset_id=preset_id,
-                        format=format,
-                        quality=quality,
-                    )
+        sink = _ZipChunks()
 
-                    # Generate filename
-                    preset_suffix = f"_{preset_id}" if preset_id else ""
-                    filename = f"mockup_{i + 1:03d}{preset_suffix}.{format}"
-
-                    zip_file.writestr(filename, image_bytes)
+        preset_suffix = f"_{preset_id}" if preset_id else ""
+        jobs = (
+            (
+                f"mockup_{i + 1:03d}{preset_suffix}.{format}",
+                dict(image_path=image_path, preset_id=preset_id, format=format, quality=quality),
+            )
+            for i, image_path in enumerate(image_paths)
+        )
 
-                except Exception as e:
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            async for filename, image_bytes in self._export_in_order(jobs):
+                if isinstance(image_bytes, Exception):
                     # Log error but continue with other files
-                    print(f"Error exporting {image_path}: {e}")
+                    print(f"Error exporting {filename}: {image_bytes}")
                     continue
 
-        return zip_buffer.getvalue()
+                zip_file.writestr(filename, image_bytes)
+                yield sink.drain()
+
+        yield sink.drain()
+
+    async def export_batch_to_zip(
+        self,
+        image_paths: List[str],
+        preset_id: Optional[str] = None,
+        format: str = "png",
+        quality: int = 95,
+    ) -> bytes:
+        """
+        Export multiple mockups as a ZIP file.
+
+        Returns:
+            ZIP file bytes
+        """
+        chunks = [
+            chunk
+            async for chunk in self.stream_batch_to_zip(
+                image_paths=image_paths,
+                preset_id=preset_id,
+                format=format,
+                quality=quality,
+            )
+        ]
+        return b"".join(chunks)
 
     async def export_batch_and_save(
         self,
@@ -237,43 +297,94 @@ class ExportService:
 
         return export_path
 
-    async def export_multi_preset(
+    async def stream_multi_preset(
         self,
         image_path: str,
         preset_ids: List[str],
-    ) -> bytes:
+    ) -> AsyncIterator[bytes]:
         """
-        Export a single image to multiple preset formats as ZIP.
+        Export a single image to multiple preset formats as ZIP, yielding
+        the archive as it is built.
 
         Args:
             image_path: Path to source image
             preset_ids: List of preset IDs to export to
 
-        Returns:
-            ZIP file bytes with all exports
+        Yields:
+            Consecutive chunks of the ZIP file
         """
-        zip_buffer = io.BytesIO()
+        sink = _ZipChunks()
+
+        presets = [
+            (preset_id, preset)
+            for preset_id in preset_ids
+            if (preset := self.optimizer.get_preset(preset_id))
+        ]
+        jobs = (
+            (
+                f"{preset.name.replace(' ', '_').lower()}.{preset.format}",
+                dict(image_path=image_path, preset_id=preset_id),
+            )
+            for preset_id, preset in presets
+        )
 
-        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-            for preset_id in preset_ids:
-                try:
-                    preset = self.optimizer.get_preset(preset_id)
-                    if not preset:
-                        continue
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            async for filename, image_bytes in self._export_in_order(jobs):
+                if isinstance(image_bytes, Exception):
+                    print(f"Error exporting {filename}: {image_bytes}")
+                    continue
 
-                    image_bytes = await self.export_single(
-                        image_path=image_path,
-                        preset_id=preset_id,
-                    )
+                zip_file.writestr(filename, image_bytes)
+                yield sink.drain()
 
-                    filename = f"{preset.name.replace(' ', '_').lower()}.{preset.format}"
-                    zip_file.writestr(filename, image_bytes)
+        yield sink.drain()
 
-                except Exception as e:
-                    print(f"Error exporting preset {preset_id}: {e}")
-                    continue
+    async def export_multi_preset(
+        self,
+        image_path: str,
+        preset_ids: List[str],
+    ) -> bytes:
+        """
+        Export a single image to multiple preset formats as ZIP.
 
-        return zip_buffer.getvalue()
+        Returns:
+            ZIP file bytes with all exports
+        """
+        chunks = [
+            chunk
+            async for chunk in self.stream_multi_preset(image_path, preset_ids)
+        ]
+        return b"".join(chunks)
+
+    async def _export_in_order(
+        self,
+        jobs: Iterable[Tuple[str, Dict[str, Any]]],
+    ) -> AsyncIterator[Tuple[str, bytes | Exception]]:
+        """
+        Run export_single for each (name, kwargs) job, up to
+        EXPORT_CONCURRENCY at a time, yielding (name, bytes or the raised
+        exception) in job order.
+        """
+        in_flight: deque = deque()
+
+        async def next_result() -> Tuple[str, bytes | Exception]:
+            name, task = in_flight.popleft()
+            try:
+                return name, await task
+            except Exception as e:
+                return name, e
+
+        try:
+            for name, kwargs in jobs:
+                in_flight.append((name, asyncio.ensure_future(self.export_single(**kwargs))))
+                if len(in_flight) >= EXPORT_CONCURRENCY:
+                    yield await next_result()
+            while in_flight:
+                yield await next_result()
+        finally:
+            # Client went away mid-stream: don't leave exports running
+            for _, task in in_flight:
+                task.cancel()
 
     def get_export_filename(
         self,
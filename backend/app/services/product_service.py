@@ -0,0 +1,29 @@
+"""Product image helpers shared by the generation paths."""
+import asyncio
+
+from PIL import Image
+
+from app.core.gemini import GEMINI_IMAGE_MAX_SIZE
+from app.core.storage import get_cached_image, save_downscaled_copy
+from app.models import Product
+
+
+async def ensure_gemini_image(product: Product) -> str:
+    """
+    Path of the product's downscaled Gemini input, creating it if missing.
+
+    Products uploaded before the copy existed get one on first use. The
+    path is set on the row, so it is persisted when the caller's session
+    commits.
+    """
+    if not product.gemini_preprocessed_path:
+        source = product.processed_image_path or product.original_image_path
+        product.gemini_preprocessed_path = await asyncio.to_thread(
+            save_downscaled_copy, source, "products", GEMINI_IMAGE_MAX_SIZE
+        )
+    return product.gemini_preprocessed_path
+
+
+async def load_gemini_image(product: Product) -> Image.Image:
+    """The product image to send to Gemini (at most GEMINI_IMAGE_MAX_SIZE px)."""
+    return await asyncio.to_thread(get_cached_image, await ensure_gemini_image(product))
@@ -34,9 +34,16 @@ def _get_limits(user: User) -> Dict[str, Optional[int]]:
 
 
 async def ensure_within_limits(db: AsyncSession, user: User, key: str, increment: int = 1):
-    """Check and increment usage, raising if limits exceeded."""
+    """
+    Check and increment usage, raising if limits exceeded.
+
+    The new count is only staged on the user; it is written by the caller's
+    next flush or the request commit, in the same transaction as the work
+    being counted.
+    """
     _reset_if_needed(user)
-    usage = user.usage_counts or DEFAULT_USAGE.copy()
+    # Copy: mutating the loaded dict in place is invisible to change tracking
+    usage = dict(user.usage_counts or DEFAULT_USAGE)
     limits = _get_limits(user)
 
     current = usage.get(key, 0)
@@ -50,7 +57,6 @@ async def ensure_within_limits(db: AsyncSession, user: User, key: str, increment
 
     usage[key] = current + increment
     user.usage_counts = usage
-    await db.flush()
 
 
 def usage_summary(user: User) -> dict:
@@ -1,10 +1,39 @@
-"""Simple in-memory rate limiter (per-process)."""
+"""Sliding window rate limiter (Redis when configured, else per-process)."""
+import logging
 import time
+import uuid
+
 from fastapi import HTTPException, status
 
+from app.core.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
 # key -> list[timestamps]
 _requests: dict[str, list[float]] = {}
 
+# Trim, count and record in one round trip so concurrent workers can't
+# both slip under the limit. Returns 1 if allowed, 0 if limited.
+_SLIDING_WINDOW_LUA = """
+local now = tonumber(ARGV[1])
+local window_ms = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - window_ms)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now, ARGV[4])
+redis.call('PEXPIRE', KEYS[1], window_ms)
+return 1
+"""
+_sliding_window = None
+
+
+def _too_many_requests() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many requests. Please slow down.",
+    )
+
 
 def rate_limit(key: str, limit: int = 10, window_seconds: int = 60):
     """Basic sliding window rate limit."""
@@ -15,11 +44,35 @@ def rate_limit(key: str, limit: int = 10, window_seconds: int = 60):
     timestamps = [t for t in timestamps if t >= window_start]
 
     if len(timestamps) >= limit:
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail="Too many requests. Please slow down.",
-        )
+        raise _too_many_requests()
 
     timestamps.append(now)
     _requests[key] = timestamps
 
+
+async def rate_limit_async(key: str, limit: int = 10, window_seconds: int = 60):
+    """Sliding window rate limit shared across workers via Redis.
+
+    Falls back to the per-process limiter when REDIS_URL is unset or Redis
+    is unreachable.
+    """
+    global _sliding_window
+    redis = get_redis()
+    if redis is None:
+        return rate_limit(key, limit, window_seconds)
+
+    if _sliding_window is None:
+        _sliding_window = redis.register_script(_SLIDING_WINDOW_LUA)
+
+    now_ms = int(time.time() * 1000)
+    try:
+        allowed = await _sliding_window(
+            keys=[f"ratelimit:{key}"],
+            args=[now_ms, window_seconds * 1000, limit, f"{now_ms}:{uuid.uuid4().hex}"],
+        )
+    except Exception as e:
+        logger.warning("Redis rate limit failed, using in-memory fallback: %s", e)
+        return rate_limit(key, limit, window_seconds)
+
+    if not allowed:
+        raise _too_many_requests()
@@ -0,0 +1,56 @@
+import numpy as np
+from PIL import Image, ImageFilter, ImageOps
+
+from app.core.background_remover import _dilate, _refine_alpha
+
+
+def _baseline_refine_alpha(matte: Image.Image, original: Image.Image) -> np.ndarray:
+    """The original unfused formula, with the feathering blur run on 8-bit alpha."""
+    alpha_np = np.array(matte.getchannel("A").filter(ImageFilter.GaussianBlur(radius=1.5))).astype(np.float32)
+
+    original_np = np.array(original.convert("RGB")).astype(np.float32)
+    brightness = original_np.mean(axis=2)
+    glass_mask = (brightness > 200) & (alpha_np < 120)
+    alpha_np = np.where(glass_mask, alpha_np * 0.4 + 80, alpha_np)
+
+    dilated = Image.fromarray(alpha_np.astype(np.uint8)).filter(ImageFilter.MaxFilter(size=5))
+    dilated_np = np.array(dilated).astype(np.float32) / 255.0
+    gray_np = np.array(ImageOps.grayscale(original.convert("RGBA"))).astype(np.float32) / 255.0
+    shadow_mask = np.clip((1.0 - dilated_np) * (0.6 - gray_np) * 255 * 0.5, 0, 50)
+    return np.clip(alpha_np + shadow_mask, 0, 255).astype(np.uint8)
+
+
+def _fixture(size=(40, 30)):
+    rng = np.random.default_rng(0)
+    width, height = size
+    original = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    original[:8, :12] = 240  # bright "glass" patch
+    original[-8:, -12:] = 20  # dark floor for the contact shadow
+    alpha = np.zeros((height, width), dtype=np.uint8)
+    alpha[6:24, 10:30] = 255
+    alpha[2:6, 2:10] = 60  # weak cut over the bright patch
+    matte = np.dstack([original, alpha])
+    return Image.fromarray(matte, "RGBA"), Image.fromarray(original, "RGB")
+
+
+def test_dilate_matches_pillow_max_filter():
+    rng = np.random.default_rng(1)
+    plane = rng.integers(0, 256, (23, 31), dtype=np.uint8)
+
+    expected = np.asarray(Image.fromarray(plane).filter(ImageFilter.MaxFilter(5)))
+    np.testing.assert_array_equal(_dilate(plane, 2), expected)
+
+
+def test_refine_alpha_matches_baseline_formula():
+    matte, original = _fixture()
+
+    refined = _refine_alpha(matte, original)
+
+    assert refined.mode == "RGBA"
+    assert refined.getchannel("R").tobytes() == matte.getchannel("R").tobytes()
+    # Float32 rounding may differ by one level after truncation to uint8
+    np.testing.assert_allclose(
+        np.asarray(refined.getchannel("A"), dtype=np.int16),
+        _baseline_refine_alpha(matte, original).astype(np.int16),
+        atol=1,
+    )
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from app.core.batch_queue import BatchQueue, JobStatus
+
+
+@pytest.mark.asyncio
+async def test_list_jobs_uses_status_buckets_newest_first():
+    queue = BatchQueue()
+    jobs = [queue.create_job("batch_generation", total_items=1) for _ in range(4)]
+
+    async def ok(item):
+        return item
+
+    async def boom(item):
+        raise RuntimeError("nope")
+
+    await queue.run_job(jobs[0].id, [1], ok)
+    await queue.run_job(jobs[2].id, [1], boom)
+    await queue.run_job(jobs[1].id, [1], ok)
+
+    assert queue.list_jobs(status=JobStatus.COMPLETED) == [jobs[1], jobs[0]]
+    assert queue.list_jobs(status=JobStatus.FAILED) == [jobs[2]]
+    assert queue.list_jobs(status=JobStatus.PENDING) == [jobs[3]]
+    assert queue.list_jobs(limit=2) == [jobs[3], jobs[2]]
+    assert queue.list_jobs(job_type="other") == []
+
+
+@pytest.mark.asyncio
+async def test_to_dict_is_rebuilt_after_update():
+    queue = BatchQueue()
+    job = queue.create_job("batch_generation", total_items=2)
+    assert job.to_dict()["completed_items"] == 0
+
+    release = asyncio.Event()
+
+    async def process(item):
+        if item == "slow":
+            await release.wait()
+        return item
+
+    events = queue.subscribe(job.id)
+    queue.start_job_async(job.id, ["fast", "slow"], process)
+    while (await events.get())["completed_items"] < 1:
+        pass
+    assert job.to_dict()["completed_items"] == 1
+    assert job.to_dict()["status"] == JobStatus.IN_PROGRESS.value
+
+    release.set()
+    while not (await events.get())["is_done"]:
+        pass
+    snapshot = job.to_dict()
+    assert snapshot["completed_items"] == 2
+    assert snapshot["status"] == JobStatus.COMPLETED.value
+    assert [r["result"] for r in snapshot["results"]] == ["fast", "slow"]
@@ -0,0 +1,10 @@
+from app.api.v1.brands import _merge_palettes
+
+
+def test_merge_palettes_keeps_first_seen_order():
+    logo = ["#111111", "#222222", "#333333"]
+    web = ["#222222", "#444444", "#111111", "#555555"]
+
+    assert _merge_palettes(logo, web) == ["#111111", "#222222", "#333333", "#444444", "#555555"]
+    assert _merge_palettes(logo, web, limit=4) == ["#111111", "#222222", "#333333", "#444444"]
+    assert _merge_palettes((), web) == ["#222222", "#444444", "#111111", "#555555"]
@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.cache import TTLCache, coalesce
+
+
+def test_entries_expire_after_ttl():
+    cache = TTLCache(maxsize=10, ttl=0.01)
+    cache.set("token", "payload")
+    assert cache.get("token") == "payload"
+
+    time.sleep(0.02)
+    assert cache.get("token") is None
+    assert "token" not in cache
+
+
+def test_oldest_entries_evicted_when_full():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+
+    assert "a" not in cache
+    assert cache.get("b") == 2
+    assert cache.get("c") == 3
+
+
+@pytest.mark.asyncio
+async def test_coalesce_shares_one_run_between_concurrent_callers():
+    inflight = {}
+    runs = []
+    release = asyncio.Event()
+
+    async def work():
+        runs.append(1)
+        await release.wait()
+        return "shared"
+
+    first = asyncio.create_task(coalesce(inflight, "key", work))
+    second = asyncio.create_task(coalesce(inflight, "key", work))
+    await asyncio.sleep(0)
+
+    # One caller going away must not cancel the run the other is waiting on
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == "shared"
+    assert first.cancelled()
+    assert runs == [1]
+    assert "key" not in inflight
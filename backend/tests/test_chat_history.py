@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api.v1.chat import _recent_history
+from app.core.gemini import REFINE_HISTORY_BLOCK, history_window_size
+from app.models.chat import ChatMessage
+
+
+def test_history_window_size_drops_whole_blocks():
+    assert [history_window_size(n, block=6) for n in (0, 1, 5, 6, 7, 11)] == [0, 1, 5, 6, 7, 11]
+    assert [history_window_size(n, block=6) for n in (12, 13, 17, 18, 25)] == [6, 7, 11, 6, 7]
+
+
+def test_history_window_starts_on_a_block_boundary():
+    for count in range(50):
+        size = history_window_size(count)
+        assert (count - size) % REFINE_HISTORY_BLOCK == 0
+        assert min(count, REFINE_HISTORY_BLOCK) <= size <= 2 * REFINE_HISTORY_BLOCK - 1
+
+
+@pytest.mark.asyncio
+async def test_recent_history_is_oldest_first_with_user_before_assistant():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(ChatMessage.__table__.create)
+
+    start = datetime(2026, 1, 1)
+    turns = 7  # 14 messages, so the window keeps the last 8
+    async with async_sessionmaker(engine)() as db:
+        db.add(ChatMessage(session_id="s", role="system", content="welcome", created_at=start))
+        for turn in range(turns):
+            at = start + timedelta(minutes=turn + 1)
+            # Inserted assistant-first: only the role tie-break orders them
+            db.add(ChatMessage(session_id="s", role="assistant", content=f"a{turn}", created_at=at))
+            db.add(ChatMessage(session_id="s", role="user", content=f"u{turn}", created_at=at))
+        db.add(ChatMessage(session_id="other", role="user", content="elsewhere", created_at=start))
+        await db.commit()
+
+        history = await _recent_history(db, "s")
+
+    await engine.dispose()
+
+    expected = []
+    for turn in range(turns - history_window_size(2 * turns) // 2, turns):
+        expected += [{"role": "user", "content": f"u{turn}"}, {"role": "assistant", "content": f"a{turn}"}]
+    assert len(expected) == 8
+    assert history == expected
@@ -0,0 +1,45 @@
+import io
+import zipfile
+
+import pytest
+from PIL import Image
+
+from app.config import settings
+from app.services.export_service import ExportService, _ZipChunks
+
+
+def test_zip_chunks_round_trip_through_zipfile():
+    sink = _ZipChunks()
+    assert not sink.seekable()
+
+    chunks = []
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for i in range(3):
+            zip_file.writestr(f"file_{i}.txt", f"contents {i}" * 100)
+            chunks.append(sink.drain())
+    chunks.append(sink.drain())
+
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as zip_file:
+        assert zip_file.testzip() is None
+        assert zip_file.namelist() == ["file_0.txt", "file_1.txt", "file_2.txt"]
+        assert zip_file.read("file_2.txt") == b"contents 2" * 100
+
+
+@pytest.mark.asyncio
+async def test_stream_batch_to_zip_yields_a_readable_archive(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "upload_dir", tmp_path)
+    paths = []
+    for i, color in enumerate(["red", "green", "blue"]):
+        Image.new("RGB", (32, 16), color).save(tmp_path / f"{i}.png")
+        paths.append(f"{i}.png")
+    paths.insert(1, "missing.png")
+
+    chunks = [chunk async for chunk in ExportService().stream_batch_to_zip(paths)]
+
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as zip_file:
+        assert zip_file.testzip() is None
+        # The missing image is skipped; the others keep their positions
+        assert zip_file.namelist() == ["mockup_001.png", "mockup_003.png", "mockup_004.png"]
+        with Image.open(io.BytesIO(zip_file.read("mockup_004.png"))) as image:
+            assert image.size == (32, 16)
+            assert image.convert("RGB").getpixel((0, 0)) == (0, 0, 255)
@@ -0,0 +1,28 @@
+from app.core.scene_generator import search_templates
+
+
+def _ids(query):
+    return [template.id for template in search_templates(query)]
+
+
+def test_search_ranks_templates_matching_more_terms_first():
+    assert _ids("marble") == ["premium-marble", "lifestyle-kitchen"]
+    # lifestyle-kitchen matches both words, premium-marble only one
+    assert _ids("marble kitchen") == ["lifestyle-kitchen", "premium-marble"]
+
+
+def test_search_matches_terms_the_query_prefixes():
+    assert _ids("minim") == _ids("minimal") == ["studio-white"]
+    assert set(_ids("mar")) == set(_ids("marble")) | set(_ids("marketplace"))
+
+
+def test_search_short_tokens_only_match_exactly():
+    # "e" is indexed (from "e-commerce"), "ec" is not and is too short to prefix
+    assert "ecommerce-amazon" in _ids("e")
+    assert _ids("ec") == []
+    assert _ids("eco") != []
+
+
+def test_search_without_matches_is_empty():
+    assert search_templates("zzzz") == []
+    assert search_templates("") == []
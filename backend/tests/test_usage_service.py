@@ -27,6 +27,18 @@ async def test_usage_increment_within_limits():
     assert user.usage_counts["mockups_generated"] == 1
 
 
+@pytest.mark.asyncio
+async def test_usage_increment_assigns_new_dict():
+    # JSON columns only register a change when a new object is assigned
+    user = DummyUser()
+    db = DummySession()
+    counts = user.usage_counts
+
+    await ensure_within_limits(db, user, "brands_created", increment=1)
+    assert user.usage_counts is not counts
+    assert counts["brands_created"] == 0
+
+
 @pytest.mark.asyncio
 async def test_usage_limit_enforced():
     user = DummyUser()
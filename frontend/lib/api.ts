@@ -173,6 +173,8 @@ export const scenesApi = {
   getTemplate: (id: string) =>
     request<SceneTemplate>(`/scenes/templates/${id}`),
 
+  getCatalog: () => request<SceneTemplate[]>("/scenes/catalog"),
+
   getCategories: () =>
     request<{ categories: string[]; counts: Record<string, number> }>("/scenes/categories"),
 
@@ -331,6 +333,15 @@ export interface ChatSession {
   updated_at: string;
 }
 
+export interface ChatSessionSummary {
+  id: string;
+  mockup_id: string;
+  current_image_url: string;
+  message_count: number;
+  created_at: string;
+  updated_at: string;
+}
+
 export interface RefinementSuggestion {
   label: string;
   prompt: string;
@@ -551,7 +562,7 @@ export const chatApi = {
 
   listSessions: (mockupId?: string) => {
     const params = mockupId ? `?mockup_id=${mockupId}` : "";
-    return request<ChatSession[]>(`/chat/sessions${params}`);
+    return request<ChatSessionSummary[]>(`/chat/sessions${params}`);
   },
 };
 